@@ -1,14 +1,25 @@
+from typing import AsyncIterator
+from sqlalchemy import text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from app.models.cliente import Cliente
+from app.models.factura import Factura
+from app.models.reserva import Reserva
 from app.schemas.cliente import ClienteCreate
+from app.crud.escritura import insertar, actualizar
+from app.crud.paginacion import codificar_cursor, decodificar_cursor, PAGINA_POR_DEFECTO
+from app.services.importacion_clientes import COLUMNAS, Registro
 
 
-async def create_cliente(session: AsyncSession, data: ClienteCreate) -> Cliente:
-    cliente = Cliente(**data.model_dump())
-    session.add(cliente)
+async def create_cliente(session: AsyncSession, data: ClienteCreate) -> Cliente | None:
+    """
+    Inserta el cliente en un solo viaje (INSERT ... ON CONFLICT DO NOTHING RETURNING).
+    Devuelve None si ya existe un cliente con ese documento, incluso si otra petición
+    lo creó al mismo tiempo.
+    """
+    cliente = await insertar(session, Cliente, data.model_dump(), conflicto=[Cliente.documento_identidad])
     await session.commit()
-    await session.refresh(cliente)
     return cliente
 
 
@@ -19,6 +30,23 @@ async def get_cliente(session: AsyncSession, cliente_id: int) -> Cliente | None:
     return result.scalar_one_or_none()
 
 
+async def get_cliente_resumen(session: AsyncSession, cliente_id: int) -> Cliente | None:
+    """
+    Cliente con reservas, facturas y pagos en 4 consultas fijas (una por nivel), sin importar
+    cuánto historial tenga: cada selectinload trae todos los hijos del nivel con un solo IN.
+    """
+    result = await session.execute(
+        select(Cliente)
+        .where(Cliente.id == cliente_id)
+        .options(
+            selectinload(Cliente.reservas)
+            .selectinload(Reserva.facturas)
+            .selectinload(Factura.pagos)
+        )
+    )
+    return result.scalar_one_or_none()
+
+
 # Nueva función para buscar por documento
 async def get_cliente_by_documento(session: AsyncSession, documento_identidad: str) -> Cliente | None:
     result = await session.execute(
@@ -27,9 +55,46 @@ async def get_cliente_by_documento(session: AsyncSession, documento_identidad: s
     return result.scalar_one_or_none()
 
 
-async def list_clientes(session: AsyncSession) -> list[Cliente]:
-    result = await session.execute(select(Cliente))
-    return result.scalars().all()
+def _patron(texto: str) -> str:
+    # Los comodines que escriba el usuario se buscan literalmente
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def list_clientes(
+    session: AsyncSession,
+    nombre: str | None = None,
+    documento: str | None = None,
+    correo: str | None = None,
+    telefono: str | None = None,
+    limite: int = PAGINA_POR_DEFECTO,
+    cursor: str | None = None,
+) -> tuple[list[Cliente], str | None]:
+    """
+    Búsqueda de clientes ordenada por (nombre, id), de a `limite` por página.
+    `nombre` busca por prefijo; documento, correo y teléfono por coincidencia parcial.
+    Todas ignoran mayúsculas y se resuelven con los índices GIN de pg_trgm.
+    Devuelve los clientes y el cursor de la página siguiente (None si no hay más).
+    """
+    query = select(Cliente)
+    if nombre:
+        query = query.where(Cliente.nombre.ilike(f"{_patron(nombre)}%", escape="\\"))
+    for columna, texto in (
+        (Cliente.documento_identidad, documento),
+        (Cliente.correo, correo),
+        (Cliente.telefono, telefono),
+    ):
+        if texto:
+            query = query.where(columna.ilike(f"%{_patron(texto)}%", escape="\\"))
+    if cursor:
+        ultima = decodificar_cursor(cursor, (str, int))
+        query = query.where(tuple_(Cliente.nombre, Cliente.id) > ultima)
+
+    result = await session.execute(query.order_by(Cliente.nombre, Cliente.id).limit(limite + 1))
+    clientes = result.scalars().all()
+    if len(clientes) <= limite:
+        return clientes, None
+    clientes = clientes[:limite]
+    return clientes, codificar_cursor(clientes[-1].nombre, clientes[-1].id)
 
 
 async def delete_cliente(session: AsyncSession, cliente_id: int) -> bool:
@@ -42,11 +107,75 @@ async def delete_cliente(session: AsyncSession, cliente_id: int) -> bool:
 
 
 async def update_cliente(session: AsyncSession, cliente_id: int, data: ClienteCreate) -> Cliente | None:
-    cliente = await get_cliente(session, cliente_id)
-    if not cliente:
-        return None
-    for field, value in data.model_dump().items():
-        setattr(cliente, field, value)
+    cliente = await actualizar(session, Cliente, cliente_id, data.model_dump())
+    if cliente:
+        await session.commit()
+    return cliente
+
+
+# Filas que se juntan en memoria antes de cada COPY y errores que se devuelven como muestra
+IMPORTACION_LOTE_COPY = 5_000
+IMPORTACION_MAX_ERRORES = 100
+
+FUSIONAR_IMPORTACION = text("""
+    WITH fusion AS (
+        INSERT INTO clientes (nombre, documento_identidad, correo, telefono)
+        -- Si un documento se repite en el archivo, gana la última línea
+        SELECT DISTINCT ON (documento_identidad) nombre, documento_identidad, correo, telefono
+        FROM clientes_importacion
+        ORDER BY documento_identidad, linea DESC
+        ON CONFLICT (documento_identidad) DO UPDATE
+            SET nombre = EXCLUDED.nombre, correo = EXCLUDED.correo, telefono = EXCLUDED.telefono
+            WHERE (clientes.nombre, clientes.correo, clientes.telefono)
+                  IS DISTINCT FROM (EXCLUDED.nombre, EXCLUDED.correo, EXCLUDED.telefono)
+        RETURNING (xmax = 0) AS insertado
+    )
+    SELECT count(*) FILTER (WHERE insertado), count(*) FILTER (WHERE NOT insertado) FROM fusion
+""")
+
+
+async def importar_clientes(session: AsyncSession, registros: AsyncIterator[Registro]) -> dict:
+    """
+    Carga masiva de clientes en una sola transacción:
+    1. COPY (protocolo binario de asyncpg) de los registros válidos a una tabla temporal,
+       de a IMPORTACION_LOTE_COPY filas, así la memoria no depende del tamaño del archivo;
+    2. un único INSERT ... ON CONFLICT (documento_identidad) que inserta los nuevos y
+       actualiza los existentes que cambiaron.
+    """
+    conexion = await session.connection()
+    asyncpg_conn = (await conexion.get_raw_connection()).driver_connection
+    await session.execute(text("""
+        CREATE TEMP TABLE clientes_importacion (
+            nombre VARCHAR(100), documento_identidad VARCHAR(20),
+            correo VARCHAR(100), telefono VARCHAR(20), linea INT
+        ) ON COMMIT DROP
+    """))
+
+    columnas = [*COLUMNAS, "linea"]
+    lote, cargados, rechazados, errores = [], 0, 0, []
+    async for linea, datos, error in registros:
+        if error:
+            rechazados += 1
+            if len(errores) < IMPORTACION_MAX_ERRORES:
+                errores.append({"linea": linea, "detalle": error})
+            continue
+        lote.append((*(datos[c] for c in COLUMNAS), linea))
+        if len(lote) >= IMPORTACION_LOTE_COPY:
+            await asyncpg_conn.copy_records_to_table("clientes_importacion", records=lote, columns=columnas)
+            cargados += len(lote)
+            lote = []
+    if lote:
+        await asyncpg_conn.copy_records_to_table("clientes_importacion", records=lote, columns=columnas)
+        cargados += len(lote)
+
+    unicos = (await session.execute(text("SELECT count(DISTINCT documento_identidad) FROM clientes_importacion"))).scalar()
+    insertados, actualizados = (await session.execute(FUSIONAR_IMPORTACION)).one()
     await session.commit()
-    await session.refresh(cliente)
-    return cliente
\ No newline at end of file
+    return {
+        "insertados": insertados,
+        "actualizados": actualizados,
+        "sin_cambios": unicos - insertados - actualizados,
+        "duplicados": cargados - unicos,
+        "rechazados": rechazados,
+        "errores": errores,
+    }
@@ -1,15 +1,32 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_
+from sqlalchemy import delete, or_
 from app.models.cuenta import Cuenta
-from app.schemas.cuenta import CuentaCreate, CuentaUpdate
+from app.schemas.cuenta import CuentaCreate, CuentaUpdate, CuentaNodo
+from app.crud.escritura import insertar, actualizar
 from typing import List, Optional
+import os
+import time
 
-async def crear_cuenta(db: AsyncSession, data: CuentaCreate) -> Cuenta:
-    nueva_cuenta = Cuenta(**data.model_dump())
-    db.add(nueva_cuenta)
+# Árbol completo ya armado; se descarta con cada alta, cambio o baja de este worker
+# y a los CUENTAS_ARBOL_TTL segundos (cambios hechos por otros workers)
+ARBOL_TTL = float(os.getenv("CUENTAS_ARBOL_TTL", "60"))
+_arbol: Optional[List[CuentaNodo]] = None
+_arbol_vence = 0.0
+# Sube con cada invalidación: un árbol leído antes de un cambio no queda guardado
+_arbol_version = 0
+
+def invalidar_arbol() -> None:
+    global _arbol, _arbol_version
+    _arbol_version += 1
+    _arbol = None
+
+async def crear_cuenta(db: AsyncSession, data: CuentaCreate) -> Optional[Cuenta]:
+    """Crear cuenta en un solo viaje a la base; devuelve None si el código ya existe"""
+    nueva_cuenta = await insertar(db, Cuenta, data.model_dump(), conflicto=[Cuenta.codigo])
     await db.commit()
-    await db.refresh(nueva_cuenta)
+    if nueva_cuenta:
+        invalidar_arbol()
     return nueva_cuenta
 
 
@@ -46,23 +63,68 @@ async def buscar_cuentas(db: AsyncSession, search_term: str) -> List[Cuenta]:
     return result.scalars().all()
 
 async def actualizar_cuenta(db: AsyncSession, cuenta_id: int, data: CuentaUpdate) -> Optional[Cuenta]:
-    cuenta = await obtener_cuenta(db, cuenta_id)
-    if not cuenta:
-        return None
-    
     update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(cuenta, field, value)
-    
-    await db.commit()
-    await db.refresh(cuenta)
+    if not update_data:
+        return await obtener_cuenta(db, cuenta_id)
+
+    cuenta = await actualizar(db, Cuenta, cuenta_id, update_data)
+    if cuenta:
+        await db.commit()
+        invalidar_arbol()
     return cuenta
 
 async def eliminar_cuenta(db: AsyncSession, cuenta_id: int) -> bool:
-    cuenta = await obtener_cuenta(db, cuenta_id)
-    if not cuenta:
+    result = await db.execute(delete(Cuenta).where(Cuenta.id == cuenta_id).returning(Cuenta.id))
+    if result.scalar_one_or_none() is None:
         return False
-    
-    await db.delete(cuenta)
     await db.commit()
+    invalidar_arbol()
     return True
+
+
+# Solo las columnas del nodo: filas sueltas, sin armar entidades ORM que no se van a modificar
+_COLUMNAS_NODO = (Cuenta.id, Cuenta.codigo, Cuenta.nombre, Cuenta.tipo, Cuenta.nivel)
+
+
+def armar_arbol(cuentas) -> List[CuentaNodo]:
+    """
+    Arma la jerarquía en una sola pasada: la madre de una cuenta es la cuenta de código
+    más largo que es prefijo del suyo. Ordenados los códigos, la madre siempre está en
+    la pila de ancestros del código anterior, así que basta con desapilar hasta hallarla.
+    Las descendientes de una cuenta son las que se recorrieron entre que entró y salió
+    de la pila.
+    """
+    raices: List[CuentaNodo] = []
+    pila: List[tuple] = []
+    ordenadas = sorted(cuentas, key=lambda c: c.codigo)
+    for posicion, cuenta in enumerate(ordenadas):
+        nodo = CuentaNodo(id=cuenta.id, codigo=cuenta.codigo, nombre=cuenta.nombre, tipo=cuenta.tipo, nivel=cuenta.nivel)
+        while pila and not nodo.codigo.startswith(pila[-1][0].codigo):
+            madre, entrada = pila.pop()
+            madre.descendientes = posicion - entrada - 1
+        (pila[-1][0].hijos if pila else raices).append(nodo)
+        pila.append((nodo, posicion))
+    for madre, entrada in pila:
+        madre.descendientes = len(ordenadas) - entrada - 1
+    return raices
+
+
+async def obtener_arbol(db: AsyncSession, prefijo: Optional[str] = None) -> List[CuentaNodo]:
+    """
+    Plan de cuentas como árbol. Sin prefijo se sirve desde memoria; con prefijo se arma
+    el subárbol de las cuentas cuyo código empieza así (índice text_pattern_ops).
+    """
+    global _arbol, _arbol_vence
+    if prefijo:
+        patron = prefijo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        result = await db.execute(select(*_COLUMNAS_NODO).where(Cuenta.codigo.like(patron, escape="\\")))
+        return armar_arbol(result.all())
+
+    if _arbol is not None and time.monotonic() < _arbol_vence:
+        return _arbol
+    version = _arbol_version
+    result = await db.execute(select(*_COLUMNAS_NODO))
+    arbol = armar_arbol(result.all())
+    if version == _arbol_version:
+        _arbol, _arbol_vence = arbol, time.monotonic() + ARBOL_TTL
+    return arbol
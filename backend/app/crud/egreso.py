@@ -1,16 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from app.models.egreso import Egreso
+from app.crud.escritura import insertar, insertar_varios
 from app.schemas.egreso import EgresoCreate
+from app.services import listados
+from datetime import date
+from typing import List, Optional
+
+# Máximo de egresos aceptados en un solo lote
+LOTE_MAXIMO = 10000
 
 async def crear_egreso(db: AsyncSession, egreso: EgresoCreate):
-    db_egreso = Egreso(**egreso.dict())
-    db.add(db_egreso)
+    db_egreso = await insertar(db, Egreso, egreso.dict())
     await db.commit()
-    await db.refresh(db_egreso)
     return db_egreso
 
-async def obtener_egresos(db: AsyncSession):
-    result = await db.execute(select(Egreso))
-    return result.scalars().all()
+async def crear_egresos_lote(db: AsyncSession, egresos: List[EgresoCreate]) -> List[int]:
+    """Alta de todo el lote en una sola transacción; devuelve los ids en el orden recibido"""
+    ids = await insertar_varios(db, Egreso, [e.model_dump() for e in egresos])
+    await db.commit()
+    return ids
 
+def recorrer_egresos(db: AsyncSession, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """Egresos del período por tandas, desde un cursor del servidor (ver app/services/listados.py)"""
+    return listados.recorrer(db, Egreso, Egreso.fecha, fecha_inicio, fecha_fin)
@@ -0,0 +1,64 @@
+"""
+Escrituras de una sola sentencia para los módulos CRUD.
+
+Con add → commit → refresh cada alta hace un SELECT más después del commit solo
+para leer el id y los valores que completa la base (defaults, fechas). Con
+INSERT/UPDATE ... RETURNING la fila vuelve completa en la misma sentencia que la
+escribe. Estas funciones no confirman la transacción: el commit queda a cargo de
+quien llama, así puede sumar más sentencias a la misma transacción.
+"""
+from typing import Any, List, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+Modelo = TypeVar("Modelo")
+
+
+async def insertar(
+    db: AsyncSession,
+    modelo: Type[Modelo],
+    valores: dict[str, Any],
+    conflicto: Optional[Sequence[Any]] = None,
+) -> Optional[Modelo]:
+    """
+    INSERT ... RETURNING de una fila de `modelo`. Con `conflicto` (las columnas de una
+    restricción única) agrega ON CONFLICT DO NOTHING y devuelve None si la fila ya existía.
+    """
+    sentencia = insert(modelo).values(**valores)
+    if conflicto:
+        sentencia = sentencia.on_conflict_do_nothing(index_elements=conflicto)
+    result = await db.execute(sentencia.returning(modelo))
+    return result.scalar_one_or_none()
+
+
+async def insertar_varios(
+    db: AsyncSession,
+    modelo: Type[Modelo],
+    filas: Sequence[dict[str, Any]],
+) -> List[int]:
+    """
+    Alta de muchas filas de `modelo` con INSERT de varias filas ... RETURNING id; devuelve
+    los ids en el mismo orden de `filas`. SQLAlchemy parte el lote en sentencias de hasta
+    1000 filas (insertmanyvalues), todas dentro de la transacción de quien llama.
+    """
+    result = await db.execute(insert(modelo).returning(modelo.id, sort_by_parameter_order=True), list(filas))
+    return list(result.scalars().all())
+
+
+async def actualizar(
+    db: AsyncSession,
+    modelo: Type[Modelo],
+    fila_id: int,
+    valores: dict[str, Any],
+) -> Optional[Modelo]:
+    """UPDATE ... WHERE id = fila_id RETURNING; devuelve None si la fila no existe"""
+    result = await db.execute(
+        update(modelo)
+        .where(modelo.id == fila_id)
+        .values(**valores)
+        .returning(modelo)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
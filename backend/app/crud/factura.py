@@ -1,19 +1,227 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.factura import Factura
+from app.models.pago import Pago
+from app.models.reserva import Reserva
+from app.models.habitacion import Habitacion
+from app.models.cliente import Cliente
+from app.crud.escritura import insertar
+from app.crud.paginacion import codificar_cursor, decodificar_cursor, PAGINA_POR_DEFECTO
 from app.schemas.factura import FacturaCreate
+from sqlalchemy import any_, bindparam, case, exists, func, insert, literal, true, tuple_, update, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Las facturas anuladas conservan su estado aunque tengan pagos
+ANULADA = "anulada"
+
+# Reservas que se facturan una vez terminada la estadía (las canceladas no)
+ESTADOS_FACTURABLES = ("reservada", "completada")
+
+# Llave del advisory lock que serializa las corridas de facturación (el primer entero
+# 1 lo usan las reservas por habitación)
+ESPACIO_BLOQUEO_FACTURACION = 2
+
+
+def estado_segun_pagos(pagado):
+    """Estado que corresponde a una factura según lo pagado: 'pagada' si cubre el total"""
+    return case((Factura.total <= pagado, "pagada"), else_="pendiente")
+
+
+def pagado_factura():
+    """Suma de los pagos de la factura de la fila actual (subconsulta correlacionada)"""
+    return (
+        select(func.coalesce(func.sum(Pago.monto), 0))
+        .where(Pago.factura_id == Factura.id)
+        .scalar_subquery()
+    )
+
 
 async def crear_factura(db: AsyncSession, factura: FacturaCreate):
-    db_factura = Factura(**factura.dict())
-    db.add(db_factura)
+    db_factura = await insertar(db, Factura, factura.dict())
     await db.commit()
-    await db.refresh(db_factura)
     return db_factura
 
 
+async def generar_facturas(db: AsyncSession, hasta: date) -> Tuple[int, float]:
+    """
+    Corrida de facturación: una factura 'pendiente' por cada reserva no cancelada que
+    terminó a más tardar `hasta` y todavía no tiene ninguna, con total = noches ×
+    precio_noche de su habitación y fecha de emisión igual a la de salida. Es un solo
+    INSERT ... SELECT, así que 100k reservas no viajan a Python. Devuelve cuántas
+    facturas se crearon y la suma de sus totales.
+
+    Repetirla no duplica nada: solo toma reservas sin factura. Dos corridas al mismo
+    tiempo se ordenan con un advisory lock; el INSERT de la segunda empieza después de
+    que confirma la primera y ya ve sus facturas.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(ESPACIO_BLOQUEO_FACTURACION, 0)))
+    noches = Reserva.fecha_fin - Reserva.fecha_inicio
+    pendientes = (
+        select(
+            Reserva.id,
+            Reserva.fecha_fin,
+            noches * Habitacion.precio_noche,
+            literal("pendiente", Factura.estado.type),
+        )
+        .join(Habitacion, Habitacion.id == Reserva.habitacion_id)
+        .where(
+            Reserva.estado.in_(ESTADOS_FACTURABLES),
+            Reserva.fecha_fin <= hasta,
+            # Anti-join sobre idx_facturas_reserva_id
+            ~exists().where(Factura.reserva_id == Reserva.id),
+        )
+    )
+    nuevas = (
+        insert(Factura)
+        .from_select(["reserva_id", "fecha_emision", "total", "estado"], pendientes)
+        .returning(Factura.total)
+        .cte("nuevas")
+    )
+    result = await db.execute(select(func.count(), func.coalesce(func.sum(nuevas.c.total), 0)))
+    generadas, total = result.one()
+    await db.commit()
+    return generadas, float(total)
+
+
 async def obtener_facturas(db: AsyncSession):
     result = await db.execute(
         select(Factura).options(selectinload(Factura.pagos))
     )
-    return result.scalars().all()
\ No newline at end of file
+    return result.scalars().all()
+
+
+async def obtener_saldos(
+    db: AsyncSession,
+    estado: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    cliente_id: Optional[int] = None,
+    con_saldo: bool = False,
+    limite: int = PAGINA_POR_DEFECTO,
+    cursor: Optional[str] = None,
+) -> Tuple[List, Optional[str]]:
+    """
+    Una página de facturas ordenadas por (fecha_emision, id) con total, pagado y saldo,
+    calculados en la base con una sola consulta en lugar de traer cada pago.
+    `desde`/`hasta` acotan la fecha de emisión (ambos incluidos); `con_saldo` deja solo
+    las que tienen algo por pagar. Devuelve las filas y el cursor de la página siguiente
+    (None si no hay más).
+    """
+    # Suma de los pagos de cada factura con LATERAL (idx_pagos_factura_id). Con un
+    # LEFT JOIN + GROUP BY, PostgreSQL agrupa todas las facturas antes de ordenar y
+    # cortar; así recorre idx_facturas_emision_id y se detiene al llenar la página.
+    pagos = (
+        select(func.coalesce(func.sum(Pago.monto), 0).label("pagado"))
+        .where(Pago.factura_id == Factura.id)
+        .lateral("pagos_factura")
+    )
+    saldo = Factura.total - pagos.c.pagado
+    query = (
+        select(
+            Factura.id, Factura.reserva_id, Factura.fecha_emision, Factura.estado, Factura.total,
+            pagos.c.pagado, saldo.label("saldo"),
+        )
+        .join(pagos, true())
+    )
+    if cliente_id is not None:
+        query = query.join(Reserva, Reserva.id == Factura.reserva_id).where(Reserva.cliente_id == cliente_id)
+    if estado:
+        query = query.where(Factura.estado == estado)
+    if desde:
+        query = query.where(Factura.fecha_emision >= desde)
+    if hasta:
+        query = query.where(Factura.fecha_emision <= hasta)
+    if con_saldo:
+        query = query.where(saldo > 0)
+    if cursor:
+        ultima = decodificar_cursor(cursor, (date.fromisoformat, int))
+        query = query.where(tuple_(Factura.fecha_emision, Factura.id) > ultima)
+
+    # Se pide una fila de más solo para saber si existe otra página
+    result = await db.execute(query.order_by(Factura.fecha_emision, Factura.id).limit(limite + 1))
+    saldos = result.all()
+    if len(saldos) <= limite:
+        return saldos, None
+    saldos = saldos[:limite]
+    return saldos, codificar_cursor(saldos[-1].fecha_emision, saldos[-1].id)
+
+
+async def obtener_datos_pdf(db: AsyncSession, ids: Sequence[int]) -> Dict[int, dict]:
+    """
+    Todo lo que se imprime en el PDF de cada factura de `ids` (factura, cliente,
+    reserva, habitación y pagos), en dos consultas y como datos simples que se pueden
+    mandar al pool de procesos. Las facturas que no existen no aparecen. Al terminar
+    suelta la conexión: el render puede tardar y no necesita la base.
+    """
+    lista = bindparam("ids", list(ids), type_=ARRAY(Integer))
+    result = await db.execute(
+        select(
+            Factura.id, Factura.fecha_emision, Factura.estado, Factura.total, Factura.reserva_id,
+            Reserva.fecha_inicio, Reserva.fecha_fin, Cliente.nombre, Cliente.documento_identidad,
+            Habitacion.numero, Habitacion.tipo, Habitacion.precio_noche,
+        )
+        .outerjoin(Reserva, Reserva.id == Factura.reserva_id)
+        .outerjoin(Cliente, Cliente.id == Reserva.cliente_id)
+        .outerjoin(Habitacion, Habitacion.id == Reserva.habitacion_id)
+        .where(Factura.id == any_(lista))
+    )
+    datos = {
+        f.id: {
+            "id": f.id, "fecha_emision": f.fecha_emision, "estado": f.estado, "total": f.total,
+            "reserva_id": f.reserva_id, "fecha_inicio": f.fecha_inicio, "fecha_fin": f.fecha_fin,
+            "cliente": f.nombre, "documento_identidad": f.documento_identidad,
+            "habitacion": f.numero, "tipo": f.tipo, "precio_noche": f.precio_noche, "pagos": [],
+        }
+        for f in result.all()
+    }
+    pagos = await db.execute(
+        select(Pago.factura_id, Pago.fecha_pago, Pago.metodo_pago, Pago.monto)
+        .where(Pago.factura_id == any_(lista))
+        .order_by(Pago.factura_id, Pago.fecha_pago, Pago.id)
+    )
+    for factura_id, fecha_pago, metodo_pago, monto in pagos.all():
+        datos[factura_id]["pagos"].append((fecha_pago, metodo_pago, monto))
+    await db.rollback()
+    return datos
+
+
+async def conciliar_estados(db: AsyncSession) -> int:
+    """
+    Corrige en bloque el estado de las facturas que no coincide con sus pagos (por
+    ejemplo, pagos cargados antes de que crear_pago saldara la factura). Devuelve
+    cuántas se actualizaron.
+
+    1. Una consulta agrupada encuentra las facturas desactualizadas y las bloquea
+       (FOR UPDATE), igual que crear_pago antes de sumar un pago.
+    2. Un solo UPDATE las corrige. Como es otra sentencia, ve los pagos confirmados
+       mientras se esperaba algún bloqueo; con una sola sentencia podría guardar el
+       estado calculado con sumas viejas.
+    """
+    sumas = select(Pago.factura_id, func.sum(Pago.monto).label("pagado")).group_by(Pago.factura_id).subquery()
+    desactualizadas = await db.execute(
+        select(Factura.id)
+        .outerjoin(sumas, sumas.c.factura_id == Factura.id)
+        .where(
+            Factura.estado.is_distinct_from(ANULADA),
+            Factura.estado.is_distinct_from(estado_segun_pagos(func.coalesce(sumas.c.pagado, 0))),
+        )
+        .with_for_update(of=Factura)
+    )
+    ids = desactualizadas.scalars().all()
+    if not ids:
+        await db.rollback()
+        return 0
+
+    nuevo = estado_segun_pagos(pagado_factura())
+    result = await db.execute(
+        update(Factura)
+        # Un solo parámetro (arreglo) aunque sean decenas de miles de facturas
+        .where(Factura.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))), Factura.estado.is_distinct_from(nuevo))
+        .values(estado=nuevo)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
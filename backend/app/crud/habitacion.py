@@ -1,30 +1,119 @@
+from sqlalchemy import case, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.models.habitacion import Habitacion
+from app.models.habitacion import Habitacion, ESTADOS_OCUPACION
+from app.models.reserva import Reserva
 from app.schemas.habitacion import HabitacionCreate
+from app.crud.escritura import insertar, actualizar
+from app.crud.retencion import obtener_habitaciones_retenidas, retenciones_cruzadas
+from app.services import indice_disponibilidad
+from datetime import date
+from typing import Optional
 
 async def crear_habitacion(db: AsyncSession, habitacion: HabitacionCreate):
-    db_hab = Habitacion(**habitacion.dict())
-    db.add(db_hab)
+    db_hab = await insertar(db, Habitacion, habitacion.dict())
     await db.commit()
-    await db.refresh(db_hab)
+    if indice_disponibilidad.HABILITADO:
+        indice_disponibilidad.indice.registrar_habitacion(db_hab)
     return db_hab
 
+def estado_actual():
+    """
+    Estado de hoy de cada habitación, calculado en la misma consulta: el estado fijado por
+    el personal si la sacó de la venta; si no, 'ocupada' cuando una reserva activa cubre hoy.
+    """
+    hoy = func.current_date()
+    ocupada_hoy = (
+        select(Reserva.id)
+        .where(
+            Reserva.habitacion_id == Habitacion.id,
+            Reserva.estado == "reservada",
+            Reserva.fecha_inicio <= hoy,
+            Reserva.fecha_fin > hoy,
+        )
+        .exists()
+    )
+    return case(
+        (Habitacion.estado.not_in(ESTADOS_OCUPACION), Habitacion.estado),
+        (ocupada_hoy, "ocupada"),
+        else_="disponible",
+    )
+
+async def _con_estado_actual(db: AsyncSession, query):
+    """Ejecuta `query` (select de Habitacion) y adjunta estado_actual a cada habitación"""
+    result = await db.execute(query.add_columns(estado_actual().label("estado_actual")))
+    habitaciones = []
+    for habitacion, actual in result.all():
+        habitacion.estado_actual = actual
+        habitaciones.append(habitacion)
+    return habitaciones
+
+async def refrescar_estados(db: AsyncSession) -> int:
+    """
+    Guarda en habitaciones.estado el estado de hoy con un solo UPDATE masivo.
+    Solo toca las habitaciones que cambian y nunca las que el personal sacó de la venta.
+    Devuelve cuántas habitaciones se actualizaron.
+    """
+    nuevo = estado_actual()
+    result = await db.execute(
+        update(Habitacion)
+        .where(Habitacion.estado.in_(ESTADOS_OCUPACION), Habitacion.estado != nuevo)
+        .values(estado=nuevo)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
 async def obtener_habitaciones(db: AsyncSession):
-    result = await db.execute(select(Habitacion))
-    return result.scalars().all()
+    return await _con_estado_actual(db, select(Habitacion))
+
+
+async def obtener_habitaciones_disponibles(
+    db: AsyncSession,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo: Optional[str] = None
+):
+    """
+    Habitaciones libres en [fecha_inicio, fecha_fin) resueltas en una sola consulta (anti-join).
+    Las retenciones vigentes de otros checkouts también cuentan como ocupación.
+    """
+    indice = indice_disponibilidad.indice
+    if indice_disponibilidad.HABILITADO and indice.cubre(fecha_inicio):
+        # El índice no guarda retenciones (duran minutos): se descartan con una consulta aparte
+        retenidas = await obtener_habitaciones_retenidas(db, fecha_inicio, fecha_fin)
+        return [
+            hab for hab in indice.habitaciones_disponibles(fecha_inicio, fecha_fin, tipo)
+            if hab.id not in retenidas
+        ]
+
+    # Dos estancias se solapan si cada una empieza antes de que termine la otra
+    conflicto = (
+        select(Reserva.id)
+        .where(
+            Reserva.habitacion_id == Habitacion.id,
+            Reserva.estado == "reservada",
+            Reserva.fecha_inicio < fecha_fin,
+            Reserva.fecha_fin > fecha_inicio,
+        )
+        .exists()
+    )
+    retenida = retenciones_cruzadas(Habitacion.id, fecha_inicio, fecha_fin)
+    query = select(Habitacion).where(Habitacion.estado.in_(ESTADOS_OCUPACION), ~conflicto, ~retenida)
+    if tipo:
+        query = query.where(Habitacion.tipo == tipo)
+    return await _con_estado_actual(db, query.order_by(Habitacion.numero))
 
 
 async def obtener_habitacion_por_id(db: AsyncSession, habitacion_id: int):
-    result = await db.execute(select(Habitacion).where(Habitacion.id == habitacion_id))
-    return result.scalar_one_or_none()
+    habitaciones = await _con_estado_actual(db, select(Habitacion).where(Habitacion.id == habitacion_id))
+    return habitaciones[0] if habitaciones else None
 
 async def actualizar_estado_habitacion(db: AsyncSession, habitacion_id: int, nuevo_estado: str):
-    result = await db.execute(select(Habitacion).where(Habitacion.id == habitacion_id))
-    habitacion = result.scalar_one_or_none()
+    habitacion = await actualizar(db, Habitacion, habitacion_id, {"estado": nuevo_estado})
     if habitacion:
-        habitacion.estado = nuevo_estado
         await db.commit()
-        await db.refresh(habitacion)
+        if indice_disponibilidad.HABILITADO:
+            indice_disponibilidad.indice.registrar_habitacion(habitacion)
     return habitacion
 
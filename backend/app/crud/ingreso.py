@@ -1,16 +1,48 @@
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.ingreso import Ingreso
+from app.models.reserva import Reserva
+from app.crud.escritura import insertar, insertar_varios
 from app.schemas.ingreso import IngresoCreate
+from app.services import listados
+from datetime import date
+from typing import List, Optional
+
+# Máximo de ingresos aceptados en un solo lote
+LOTE_MAXIMO = 10000
 
 async def crear_ingreso(db: AsyncSession, ingreso: IngresoCreate):
-    db_ingreso = Ingreso(**ingreso.dict())
-    db.add(db_ingreso)
+    db_ingreso = await insertar(db, Ingreso, ingreso.dict())
     await db.commit()
-    await db.refresh(db_ingreso)
     return db_ingreso
 
-async def obtener_ingresos(db: AsyncSession):
-    result = await db.execute(select(Ingreso))
-    return result.scalars().all()
+async def crear_ingresos_lote(db: AsyncSession, ingresos: List[IngresoCreate]) -> List[int]:
+    """
+    Alta de todo el lote en una sola transacción; devuelve los ids en el orden recibido.
+    Las reservas se verifican antes con una sola consulta: si alguna no existe no se crea
+    ningún ingreso y se devuelve el error de cada uno por su índice.
+    """
+    reserva_ids = {i.reserva_id for i in ingresos}
+    # FOR KEY SHARE (el mismo bloqueo que toma la clave foránea): no las pueden borrar
+    # entre la verificación y el INSERT
+    result = await db.execute(
+        select(Reserva.id).where(Reserva.id.in_(reserva_ids)).with_for_update(read=True, key_share=True)
+    )
+    faltantes = reserva_ids - set(result.scalars().all())
+    if faltantes:
+        raise HTTPException(status_code=400, detail={
+            "mensaje": "El lote no se creó; corrija los ingresos con error.",
+            "errores": [
+                {"indice": i, "detalle": "Reserva no encontrada."}
+                for i, ingreso in enumerate(ingresos) if ingreso.reserva_id in faltantes
+            ],
+        })
+
+    ids = await insertar_varios(db, Ingreso, [i.model_dump() for i in ingresos])
+    await db.commit()
+    return ids
 
+def recorrer_ingresos(db: AsyncSession, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """Ingresos del período por tandas, desde un cursor del servidor (ver app/services/listados.py)"""
+    return listados.recorrer(db, Ingreso, Ingreso.fecha, fecha_inicio, fecha_fin)
@@ -0,0 +1,33 @@
+"""
+Cursores opacos para la paginación por llave (keyset).
+
+En lugar de OFFSET, cada página pide las filas que vienen después de la última
+llave de ordenamiento vista (p. ej. (fecha_inicio, id)). Con un índice sobre esa
+llave, la página 1 y la página 10.000 cuestan lo mismo.
+"""
+import base64
+import json
+from datetime import date
+from fastapi import HTTPException
+
+# Tamaño de página por defecto y máximo de los listados paginados
+PAGINA_POR_DEFECTO = 50
+PAGINA_MAXIMA = 500
+
+def codificar_cursor(*valores) -> str:
+    """Empaqueta la llave de la última fila en un texto apto para URL"""
+    crudo = json.dumps([v.isoformat() if isinstance(v, date) else v for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str, tipos: tuple) -> tuple:
+    """
+    Recupera la llave de un cursor; `tipos` convierte cada posición (p. ej. (date.fromisoformat, int)).
+    Un cursor alterado o de otro listado responde 400.
+    """
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(valores, list) or len(valores) != len(tipos):
+            raise ValueError(cursor)
+        return tuple(tipo(valor) for tipo, valor in zip(tipos, valores))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
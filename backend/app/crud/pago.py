@@ -1,15 +1,55 @@
+from sqlalchemy import insert, literal, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models.factura import Factura
 from app.models.pago import Pago
+from app.crud.factura import ANULADA, estado_segun_pagos, pagado_factura
 from app.schemas.pago import PagoCreate
-from sqlalchemy.future import select
+from app.services import listados
+from datetime import date
+from typing import Optional
+
+async def crear_pago(db: AsyncSession, pago: PagoCreate) -> Optional[Pago]:
+    """
+    Registra el pago y salda la factura en la misma transacción; devuelve None si la
+    factura no existe. La fila de la factura se bloquea primero, así dos pagos
+    simultáneos de la misma factura se suman uno después del otro y el segundo ve el
+    primero al decidir si la factura quedó pagada.
+    """
+    # INSERT ... SELECT ... FOR UPDATE: bloquea la factura e inserta el pago en una sola
+    # sentencia; si la factura no existe no se inserta nada
+    datos = pago.model_dump()
+    result = await db.execute(
+        insert(Pago)
+        .from_select(
+            list(datos),
+            select(*(Factura.id if campo == "factura_id" else literal(valor, Pago.__table__.c[campo].type)
+                     for campo, valor in datos.items()))
+            .where(Factura.id == pago.factura_id)
+            .with_for_update(),
+        )
+        .returning(Pago)
+    )
+    db_pago = result.scalar_one_or_none()
+    if db_pago is None:
+        await db.rollback()
+        return None
 
-async def crear_pago(db: AsyncSession, pago: PagoCreate):
-    db_pago = Pago(**pago.dict())
-    db.add(db_pago)
+    # Sentencia aparte: si hubo que esperar el bloqueo, ya ve los pagos del que lo tenía
+    nuevo = estado_segun_pagos(pagado_factura())
+    await db.execute(
+        update(Factura)
+        .where(
+            Factura.id == pago.factura_id,
+            Factura.estado.is_distinct_from(ANULADA),
+            Factura.estado.is_distinct_from(nuevo),
+        )
+        .values(estado=nuevo)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
-    await db.refresh(db_pago)
     return db_pago
 
-async def obtener_pagos(db: AsyncSession):
-    result = await db.execute(select(Pago))
-    return result.scalars().all()
\ No newline at end of file
+def recorrer_pagos(db: AsyncSession, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """Pagos del período por tandas, desde un cursor del servidor (ver app/services/listados.py)"""
+    return listados.recorrer(db, Pago, Pago.fecha_pago, fecha_inicio, fecha_fin)
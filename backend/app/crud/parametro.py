@@ -1,10 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
+from sqlalchemy import delete, func
 from app.models.parametro import Parametro
-from app.schemas.parametro import ParametroCreate, ParametroUpdate
+from app.schemas.parametro import Parametro as ParametroSchema, ParametroCreate, ParametroUpdate
+from app.crud.escritura import insertar, actualizar
+from app.services.cache_parametros import cache, CANAL
 from typing import List, Optional
 
+async def _avisar_cambio(db: AsyncSession, clave: str) -> None:
+    """NOTIFY dentro de la transacción: los demás workers solo se enteran si se confirma"""
+    await db.execute(select(func.pg_notify(CANAL, clave)))
+
+async def _confirmar_cambio(db: AsyncSession) -> None:
+    await db.commit()
+    # Este worker no espera su propio aviso: hasta recargar, las lecturas van a la base
+    cache.invalidar()
+
 async def get_parametro(db: AsyncSession, parametro_id: int) -> Optional[Parametro]:
     """Obtener un parámetro por ID"""
     result = await db.execute(
@@ -12,13 +23,23 @@ async def get_parametro(db: AsyncSession, parametro_id: int) -> Optional[Paramet
     )
     return result.scalar_one_or_none()
 
-async def get_parametro_by_clave(db: AsyncSession, clave: str) -> Optional[Parametro]:
-    """Obtener un parámetro por clave"""
+async def get_parametro_by_clave(db: AsyncSession, clave: str, usar_cache: bool = True) -> Optional[Parametro]:
+    """Obtener un parámetro por clave (de la caché si está vigente)"""
+    if usar_cache and cache.valida:
+        return cache.obtener(clave)
     result = await db.execute(
         select(Parametro).where(Parametro.clave == clave)
     )
     return result.scalar_one_or_none()
 
+async def get_parametros_by_claves(db: AsyncSession, claves: List[str]) -> List[ParametroSchema]:
+    """Varios parámetros por clave, en el orden pedido; las claves inexistentes se omiten"""
+    if cache.valida:
+        return cache.obtener_varias(claves)
+    result = await db.execute(select(Parametro).where(Parametro.clave.in_(claves)))
+    por_clave = {p.clave: p for p in result.scalars().all()}
+    return [por_clave[c] for c in claves if c in por_clave]
+
 async def get_parametros(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Parametro]:
     """Obtener lista de parámetros con paginación"""
     result = await db.execute(
@@ -26,42 +47,37 @@ async def get_parametros(db: AsyncSession, skip: int = 0, limit: int = 100) -> L
     )
     return result.scalars().all()
 
-async def create_parametro(db: AsyncSession, parametro: ParametroCreate) -> Parametro:
-    """Crear un nuevo parámetro"""
-    db_parametro = Parametro(**parametro.model_dump())
-    db.add(db_parametro)
-    await db.commit()
-    await db.refresh(db_parametro)
+async def create_parametro(db: AsyncSession, parametro: ParametroCreate) -> Optional[Parametro]:
+    """Crear un nuevo parámetro; devuelve None si la clave ya existe"""
+    db_parametro = await insertar(db, Parametro, parametro.model_dump(), conflicto=[Parametro.clave])
+    if not db_parametro:
+        await db.rollback()
+        return None
+    await _avisar_cambio(db, db_parametro.clave)
+    await _confirmar_cambio(db)
     return db_parametro
 
 async def update_parametro(db: AsyncSession, parametro_id: int, parametro_data: ParametroUpdate) -> Optional[Parametro]:
     """Actualizar un parámetro existente"""
-    # Verificar que existe
-    parametro = await get_parametro(db, parametro_id)
-    if not parametro:
-        return None
-    
-    # Actualizar solo los campos que no son None
+    # Actualizar solo los campos enviados; sin cambios basta con leerlo
     update_data = parametro_data.model_dump(exclude_unset=True)
-    if update_data:
-        await db.execute(
-            update(Parametro)
-            .where(Parametro.id == parametro_id)
-            .values(**update_data)
-        )
-        await db.commit()
-        await db.refresh(parametro)
-    
+    if not update_data:
+        return await get_parametro(db, parametro_id)
+
+    parametro = await actualizar(db, Parametro, parametro_id, update_data)
+    if parametro:
+        await _avisar_cambio(db, parametro.clave)
+        await _confirmar_cambio(db)
     return parametro
 
 async def delete_parametro(db: AsyncSession, parametro_id: int) -> bool:
     """Eliminar un parámetro"""
-    parametro = await get_parametro(db, parametro_id)
-    if not parametro:
-        return False
-    
-    await db.execute(
-        delete(Parametro).where(Parametro.id == parametro_id)
+    result = await db.execute(
+        delete(Parametro).where(Parametro.id == parametro_id).returning(Parametro.clave)
     )
-    await db.commit()
+    clave = result.scalar_one_or_none()
+    if clave is None:
+        return False
+    await _avisar_cambio(db, clave)
+    await _confirmar_cambio(db)
     return True
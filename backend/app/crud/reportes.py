@@ -1,8 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, func, text
+from sqlalchemy import and_, func, literal, text, Date, Numeric
 from app.models.reportes import VistaLibroDiario, VistaRegistroHuespedes, VistaRegistroOcupacion
 from app.models.habitacion import Habitacion
+from app.models.cliente import Cliente
+from app.models.factura import Factura
+from app.models.pago import Pago
+from app.models.reserva import Reserva
+from app.crud.factura import ANULADA
+from app.services import listados
 from app.schemas.reportes import (
     LibroDiarioSchema, 
     RegistroHuespedesSchema, 
@@ -219,4 +225,64 @@ async def obtener_estadisticas_ocupacion(
         porcentaje_ocupacion=round(porcentaje_ocupacion, 2),
         periodo=periodo
     )
-    
\ No newline at end of file
+    
+
+
+def consulta_antiguedad_saldos(fecha_corte: date):
+    """
+    Antigüedad de saldos por cobrar al `fecha_corte`: una fila por cliente con lo que
+    debe repartido por días desde la emisión (0-30, 31-60, 61-90, más de 90), el total
+    y su porcentaje sobre todo lo adeudado. Una sola consulta agregada:
+    - los pagos se suman por factura en una pasada (GROUP BY) y solo cuentan los
+      registrados hasta el corte, así el reporte de una fecha pasada no cambia;
+    - cada factura no anulada emitida hasta el corte aporta su saldo a su cliente,
+      a través de la reserva (las facturas sin reserva no tienen cliente);
+    - los tramos son sumas con FILTER y el porcentaje usa el total general como
+      función de ventana (SUM(...) OVER ()), sin otra consulta.
+    Ordenadas de mayor a menor deuda.
+    """
+    pagado = (
+        select(Pago.factura_id, func.sum(Pago.monto).label("pagado"))
+        .where(Pago.fecha_pago <= fecha_corte)
+        .group_by(Pago.factura_id)
+        .subquery()
+    )
+    saldos = (
+        select(
+            Reserva.cliente_id,
+            (literal(fecha_corte, Date) - Factura.fecha_emision).label("dias"),
+            (Factura.total - func.coalesce(pagado.c.pagado, 0)).label("saldo"),
+        )
+        .join(Reserva, Reserva.id == Factura.reserva_id)
+        .outerjoin(pagado, pagado.c.factura_id == Factura.id)
+        .where(Factura.estado.is_distinct_from(ANULADA), Factura.fecha_emision <= fecha_corte)
+        .subquery()
+    )
+
+    def tramo(condicion):
+        return func.coalesce(func.sum(saldos.c.saldo).filter(condicion), 0)
+
+    # Numeric sin precisión: la división no debe convertir el total general a NUMERIC(10, 2)
+    total = func.sum(saldos.c.saldo, type_=Numeric())
+    return (
+        select(
+            Cliente.id.label("cliente_id"),
+            Cliente.nombre,
+            Cliente.documento_identidad,
+            tramo(saldos.c.dias <= 30).label("dias_0_30"),
+            tramo(saldos.c.dias.between(31, 60)).label("dias_31_60"),
+            tramo(saldos.c.dias.between(61, 90)).label("dias_61_90"),
+            tramo(saldos.c.dias > 90).label("dias_mas_90"),
+            total.label("total"),
+            func.round(100 * total / func.sum(total).over(), 2).label("porcentaje"),
+        )
+        .join(saldos, saldos.c.cliente_id == Cliente.id)
+        .where(saldos.c.saldo > 0)
+        .group_by(Cliente.id)
+        .order_by(total.desc(), Cliente.id)
+    )
+
+
+def recorrer_antiguedad_saldos(db: AsyncSession, fecha_corte: date):
+    """Antigüedad de saldos por tandas, desde un cursor del servidor (ver app/services/listados.py)"""
+    return listados.recorrer_consulta(db, consulta_antiguedad_saldos(fecha_corte))
@@ -1,51 +1,389 @@
-from sqlalchemy import and_, or_
+import asyncio
+import base64
+import logging
+import os
+import random
+import numpy as np
+from sqlalchemy import and_, column, delete, func, insert, literal, tuple_, union_all, values, Date, Integer, String
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.reserva import Reserva
-from app.models.habitacion import Habitacion
+from app.models.habitacion import Habitacion, ESTADOS_OCUPACION
+from app.models.retencion import Retencion
 from app.schemas.reserva import ReservaCreate
+from app.crud.escritura import insertar
+from app.crud.retencion import retencion_vigente, retenciones_cruzadas
+from app.crud.paginacion import codificar_cursor, decodificar_cursor, PAGINA_POR_DEFECTO
+from app.services import indice_disponibilidad
 from fastapi import HTTPException
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
 
-async def crear_reserva(db: AsyncSession, reserva: ReservaCreate):
+logger = logging.getLogger(__name__)
+
+# SQLSTATE de PostgreSQL para una violación de restricción de exclusión
+EXCLUSION_VIOLATION = "23P01"
+# SQLSTATE que indican que la transacción puede repetirse tal cual
+SERIALIZATION_FAILURE = "40001"
+DEADLOCK_DETECTED = "40P01"
+
+# Cómo se coordinan dos peticiones que reservan la misma habitación:
+# - "optimista": sin bloqueos; la restricción reservas_sin_solapamiento decide al confirmar
+# - "bloqueo":   SELECT ... FOR UPDATE sobre la fila de la habitación
+# - "advisory":  pg_advisory_xact_lock con la llave (ESPACIO_BLOQUEO_HABITACION, habitacion_id)
+MODOS_CONCURRENCIA = ("optimista", "bloqueo", "advisory")
+MODO_CONCURRENCIA = os.getenv("RESERVAS_MODO_CONCURRENCIA", "optimista").lower()
+if MODO_CONCURRENCIA not in MODOS_CONCURRENCIA:
+    raise RuntimeError(f"RESERVAS_MODO_CONCURRENCIA debe ser uno de {MODOS_CONCURRENCIA}")
+
+# Primer entero de la llave de los advisory locks de reservas (el segundo es la habitación)
+ESPACIO_BLOQUEO_HABITACION = 1
+
+# Reintentos ante fallas de serialización o deadlocks, con espera exponencial acotada
+REINTENTOS_MAXIMOS = int(os.getenv("RESERVAS_REINTENTOS", "3"))
+ESPERA_BASE = 0.02
+ESPERA_MAXIMA = 0.5
+
+def es_solapamiento(error: IntegrityError) -> bool:
+    """Indica si el error proviene de la restricción reservas_sin_solapamiento"""
+    return getattr(error.orig, "sqlstate", None) == EXCLUSION_VIOLATION
+
+def es_reintentable(error: DBAPIError) -> bool:
+    """Indica si PostgreSQL abortó la transacción por concurrencia y vale la pena repetirla"""
+    return getattr(error.orig, "sqlstate", None) in (SERIALIZATION_FAILURE, DEADLOCK_DETECTED)
+
+def _espera_reintento(intento: int) -> float:
+    # Exponencial con jitter para que los reintentos no vuelvan a chocar todos juntos
+    return min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** intento) * random.uniform(0.5, 1)
+
+async def crear_reserva(db: AsyncSession, reserva: ReservaCreate, modo: str = None):
     # 1. Verificar fechas
     if reserva.fecha_inicio >= reserva.fecha_fin:
         raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin.")
 
-    # 2. Verificar disponibilidad de la habitación
-    hab_result = await db.execute(select(Habitacion).where(Habitacion.id == reserva.habitacion_id))
+    modo = modo or MODO_CONCURRENCIA
+    for intento in range(REINTENTOS_MAXIMOS + 1):
+        try:
+            nueva_reserva = await _intentar_reserva(db, reserva, modo)
+            break
+        except HTTPException:
+            # Suelta el bloqueo de la habitación (modos bloqueo y advisory)
+            await db.rollback()
+            raise
+        except DBAPIError as e:
+            await db.rollback()
+            if es_solapamiento(e):
+                raise HTTPException(status_code=400, detail="Ya existe una reserva para esa habitación en el rango de fechas.")
+            if not es_reintentable(e) or intento == REINTENTOS_MAXIMOS:
+                raise
+            logger.warning(f"Reintentando reserva de la habitación {reserva.habitacion_id} "
+                           f"({e.orig.sqlstate}, intento {intento + 1})")
+            await asyncio.sleep(_espera_reintento(intento))
+
+    if indice_disponibilidad.HABILITADO:
+        indice_disponibilidad.indice.registrar_reserva(nueva_reserva)
+    return nueva_reserva
+
+async def _intentar_reserva(db: AsyncSession, reserva: ReservaCreate, modo: str):
+    """Una transacción completa de crear_reserva; si falla por concurrencia se repite desde cero"""
+    # 2. Verificar disponibilidad de la habitación. Siempre se bloquea su fila: FOR UPDATE en
+    #    modo bloqueo y FOR SHARE en los demás, que no frena a otras reservas pero sí espera a
+    #    una retención en curso (crear_retencion la toma FOR UPDATE) y viceversa
+    if modo == "advisory":
+        await db.execute(select(func.pg_advisory_xact_lock(ESPACIO_BLOQUEO_HABITACION, reserva.habitacion_id)))
+    hab_result = await db.execute(
+        select(Habitacion).where(Habitacion.id == reserva.habitacion_id)
+        .with_for_update(read=modo != "bloqueo")
+    )
     habitacion = hab_result.scalar_one_or_none()
     if not habitacion:
         raise HTTPException(status_code=404, detail="Habitación no encontrada.")
-    if habitacion.estado != "disponible":
+    # Las retenciones se revisan en otra sentencia, después del bloqueo, para ver lo que
+    # confirmó quien lo tenía (la foto de una consulta que esperó un bloqueo es anterior)
+    retenida = await db.scalar(select(retenciones_cruzadas(
+        reserva.habitacion_id, reserva.fecha_inicio, reserva.fecha_fin
+    )))
+    if habitacion.estado not in ESTADOS_OCUPACION:
         raise HTTPException(status_code=400, detail="La habitación no está disponible.")
+    if retenida:
+        raise HTTPException(status_code=400, detail="La habitación está retenida en esas fechas por otro checkout.")
 
-    # 3. Verificar conflictos de fechas
-    result = await db.execute(
-        select(Reserva).where(
-            Reserva.habitacion_id == reserva.habitacion_id,
-            Reserva.estado == "reservada",
-            or_(
-                and_(Reserva.fecha_inicio <= reserva.fecha_inicio, Reserva.fecha_fin > reserva.fecha_inicio),
-                and_(Reserva.fecha_inicio < reserva.fecha_fin, Reserva.fecha_fin >= reserva.fecha_fin),
-                and_(Reserva.fecha_inicio >= reserva.fecha_inicio, Reserva.fecha_fin <= reserva.fecha_fin),
-            )
+    # 3. Crear reserva. Los cruces de fechas los rechaza PostgreSQL con la restricción
+    #    reservas_sin_solapamiento, así dos peticiones simultáneas no pueden reservar lo mismo.
+    #    La fila de la habitación no se modifica: su estado de hoy se calcula (estado_actual)
+    nueva_reserva = await insertar(db, Reserva, reserva.dict())
+    await db.commit()
+    return nueva_reserva
+
+# Máximo de reservas aceptadas en un solo lote
+LOTE_MAXIMO = 500
+# Máximo de días que abarca el calendario de ocupación
+CALENDARIO_MAXIMO_DIAS = 366
+
+def _cruces_en_lote(reservas: List[ReservaCreate]) -> dict:
+    """Reservas del lote que se cruzan con otra del mismo lote: {indice: indice_anterior}"""
+    cruces = {}
+    orden = sorted(range(len(reservas)), key=lambda i: (reservas[i].habitacion_id, reservas[i].fecha_inicio))
+    anterior = None
+    for i in orden:
+        r = reservas[i]
+        if anterior is not None and reservas[anterior].habitacion_id == r.habitacion_id \
+                and reservas[anterior].fecha_fin > r.fecha_inicio:
+            cruces[i] = anterior
+            # La que termina más tarde es la que puede seguir cruzándose
+            if r.fecha_fin <= reservas[anterior].fecha_fin:
+                continue
+        anterior = i
+    return cruces
+
+async def crear_reservas_lote(db: AsyncSession, reservas: List[ReservaCreate]):
+    """Crear un bloque de reservas en una sola transacción: se crean todas o ninguna"""
+    errores = {}
+
+    # 1. Verificar fechas
+    for i, r in enumerate(reservas):
+        if r.fecha_inicio >= r.fecha_fin:
+            errores[i] = "La fecha de inicio debe ser anterior a la fecha de fin."
+
+    # 2. Verificar habitaciones con una sola consulta
+    ids_habitacion = {r.habitacion_id for r in reservas}
+    #    (FOR SHARE, en orden, para no cruzarse con una retención que se esté creando)
+    hab_result = await db.execute(
+        select(Habitacion).where(Habitacion.id.in_(ids_habitacion))
+        .order_by(Habitacion.id).with_for_update(read=True)
+    )
+    habitaciones = {h.id: h for h in hab_result.scalars().all()}
+    for i, r in enumerate(reservas):
+        habitacion = habitaciones.get(r.habitacion_id)
+        if not habitacion:
+            errores.setdefault(i, "Habitación no encontrada.")
+        elif habitacion.estado not in ESTADOS_OCUPACION:
+            errores.setdefault(i, "La habitación no está disponible.")
+
+    # 3. Verificar conflictos de todo el lote con una sola consulta (VALUES unido a reservas)
+    validas = [i for i in range(len(reservas)) if i not in errores]
+    if validas:
+        solicitadas = values(
+            column("indice", Integer), column("habitacion_id", Integer),
+            column("fecha_inicio", Date), column("fecha_fin", Date),
+            name="solicitadas",
+        ).data([(i, reservas[i].habitacion_id, reservas[i].fecha_inicio, reservas[i].fecha_fin) for i in validas])
+        con_reserva = (
+            select(solicitadas.c.indice, literal("reserva", String).label("motivo"))
+            .select_from(solicitadas)
+            .join(Reserva, and_(
+                Reserva.habitacion_id == solicitadas.c.habitacion_id,
+                Reserva.estado == "reservada",
+                Reserva.fecha_inicio < solicitadas.c.fecha_fin,
+                Reserva.fecha_fin > solicitadas.c.fecha_inicio,
+            ))
         )
+        con_retencion = (
+            select(solicitadas.c.indice, literal("retencion", String).label("motivo"))
+            .select_from(solicitadas)
+            .join(Retencion, and_(
+                Retencion.habitacion_id == solicitadas.c.habitacion_id,
+                retencion_vigente(),
+                Retencion.fecha_inicio < solicitadas.c.fecha_fin,
+                Retencion.fecha_fin > solicitadas.c.fecha_inicio,
+            ))
+        )
+        result = await db.execute(union_all(con_reserva, con_retencion))
+        for i, motivo in result.all():
+            if motivo == "reserva":
+                errores[i] = "Ya existe una reserva para esa habitación en el rango de fechas."
+            else:
+                errores.setdefault(i, "La habitación está retenida en esas fechas por otro checkout.")
+        for i, anterior in _cruces_en_lote([reservas[i] for i in validas]).items():
+            errores.setdefault(validas[i], f"Se cruza con la reserva {validas[anterior]} del mismo lote.")
+
+    if errores:
+        raise HTTPException(status_code=400, detail={
+            "mensaje": "El lote no se creó; corrija las reservas con error.",
+            "errores": [{"indice": i, "detalle": errores[i]} for i in sorted(errores)],
+        })
+
+    # 4. Un solo INSERT de varias filas con RETURNING, en el mismo orden del lote
+    try:
+        result = await db.execute(
+            insert(Reserva).returning(Reserva, sort_by_parameter_order=True),
+            [r.model_dump() for r in reservas],
+        )
+        nuevas = result.scalars().all()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if es_solapamiento(e):
+            # Otra petición reservó alguna de estas fechas entre la verificación y el INSERT
+            raise HTTPException(status_code=400, detail={
+                "mensaje": "Ya existe una reserva para esa habitación en el rango de fechas.",
+                "errores": [],
+            })
+        raise
+
+    if indice_disponibilidad.HABILITADO:
+        for nueva in nuevas:
+            indice_disponibilidad.indice.registrar_reserva(nueva)
+    return nuevas
+
+async def confirmar_retencion(db: AsyncSession, retencion_id: int):
+    """
+    Convierte una retención vigente en reserva en un solo paso: la retención se borra y la
+    reserva se inserta con la misma sentencia (CTE con DELETE ... RETURNING), así no puede
+    vencer ni confirmarse dos veces en medio. Devuelve None si no existe o ya venció.
+    """
+    retenida = (
+        delete(Retencion)
+        .where(Retencion.id == retencion_id, retencion_vigente())
+        .returning(Retencion.cliente_id, Retencion.habitacion_id, Retencion.fecha_inicio, Retencion.fecha_fin)
+        .cte("retenida")
     )
-    conflictos = result.scalars().all()
-    if conflictos:
-        raise HTTPException(status_code=400, detail="Ya existe una reserva para esa habitación en el rango de fechas.")
-
-    # 4. Crear reserva
-    nueva_reserva = Reserva(**reserva.dict())
-    db.add(nueva_reserva)
-    habitacion.estado = "ocupada"
-    await db.commit()
-    await db.refresh(nueva_reserva)
+    columnas = ["cliente_id", "habitacion_id", "fecha_inicio", "fecha_fin"]
+    try:
+        result = await db.execute(
+            insert(Reserva)
+            .from_select(columnas, select(*(retenida.c[c] for c in columnas)))
+            .add_cte(retenida)
+            .returning(Reserva)
+        )
+        nueva_reserva = result.scalar_one_or_none()
+        if not nueva_reserva:
+            await db.rollback()
+            return None
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if es_solapamiento(e):
+            raise HTTPException(status_code=400, detail="Ya existe una reserva para esa habitación en el rango de fechas.")
+        raise
+    if indice_disponibilidad.HABILITADO:
+        indice_disponibilidad.indice.registrar_reserva(nueva_reserva)
     return nueva_reserva
 
-async def obtener_reservas(db: AsyncSession):
-    result = await db.execute(select(Reserva))
-    return result.scalars().all()
+def _matriz_ocupacion(desde: date, dias: int, habitaciones: list, estancias: list, formato: str = "tramos") -> dict:
+    """
+    Arma la matriz habitación x día con NumPy y la devuelve compacta.
+    habitaciones: [(id, numero, tipo)]; estancias: [(fila, fecha_inicio, fecha_fin)].
+    Una noche d está ocupada si fecha_inicio <= d < fecha_fin.
+    formato "tramos": [[dia_inicio, cantidad_de_dias], ...] por habitación;
+    formato "bitmap": un bit por día (el más significativo es `desde`) en base64.
+    """
+    n = len(habitaciones)
+    # Arreglo de diferencias: +1 donde empieza una estancia y -1 donde termina; la suma acumulada
+    # por fila marca los días ocupados sin recorrer día por día
+    diferencias = np.zeros((n, dias + 1), dtype=np.int32)
+    if estancias:
+        filas = np.fromiter((e[0] for e in estancias), dtype=np.int64, count=len(estancias))
+        origen = np.datetime64(desde, "D")
+        inicios = np.array([e[1] for e in estancias], dtype="datetime64[D]") - origen
+        fines = np.array([e[2] for e in estancias], dtype="datetime64[D]") - origen
+        inicios = np.clip(inicios.astype(np.int64), 0, dias)
+        fines = np.clip(fines.astype(np.int64), 0, dias)
+        np.add.at(diferencias, (filas, inicios), 1)
+        np.add.at(diferencias, (filas, fines), -1)
+    ocupado = np.cumsum(diferencias[:, :dias], axis=1) > 0
+
+    if formato == "bitmap":
+        ocupacion = [base64.b64encode(fila.tobytes()).decode("ascii") for fila in np.packbits(ocupado, axis=1)]
+    else:
+        # Codificación por tramos: [dia_inicio, cantidad_de_dias] por cada bloque ocupado
+        bordes = np.diff(np.pad(ocupado.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        arranques = np.argwhere(bordes == 1)
+        finales = np.argwhere(bordes == -1)[:, 1]
+        ocupacion = [[] for _ in range(n)]
+        for (fila, inicio), fin in zip(arranques.tolist(), finales.tolist()):
+            ocupacion[fila].append([inicio, fin - inicio])
+
+    tipos = sorted({tipo for _, _, tipo in habitaciones})
+    posicion_tipo = np.array([tipos.index(tipo) for _, _, tipo in habitaciones], dtype=np.int64)
+    por_tipo = np.zeros((len(tipos), dias), dtype=np.int64)
+    np.add.at(por_tipo, posicion_tipo, ocupado)
+
+    return {
+        "desde": desde,
+        "hasta": desde + timedelta(days=dias - 1),
+        "dias": dias,
+        "formato": formato,
+        "habitaciones": [
+            {"id": id, "numero": numero, "tipo": tipo, "ocupacion": ocupacion[fila]}
+            for fila, (id, numero, tipo) in enumerate(habitaciones)
+        ],
+        "ocupadas_por_tipo": {tipo: por_tipo[i].tolist() for i, tipo in enumerate(tipos)},
+        "ocupadas_total": ocupado.sum(axis=0).tolist(),
+    }
+
+async def obtener_calendario(db: AsyncSession, desde: date, hasta: date, formato: str = "tramos") -> dict:
+    """Ocupación habitación x día entre `desde` y `hasta` (ambos incluidos) con una sola consulta"""
+    dias = (hasta - desde).days + 1
+    limite = hasta + timedelta(days=1)
+    indice = indice_disponibilidad.indice
+    if indice_disponibilidad.HABILITADO and indice.cubre(desde):
+        habitaciones = sorted(((h.id, h.numero, h.tipo) for h in indice.habitaciones()), key=lambda h: h[1])
+        estancias = [
+            (fila, inicio, fin)
+            for fila, (id, _, _) in enumerate(habitaciones)
+            for inicio, fin in indice.estancias_entre(id, desde, limite)
+        ]
+        return _matriz_ocupacion(desde, dias, habitaciones, estancias, formato)
+
+    result = await db.execute(
+        select(Habitacion.id, Habitacion.numero, Habitacion.tipo, Reserva.fecha_inicio, Reserva.fecha_fin)
+        .outerjoin(Reserva, and_(
+            Reserva.habitacion_id == Habitacion.id,
+            Reserva.estado == "reservada",
+            Reserva.fecha_inicio < limite,
+            Reserva.fecha_fin > desde,
+        ))
+        .order_by(Habitacion.numero, Habitacion.id)
+    )
+    habitaciones, estancias, filas = [], [], {}
+    for id, numero, tipo, fecha_inicio, fecha_fin in result.all():
+        if id not in filas:
+            filas[id] = len(habitaciones)
+            habitaciones.append((id, numero, tipo))
+        if fecha_inicio is not None:
+            estancias.append((filas[id], fecha_inicio, fecha_fin))
+    return _matriz_ocupacion(desde, dias, habitaciones, estancias, formato)
+
+async def obtener_reservas(
+    db: AsyncSession,
+    cliente_id: Optional[int] = None,
+    habitacion_id: Optional[int] = None,
+    estado: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    limite: int = PAGINA_POR_DEFECTO,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Reserva], Optional[str]]:
+    """
+    Una página de reservas ordenadas por (fecha_inicio, id), con filtros opcionales.
+    `desde`/`hasta` acotan la fecha de inicio (ambos incluidos). Devuelve las reservas y el
+    cursor de la página siguiente (None si no hay más).
+    """
+    query = select(Reserva)
+    if cliente_id is not None:
+        query = query.where(Reserva.cliente_id == cliente_id)
+    if habitacion_id is not None:
+        query = query.where(Reserva.habitacion_id == habitacion_id)
+    if estado:
+        query = query.where(Reserva.estado == estado)
+    if desde:
+        query = query.where(Reserva.fecha_inicio >= desde)
+    if hasta:
+        query = query.where(Reserva.fecha_inicio <= hasta)
+    if cursor:
+        ultima = decodificar_cursor(cursor, (date.fromisoformat, int))
+        # Comparación de filas: usa el índice (…, fecha_inicio, id) en lugar de saltar con OFFSET
+        query = query.where(tuple_(Reserva.fecha_inicio, Reserva.id) > ultima)
+
+    # Se pide una fila de más solo para saber si existe otra página
+    result = await db.execute(query.order_by(Reserva.fecha_inicio, Reserva.id).limit(limite + 1))
+    reservas = result.scalars().all()
+    if len(reservas) <= limite:
+        return reservas, None
+    reservas = reservas[:limite]
+    return reservas, codificar_cursor(reservas[-1].fecha_inicio, reservas[-1].id)
 
 async def cancelar_reserva(db: AsyncSession, reserva_id: int):
     # Obtener la reserva
@@ -58,26 +396,10 @@ async def cancelar_reserva(db: AsyncSession, reserva_id: int):
     if reserva.estado == "cancelada":
         raise HTTPException(status_code=400, detail="La reserva ya está cancelada")
 
-    # Cancelar la reserva
+    # Cancelar la reserva: el estado de la habitación se deriva de sus reservas activas
     reserva.estado = "cancelada"
     await db.commit()
 
-    # Verificar si hay otras reservas activas para la misma habitación
-    result = await db.execute(
-        select(Reserva).where(
-            Reserva.habitacion_id == reserva.habitacion_id,
-            Reserva.estado == "reservada"
-        )
-    )
-    reservas_activas = result.scalars().all()
-
-    # Si no hay más reservas activas, marcar la habitación como disponible
-    if not reservas_activas:
-        hab_result = await db.execute(select(Habitacion).where(Habitacion.id == reserva.habitacion_id))
-        habitacion = hab_result.scalar_one_or_none()
-        if habitacion:
-            habitacion.estado = "disponible"
-            await db.commit()
-
-    await db.refresh(reserva)
+    if indice_disponibilidad.HABILITADO:
+        indice_disponibilidad.indice.quitar_reserva(reserva.id)
     return reserva
\ No newline at end of file
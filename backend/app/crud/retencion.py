@@ -0,0 +1,102 @@
+import os
+from datetime import date, timedelta
+from sqlalchemy import delete, func, or_
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.models.habitacion import Habitacion, ESTADOS_OCUPACION
+from app.models.reserva import Reserva
+from app.models.retencion import Retencion
+from app.schemas.retencion import RetencionCreate
+from app.crud.escritura import insertar
+
+# Minutos que dura una retención desde que se crea
+RETENCION_MINUTOS = int(os.getenv("RETENCION_MINUTOS", "15"))
+
+def retencion_vigente():
+    # Se compara contra el reloj de PostgreSQL, igual que al calcular expira_en
+    return Retencion.expira_en > func.now()
+
+def retenciones_cruzadas(habitacion_id, fecha_inicio, fecha_fin):
+    """
+    EXISTS de retenciones vigentes de la habitación que se cruzan con [fecha_inicio, fecha_fin).
+    `habitacion_id` puede ser un valor o una columna (subconsulta correlacionada).
+    """
+    return (
+        select(Retencion.id)
+        .where(
+            Retencion.habitacion_id == habitacion_id,
+            retencion_vigente(),
+            Retencion.fecha_inicio < fecha_fin,
+            Retencion.fecha_fin > fecha_inicio,
+        )
+        .exists()
+    )
+
+async def obtener_habitaciones_retenidas(db: AsyncSession, fecha_inicio: date, fecha_fin: date) -> set:
+    """Ids de las habitaciones con alguna retención vigente en [fecha_inicio, fecha_fin)"""
+    result = await db.execute(
+        select(Retencion.habitacion_id).distinct().where(
+            retencion_vigente(),
+            Retencion.fecha_inicio < fecha_fin,
+            Retencion.fecha_fin > fecha_inicio,
+        )
+    )
+    return set(result.scalars().all())
+
+async def crear_retencion(db: AsyncSession, retencion: RetencionCreate):
+    if retencion.fecha_inicio >= retencion.fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin.")
+
+    # La fila de la habitación queda bloqueada (FOR UPDATE) hasta el commit: dos checkouts
+    # simultáneos no pueden retener las mismas fechas, y las reservas, que la toman FOR SHARE,
+    # esperan a que la retención se confirme antes de revisar si la habitación está retenida
+    result = await db.execute(
+        select(Habitacion).where(Habitacion.id == retencion.habitacion_id).with_for_update()
+    )
+    habitacion = result.scalar_one_or_none()
+    if not habitacion:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Habitación no encontrada.")
+
+    # Los cruces se revisan después del bloqueo, en otra sentencia, para ver lo que confirmó
+    # quien lo tenía (la foto de una consulta que esperó un bloqueo es anterior a la espera)
+    reserva_cruzada = (
+        select(Reserva.id)
+        .where(
+            Reserva.habitacion_id == retencion.habitacion_id,
+            Reserva.estado == "reservada",
+            Reserva.fecha_inicio < retencion.fecha_fin,
+            Reserva.fecha_fin > retencion.fecha_inicio,
+        )
+        .exists()
+    )
+    ocupada = await db.scalar(select(or_(
+        reserva_cruzada,
+        retenciones_cruzadas(retencion.habitacion_id, retencion.fecha_inicio, retencion.fecha_fin),
+    )))
+    if habitacion.estado not in ESTADOS_OCUPACION or ocupada:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="La habitación no está disponible en esas fechas.")
+
+    nueva = await insertar(db, Retencion, {
+        **retencion.model_dump(),
+        "expira_en": func.now() + timedelta(minutes=RETENCION_MINUTOS),
+    })
+    await db.commit()
+    return nueva
+
+async def liberar_retencion(db: AsyncSession, retencion_id: int) -> bool:
+    """El cliente abandonó el checkout: la habitación vuelve a estar disponible de inmediato"""
+    result = await db.execute(
+        delete(Retencion).where(Retencion.id == retencion_id).returning(Retencion.id)
+    )
+    eliminada = result.scalar_one_or_none()
+    await db.commit()
+    return eliminada is not None
+
+async def purgar_retenciones_vencidas(db: AsyncSession) -> int:
+    """Borra de una vez todas las retenciones vencidas; devuelve cuántas se borraron"""
+    result = await db.execute(delete(Retencion).where(Retencion.expira_en <= func.now()))
+    await db.commit()
+    return result.rowcount
@@ -2,25 +2,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.usuario import Usuario
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate
-import bcrypt
+from app.crud.escritura import insertar, actualizar
+from app.services.contrasenas import hashear
 
-def hash_password(password: str) -> str:
-    """Hashear contraseña usando bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verificar contraseña usando bcrypt"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def crear_usuario(db: AsyncSession, data: UsuarioCreate) -> Usuario | None:
+    """Crear usuario; devuelve None si el correo ya está registrado"""
+    # Un correo repetido se descarta antes de hashear: el bcrypt es lo caro y ocupa
+    # un lugar del pool de contraseñas. ON CONFLICT sigue cubriendo dos altas simultáneas
+    existe = await db.scalar(select(select(Usuario.id).where(Usuario.correo == data.correo).exists()))
+    if existe:
+        return None
 
-async def crear_usuario(db: AsyncSession, data: UsuarioCreate) -> Usuario:
-    # Hashear la contraseña antes de crear el usuario
     usuario_data = data.model_dump()
-    usuario_data['contraseña'] = hash_password(usuario_data['contraseña'])
-    
-    nuevo_usuario = Usuario(**usuario_data)
-    db.add(nuevo_usuario)
+    usuario_data['contraseña'] = await hashear(usuario_data['contraseña'])
+
+    nuevo_usuario = await insertar(db, Usuario, usuario_data, conflicto=[Usuario.correo])
     await db.commit()
-    await db.refresh(nuevo_usuario)
     return nuevo_usuario
 
 async def obtener_usuario(db: AsyncSession, usuario_id: int) -> Usuario | None:
@@ -52,17 +49,9 @@ async def actualizar_usuario(db: AsyncSession, usuario_id: int, data: UsuarioUpd
     Actualizar usuario usando UsuarioUpdate (campos opcionales)
     Solo actualiza los campos que se proporcionan
     """
-    usuario = await obtener_usuario(db, usuario_id)
-    if not usuario:
-        return None
-    
     # Obtener solo los campos que tienen valor (exclude_unset=True excluye campos no enviados)
     update_data = data.model_dump(exclude_unset=True, exclude_none=True)
     
-    # Si no hay datos para actualizar, devolver el usuario actual
-    if not update_data:
-        return usuario
-    
     # CRÍTICO: Filtrar contraseña vacía antes de procesar
     if 'contraseña' in update_data:
         if not update_data['contraseña'] or update_data['contraseña'].strip() == '':
@@ -70,16 +59,14 @@ async def actualizar_usuario(db: AsyncSession, usuario_id: int, data: UsuarioUpd
             del update_data['contraseña']
         else:
             # Solo hashear si hay contraseña válida
-            update_data['contraseña'] = hash_password(update_data['contraseña'])
+            update_data['contraseña'] = await hashear(update_data['contraseña'])
     
-    # Si después de filtrar no hay datos, devolver usuario actual
+    # Si no hay datos para actualizar, devolver el usuario actual
     if not update_data:
-        return usuario
-    
-    # Actualizar solo los campos proporcionados
-    for field, value in update_data.items():
-        setattr(usuario, field, value)
+        return await obtener_usuario(db, usuario_id)
     
-    await db.commit()
-    await db.refresh(usuario)
+    # Actualizar solo los campos proporcionados (UPDATE ... RETURNING)
+    usuario = await actualizar(db, Usuario, usuario_id, update_data)
+    if usuario:
+        await db.commit()
     return usuario
\ No newline at end of file
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import text
 import os
 from dotenv import load_dotenv
 from typing import AsyncGenerator
@@ -19,6 +20,15 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+# Extensiones de PostgreSQL que necesitan las restricciones e índices de los modelos
+EXTENSIONES = ("btree_gist", "pg_trgm")
+
+async def crear_esquema(conn) -> None:
+    """Instala las extensiones requeridas y crea las tablas que no existan"""
+    for extension in EXTENSIONES:
+        await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+    await conn.run_sync(Base.metadata.create_all)
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
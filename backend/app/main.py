@@ -1,7 +1,9 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import habitacion, cliente, reserva, ingresos, egresos,usuario,cuenta,parametro,reportes , facturas, pagos
+from app.database import engine, crear_esquema, AsyncSessionLocal
+from app.services import cache_parametros, conciliacion_facturas, estado_habitaciones, indice_disponibilidad, retenciones
+from app.routers import habitacion, cliente, reserva, ingresos, egresos,usuario,cuenta,parametro,reportes , facturas, pagos, auth
 
 app = FastAPI(title="Sistema de Reservas de Hoteles")
 
@@ -21,6 +23,7 @@ app.add_middleware(
     allow_credentials=True,             
     allow_methods=["*"],                
     allow_headers=["*"],                
+    expose_headers=["X-Siguiente-Cursor"],  # cursor de los listados paginados
 )
 
 
@@ -28,7 +31,33 @@ app.add_middleware(
 async def on_startup():
     # Crea las tablas que declares en tus modelos (si no existen)
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await crear_esquema(conn)
+
+    # Índice de disponibilidad en memoria (opcional, INDICE_DISPONIBILIDAD=1)
+    if indice_disponibilidad.HABILITADO:
+        async with AsyncSessionLocal() as db:
+            await indice_disponibilidad.indice.cargar(db)
+        app.state.resync_disponibilidad = asyncio.create_task(
+            indice_disponibilidad.mantener_sincronizado(AsyncSessionLocal)
+        )
+
+    # Caché de parámetros: se carga al escuchar y se invalida en todos los workers con NOTIFY
+    app.state.cache_parametros = asyncio.create_task(
+        cache_parametros.escuchar_cambios(engine, AsyncSessionLocal)
+    )
+
+    # Purga en bloque de las retenciones de checkout vencidas
+    app.state.purga_retenciones = asyncio.create_task(retenciones.purgar_periodicamente(AsyncSessionLocal))
+
+    # Estado guardado de las habitaciones (ocupada/disponible) recalculado en bloque cada día
+    app.state.estado_habitaciones = asyncio.create_task(
+        estado_habitaciones.refrescar_diariamente(AsyncSessionLocal)
+    )
+
+    # Estado de las facturas (pagada/pendiente) conciliado en bloque con sus pagos
+    app.state.conciliacion_facturas = asyncio.create_task(
+        conciliacion_facturas.conciliar_periodicamente(AsyncSessionLocal)
+    )
 
 # ============= RUTAS =============
 @app.get("/",tags=["Bienvenida"])
@@ -36,6 +65,7 @@ async def root():
     return {"mensaje": "¡Bienvenido al Sistema de Reservas!"}
 
 # Incluir todos los routers
+app.include_router(auth.router)
 app.include_router(usuario.router)
 app.include_router(cuenta.router)
 app.include_router(parametro.router)    
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -13,4 +13,15 @@ class Cliente(Base):
     correo = Column(String(100))
     telefono = Column(String(20))
 
-    reservas = relationship("Reserva", back_populates="cliente")
\ No newline at end of file
+    reservas = relationship("Reserva", back_populates="cliente")
+
+    __table_args__ = (
+        # Listado paginado por (nombre, id)
+        Index("idx_clientes_nombre_id", "nombre", "id"),
+        # Búsquedas ILIKE '%texto%' (requieren pg_trgm)
+        *(
+            Index(f"idx_clientes_{columna}_trgm", columna,
+                  postgresql_using="gin", postgresql_ops={columna: "gin_trgm_ops"})
+            for columna in ("nombre", "documento_identidad", "correo", "telefono")
+        ),
+    )
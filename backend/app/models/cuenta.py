@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from app.database import Base
 
 class Cuenta(Base):
@@ -8,4 +8,9 @@ class Cuenta(Base):
     codigo = Column(String(10), nullable=False, unique=True)  
     nombre = Column(String(100), nullable=False)  
     tipo = Column(String(20), nullable=False)     
-    nivel = Column(Integer, nullable=False)
\ No newline at end of file
+    nivel = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Subárboles del plan de cuentas (codigo LIKE '11%') sin importar la collation de la base
+        Index("idx_cuentas_codigo_prefijo", "codigo", postgresql_ops={"codigo": "text_pattern_ops"}),
+    )
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, Date, Numeric, String, ForeignKey
+from sqlalchemy import Column, Integer, Date, Numeric, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -12,4 +12,12 @@ class Factura(Base):
     total = Column(Numeric(10, 2), nullable=False)
     estado = Column(String(20), default="pendiente")
 
-    pagos = relationship("Pago", back_populates="factura")
\ No newline at end of file
+    reserva = relationship("Reserva", back_populates="facturas")
+    pagos = relationship("Pago", back_populates="factura")
+
+    __table_args__ = (
+        # Saldos paginados por (fecha_emision, id)
+        Index("idx_facturas_emision_id", "fecha_emision", "id"),
+        # Facturas de un cliente, a través de sus reservas
+        Index("idx_facturas_reserva_id", "reserva_id"),
+    )
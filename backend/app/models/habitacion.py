@@ -2,6 +2,11 @@ from sqlalchemy import Column, Integer, String, Numeric
 from app.database import Base
 from sqlalchemy.orm import relationship
 
+# Estados que solo dependen de las reservas: 'ocupada' lo escribe el refresco diario
+# (services/estado_habitaciones) y no impide reservar otras fechas. Cualquier otro
+# estado ('mantenimiento', ...) lo fija el personal y saca la habitación de la venta.
+ESTADOS_OCUPACION = ("disponible", "ocupada")
+
 class Habitacion(Base):
     __tablename__ = "habitaciones"
 
@@ -9,6 +14,6 @@ class Habitacion(Base):
     numero = Column(String(10), unique=True, nullable=False)
     tipo = Column(String(50), nullable=False)
     precio_noche = Column(Numeric(10, 2), nullable=False)
-    estado = Column(String(20), default="disponible")  # 'disponible', 'ocupada', etc.
+    estado = Column(String(20), default="disponible")  # 'disponible', 'ocupada', 'mantenimiento', etc.
 
     reservas = relationship("Reserva", back_populates="habitacion")
\ No newline at end of file
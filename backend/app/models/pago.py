@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, Numeric, String, ForeignKey
+from sqlalchemy import Column, Integer, Date, Numeric, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -11,4 +11,9 @@ class Pago(Base):
     monto = Column(Numeric(10, 2), nullable=False)
     metodo_pago = Column(String(50), nullable=False)
 
-    factura = relationship("Factura", back_populates="pagos")
\ No newline at end of file
+    factura = relationship("Factura", back_populates="pagos")
+
+    __table_args__ = (
+        # Saldo de cada factura: suma de sus pagos sin recorrer la tabla
+        Index("idx_pagos_factura_id", "factura_id"),
+    )
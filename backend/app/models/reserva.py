@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, String, TIMESTAMP, func
+from sqlalchemy import Column, Integer, ForeignKey, Date, String, TIMESTAMP, Index, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -14,4 +15,23 @@ class Reserva(Base):
     fecha_reserva = Column(TIMESTAMP, server_default=func.now())
 
     habitacion = relationship("Habitacion", back_populates="reservas")
-    cliente = relationship("Cliente", back_populates="reservas")
\ No newline at end of file
+    cliente = relationship("Cliente", back_populates="reservas")
+    facturas = relationship("Factura", back_populates="reserva")
+
+    __table_args__ = (
+        # Búsqueda de disponibilidad: anti-join por habitación y rango de fechas
+        Index("idx_reservas_habitacion_fechas", "habitacion_id", "fecha_inicio", "fecha_fin"),
+        # Listado paginado por (fecha_inicio, id), solo o filtrado por cliente o estado
+        Index("idx_reservas_inicio_id", "fecha_inicio", "id"),
+        Index("idx_reservas_cliente_inicio_id", "cliente_id", "fecha_inicio", "id"),
+        Index("idx_reservas_estado_inicio_id", "estado", "fecha_inicio", "id"),
+        # PostgreSQL impide dos reservas activas de la misma habitación con fechas cruzadas
+        # (daterange es [inicio, fin): salir y entrar el mismo día no es un cruce). Requiere btree_gist.
+        ExcludeConstraint(
+            (habitacion_id, "="),
+            (func.daterange(fecha_inicio, fecha_fin), "&&"),
+            name="reservas_sin_solapamiento",
+            using="gist",
+            where=text("estado = 'reservada'"),
+        ),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, TIMESTAMP, Index, func
+from app.database import Base
+
+class Retencion(Base):
+    """Habitación apartada durante el checkout; deja de contar cuando pasa `expira_en`"""
+    __tablename__ = "retenciones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id"), nullable=False)
+    fecha_inicio = Column(Date, nullable=False)
+    fecha_fin = Column(Date, nullable=False)
+    expira_en = Column(TIMESTAMP, nullable=False)
+    creada_en = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        # Disponibilidad: retenciones vigentes de una habitación en un rango de fechas
+        Index("idx_retenciones_habitacion_fechas", "habitacion_id", "fecha_inicio", "fecha_fin"),
+        # Purga periódica de las vencidas
+        Index("idx_retenciones_expira_en", "expira_en"),
+    )
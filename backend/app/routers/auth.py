@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.auth import LoginIn, TokenOut, SesionOut
+from app.crud import usuario as crud_usuario
+from app.database import get_async_session
+from app.services import contrasenas, tokens
+
+router = APIRouter(tags=["Autenticación"])
+
+bearer = HTTPBearer(auto_error=False)
+
+# Hash de relleno: un correo inexistente cuesta lo mismo que una contraseña incorrecta.
+# Se calcula en el primer login sin usuario (en el pool de contraseñas), no al importar
+_hash_relleno: Optional[str] = None
+
+
+async def _relleno() -> str:
+    global _hash_relleno
+    if _hash_relleno is None:
+        _hash_relleno = await contrasenas.hashear("relleno-sin-usuario")
+    return _hash_relleno
+
+
+async def sesion_actual(credenciales: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
+    """
+    Dependencia para las rutas que requieren sesión: valida el token del encabezado
+    Authorization (firma, vencimiento y revocación) sin consultar la base.
+    """
+    if not credenciales:
+        raise HTTPException(status_code=401, detail="No autenticado", headers={"WWW-Authenticate": "Bearer"})
+    datos = tokens.validar(credenciales.credentials)
+    if not datos:
+        raise HTTPException(status_code=401, detail="Token inválido o vencido", headers={"WWW-Authenticate": "Bearer"})
+    return datos
+
+
+def _fecha(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+@router.post("/auth/login", response_model=TokenOut, tags=["Autenticación"])
+async def login(credenciales: LoginIn, db: AsyncSession = Depends(get_async_session)):
+    """Verifica la contraseña (un solo bcrypt) y entrega un token firmado con el rol del usuario"""
+    usuario = await crud_usuario.obtener_usuario_correo(db, credenciales.correo)
+    valida = await contrasenas.verificar(credenciales.contraseña, usuario.contraseña if usuario else await _relleno())
+    if not usuario or not valida:
+        raise HTTPException(status_code=401, detail="Correo o contraseña incorrectos")
+    token, exp = tokens.emitir(usuario.id, usuario.rol_id)
+    return TokenOut(access_token=token, expira_en=_fecha(exp), usuario_id=usuario.id, rol_id=usuario.rol_id)
+
+
+@router.post("/auth/logout", status_code=204, tags=["Autenticación"])
+async def logout(sesion: dict = Depends(sesion_actual)):
+    """Revoca el token actual: deja de valer aunque no haya vencido"""
+    tokens.revocar(sesion)
+
+
+@router.get("/auth/me", response_model=SesionOut, tags=["Autenticación"])
+async def sesion(sesion: dict = Depends(sesion_actual)):
+    return SesionOut(usuario_id=sesion["sub"], rol_id=sesion["rol"], expira_en=_fecha(sesion["exp"]))
@@ -1,23 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.cliente import ClienteCreate, Cliente
+from app.schemas.cliente import ClienteCreate, Cliente, ClienteResumen, ResultadoImportacion
+from app.services import importacion_clientes
 from app.crud import cliente as crud_cliente
 from app.database import get_async_session
-from typing import List
+from app.crud.paginacion import PAGINA_POR_DEFECTO, PAGINA_MAXIMA
+from typing import List, Literal, Optional
 
 router = APIRouter()
 
 @router.post("/clientes/", response_model=Cliente, tags=["Clientes"])  # Cambié el response_model
 async def create_cliente(cliente: ClienteCreate, db: AsyncSession = Depends(get_async_session)):
-    # Buscar por documento de identidad (no por ID)
-    existente = await crud_cliente.get_cliente_by_documento(db, cliente.documento_identidad)
-    if existente:
+    # El documento de identidad es único: si ya existe, el INSERT no crea nada
+    nuevo = await crud_cliente.create_cliente(db, cliente)
+    if not nuevo:
         raise HTTPException(status_code=400, detail="El cliente ya existe")
-    return await crud_cliente.create_cliente(db, cliente)
+    return nuevo
+
+@router.post("/clientes/importar", response_model=ResultadoImportacion, tags=["Clientes"])
+async def importar_clientes(
+    request: Request,
+    formato: Optional[Literal["csv", "ndjson"]] = Query(
+        None, description="Formato del cuerpo; por defecto se deduce del Content-Type"
+    ),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Importar clientes en bloque (migración de una propiedad). El cuerpo de la petición es el
+    archivo CSV o NDJSON tal cual y se procesa a medida que llega. Los documentos que ya
+    existen se actualizan; las líneas inválidas se cuentan como rechazadas.
+    """
+    if formato is None:
+        tipo = request.headers.get("content-type", "")
+        formato = "ndjson" if "ndjson" in tipo or "jsonl" in tipo else "csv"
+    lector = importacion_clientes.registros_ndjson if formato == "ndjson" else importacion_clientes.registros_csv
+    return await crud_cliente.importar_clientes(db, lector(request.stream()))
 
 @router.get("/clientes/", response_model=List[Cliente], tags=["Clientes"])
-async def listar_clientes(db: AsyncSession = Depends(get_async_session)):
-    return await crud_cliente.list_clientes(db)
+async def listar_clientes(
+    response: Response,
+    nombre: Optional[str] = Query(None, description="Inicio del nombre"),
+    documento: Optional[str] = Query(None, description="Parte del documento de identidad"),
+    correo: Optional[str] = Query(None, description="Parte del correo"),
+    telefono: Optional[str] = Query(None, description="Parte del teléfono"),
+    limite: int = Query(PAGINA_POR_DEFECTO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = Query(None, description="Valor de X-Siguiente-Cursor de la página anterior"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Buscar clientes (sin filtros lista todos), ordenados por nombre y de a `limite` por página.
+    Si hay más resultados, la respuesta trae el encabezado X-Siguiente-Cursor.
+    """
+    clientes, siguiente = await crud_cliente.list_clientes(
+        db, nombre, documento, correo, telefono, limite, cursor
+    )
+    if siguiente:
+        response.headers["X-Siguiente-Cursor"] = siguiente
+    return clientes
 
 @router.get("/clientes/{cliente_id}", response_model=Cliente, tags=["Clientes"])
 async def get_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_session)):  # Cambié el nombre de la función
@@ -26,6 +65,14 @@ async def get_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_sess
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     return cliente
 
+@router.get("/clientes/{cliente_id}/resumen", response_model=ClienteResumen, tags=["Clientes"])
+async def get_cliente_resumen(cliente_id: int, db: AsyncSession = Depends(get_async_session)):
+    """Vista 360 para recepción: el cliente con sus reservas, facturas y pagos en una sola llamada"""
+    cliente = await crud_cliente.get_cliente_resumen(db, cliente_id)
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+    return cliente
+
 @router.put("/clientes/{cliente_id}", response_model=Cliente, tags=["Clientes"])
 async def update_cliente(cliente_id: int, cliente: ClienteCreate, db: AsyncSession = Depends(get_async_session)):
     updated_cliente = await crud_cliente.update_cliente(db, cliente_id, cliente)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query,Path
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.cuenta import CuentaCreate, CuentaUpdate, Cuenta
+from app.schemas.cuenta import CuentaCreate, CuentaUpdate, Cuenta, CuentaNodo
 from app.crud import cuenta as crud_cuenta
 from app.database import get_async_session
 from typing import List, Optional, Literal
@@ -11,12 +11,19 @@ router = APIRouter(tags=["Cuentas"])
 @router.post("/cuentas/", response_model=Cuenta, tags=["Cuentas"])
 async def crear_cuenta(cuenta: CuentaCreate, db: AsyncSession = Depends(get_async_session)):
     """Crear una nueva cuenta"""
-    # Verificar que no exista una cuenta con el mismo código
-    existente = await crud_cuenta.obtener_cuenta_por_codigo(db, cuenta.codigo)
-    if existente:
+    # El código es único: si ya existe, el INSERT no crea nada
+    nueva = await crud_cuenta.crear_cuenta(db, cuenta)
+    if not nueva:
         raise HTTPException(status_code=400, detail="Ya existe una cuenta con ese código")
-    
-    return await crud_cuenta.crear_cuenta(db, cuenta)
+    return nueva
+
+@router.get("/cuentas/arbol", response_model=List[CuentaNodo], tags=["Cuentas"])
+async def obtener_arbol_cuentas(
+    prefijo: Optional[str] = Query(None, min_length=1, max_length=20, description="Solo el subárbol de estos códigos, ej. 11"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Plan de cuentas jerárquico: cada cuenta cuelga de la de código más largo que sea prefijo del suyo"""
+    return await crud_cuenta.obtener_arbol(db, prefijo)
 
 @router.get("/cuentas/{cuenta_id}", response_model=Cuenta, tags=["Cuentas"])
 async def obtener_cuenta(cuenta_id: int, db: AsyncSession = Depends(get_async_session)):
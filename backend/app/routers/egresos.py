@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
 from app.schemas.egreso import EgresoCreate, EgresoRead
 from app.crud import egreso as crud_egreso
-from typing import List
+from app.services import listados
+from datetime import date
+from typing import List, Optional
 
 router = APIRouter(prefix="/egresos", tags=["Egresos"])
 
@@ -11,6 +13,31 @@ router = APIRouter(prefix="/egresos", tags=["Egresos"])
 async def crear_egreso(egreso: EgresoCreate, db: AsyncSession = Depends(get_async_session)):
     return await crud_egreso.crear_egreso(db, egreso)
 
+@router.post("/lote", response_model=List[int])
+async def crear_egresos_lote(egresos: List[EgresoCreate], db: AsyncSession = Depends(get_async_session)):
+    """
+    Cargar un lote de egresos (cierre del día) en una sola transacción.
+    Devuelve los ids creados en el mismo orden; si alguno falla no se crea ninguno.
+    """
+    if not egresos:
+        raise HTTPException(status_code=400, detail="El lote está vacío.")
+    if len(egresos) > crud_egreso.LOTE_MAXIMO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El lote no puede tener más de {crud_egreso.LOTE_MAXIMO} egresos."
+        )
+    return await crud_egreso.crear_egresos_lote(db, egresos)
+
 @router.get("/", response_model=List[EgresoRead])
-async def listar_egresos(db: AsyncSession = Depends(get_async_session)):
-    return await crud_egreso.obtener_egresos(db)
+async def listar_egresos(
+    fecha_inicio: Optional[date] = Query(None, description="Desde esta fecha (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Hasta esta fecha (inclusive)"),
+    formato: listados.Formato = Query("json", description="json: un arreglo; ndjson: uno por línea; csv"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Listar egresos en orden de id. La respuesta se envía por partes a medida que se lee
+    de la base, así que no hay límite de filas ni se arma la lista entera en memoria.
+    """
+    listados.validar_periodo(fecha_inicio, fecha_fin)
+    return listados.respuesta_en_flujo(crud_egreso.recorrer_egresos(db, fecha_inicio, fecha_fin), EgresoRead, formato)
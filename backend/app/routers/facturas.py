@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.factura import FacturaCreate, FacturaOut
+from app.schemas.factura import FacturaCreate, FacturaOut, FacturaSaldo, ResultadoFacturacion
 from app.crud import factura as crud_factura
+from app.crud.paginacion import PAGINA_POR_DEFECTO, PAGINA_MAXIMA
+from app.services import facturas_pdf
 from app.database import get_async_session
-from typing import List
+from datetime import date
+from typing import List, Optional
 
 router = APIRouter(tags=["Facturas"])
 
@@ -11,6 +14,84 @@ router = APIRouter(tags=["Facturas"])
 async def crear_factura(factura: FacturaCreate, db: AsyncSession = Depends(get_async_session)):
     return await crud_factura.crear_factura(db, factura)
 
+@router.post("/facturas/generar", response_model=ResultadoFacturacion)
+async def generar_facturas(
+    hasta: Optional[date] = Query(None, description="Fecha de salida máxima (incluida); por defecto hoy"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Facturar de una vez todas las reservas terminadas (no canceladas) hasta `hasta` que
+    todavía no tienen factura. El total es noches × precio por noche de la habitación.
+    Se puede repetir sin duplicar facturas.
+    """
+    generadas, total = await crud_factura.generar_facturas(db, hasta or date.today())
+    return ResultadoFacturacion(generadas=generadas, total=total)
+
 @router.get("/facturas", response_model=List[FacturaOut])
 async def listar_facturas(db: AsyncSession = Depends(get_async_session)):
-    return await crud_factura.obtener_facturas(db)
\ No newline at end of file
+    return await crud_factura.obtener_facturas(db)
+
+@router.get("/facturas/saldos", response_model=List[FacturaSaldo])
+async def listar_saldos(
+    response: Response,
+    estado: Optional[str] = Query(None, description="pendiente, pagada, anulada"),
+    desde: Optional[date] = Query(None, description="Fecha de emisión mínima (incluida)"),
+    hasta: Optional[date] = Query(None, description="Fecha de emisión máxima (incluida)"),
+    cliente_id: Optional[int] = Query(None),
+    con_saldo: bool = Query(False, description="Solo las facturas con saldo por pagar"),
+    limite: int = Query(PAGINA_POR_DEFECTO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = Query(None, description="Valor de X-Siguiente-Cursor de la página anterior"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Total, pagado y saldo de cada factura, ordenadas por fecha de emisión, de a `limite`
+    por página. Si hay más resultados, la respuesta trae el encabezado X-Siguiente-Cursor;
+    se pasa como `cursor` (con los mismos filtros) para pedir la página siguiente.
+    """
+    if desde and hasta and desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser mayor que la fecha de fin")
+    saldos, siguiente = await crud_factura.obtener_saldos(
+        db, estado, desde, hasta, cliente_id, con_saldo, limite, cursor
+    )
+    if siguiente:
+        response.headers["X-Siguiente-Cursor"] = siguiente
+    return saldos
+
+@router.get("/facturas/{factura_id}/pdf")
+async def factura_pdf(factura_id: int, db: AsyncSession = Depends(get_async_session)):
+    """
+    PDF de la factura. Se genera en un pool de procesos (no frena el servidor) y queda
+    guardado en disco hasta que cambien sus datos o sus pagos.
+    """
+    datos = await crud_factura.obtener_datos_pdf(db, [factura_id])
+    if factura_id not in datos:
+        raise HTTPException(status_code=404, detail="Factura no encontrada")
+    pdf = await facturas_pdf.obtener_pdf(datos[factura_id])
+    return Response(
+        pdf, media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="factura_{factura_id}.pdf"'},
+    )
+
+@router.post("/facturas/pdf-lote")
+async def facturas_pdf_lote(ids: List[int], db: AsyncSession = Depends(get_async_session)):
+    """
+    ZIP con el PDF de cada factura pedida (factura_<id>.pdf). Solo se generan las que no
+    están guardadas o cambiaron; si alguna no existe no se genera nada.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="El lote está vacío.")
+    if len(ids) > facturas_pdf.LOTE_MAXIMO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El lote no puede tener más de {facturas_pdf.LOTE_MAXIMO} facturas."
+        )
+    datos = await crud_factura.obtener_datos_pdf(db, ids)
+    faltan = [i for i in ids if i not in datos]
+    if faltan:
+        raise HTTPException(status_code=404, detail=f"Facturas no encontradas: {faltan}")
+    contenido = await facturas_pdf.zip_de_facturas([datos[i] for i in ids])
+    return Response(
+        contenido, media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="facturas.zip"'},
+    )
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.habitacion import HabitacionCreate, HabitacionOut
 from app.crud import habitacion as crud_habitacion
 from app.database import get_async_session
 
-from typing import List
+from typing import List, Optional
+from datetime import date
 
 router = APIRouter()
 
@@ -16,6 +17,18 @@ async def crear_habitacion(habitacion: HabitacionCreate, db: AsyncSession = Depe
 async def listar_habitaciones(db: AsyncSession = Depends(get_async_session)):
     return await crud_habitacion.obtener_habitaciones(db)
 
+@router.get("/habitaciones/disponibles", response_model=List[HabitacionOut], tags=["Habitaciones"])
+async def listar_habitaciones_disponibles(
+    fecha_inicio: date = Query(..., description="Fecha de entrada"),
+    fecha_fin: date = Query(..., description="Fecha de salida"),
+    tipo: Optional[str] = Query(None, description="Tipo de habitación: simple, doble, suite..."),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Habitaciones sin reservas que se crucen con el rango de fechas"""
+    if fecha_inicio >= fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin.")
+    return await crud_habitacion.obtener_habitaciones_disponibles(db, fecha_inicio, fecha_fin, tipo)
+
 @router.get("/habitaciones/{habitacion_id}", response_model=HabitacionOut, tags=["Habitaciones"])
 async def obtener_habitacion(habitacion_id: int, db: AsyncSession = Depends(get_async_session)):
     habitacion = await crud_habitacion.obtener_habitacion_por_id(db, habitacion_id)
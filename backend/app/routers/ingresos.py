@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_async_session
 from app.schemas.ingreso import IngresoCreate, IngresoRead
 from app.crud import ingreso as crud_ingreso
-from typing import List
+from app.services import listados
+from datetime import date
+from typing import List, Optional
 
 router = APIRouter(prefix="/ingresos", tags=["Ingresos"])
 
@@ -11,6 +13,31 @@ router = APIRouter(prefix="/ingresos", tags=["Ingresos"])
 async def crear_ingreso(ingreso: IngresoCreate, db: AsyncSession = Depends(get_async_session)):
     return await crud_ingreso.crear_ingreso(db, ingreso)
 
+@router.post("/lote", response_model=List[int])
+async def crear_ingresos_lote(ingresos: List[IngresoCreate], db: AsyncSession = Depends(get_async_session)):
+    """
+    Cargar un lote de ingresos (cierre del día) en una sola transacción.
+    Devuelve los ids creados en el mismo orden; si alguno falla no se crea ninguno.
+    """
+    if not ingresos:
+        raise HTTPException(status_code=400, detail="El lote está vacío.")
+    if len(ingresos) > crud_ingreso.LOTE_MAXIMO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El lote no puede tener más de {crud_ingreso.LOTE_MAXIMO} ingresos."
+        )
+    return await crud_ingreso.crear_ingresos_lote(db, ingresos)
+
 @router.get("/", response_model=List[IngresoRead])
-async def listar_ingresos(db: AsyncSession = Depends(get_async_session)):
-    return await crud_ingreso.obtener_ingresos(db)
+async def listar_ingresos(
+    fecha_inicio: Optional[date] = Query(None, description="Desde esta fecha (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Hasta esta fecha (inclusive)"),
+    formato: listados.Formato = Query("json", description="json: un arreglo; ndjson: uno por línea; csv"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Listar ingresos en orden de id. La respuesta se envía por partes a medida que se lee
+    de la base, así que no hay límite de filas ni se arma la lista entera en memoria.
+    """
+    listados.validar_periodo(fecha_inicio, fecha_fin)
+    return listados.respuesta_en_flujo(crud_ingreso.recorrer_ingresos(db, fecha_inicio, fecha_fin), IngresoRead, formato)
@@ -1,16 +1,32 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.pago import PagoCreate, PagoOut
 from app.crud import pago as crud_pago
 from app.database import get_async_session
-from typing import List
+from app.services import listados
+from datetime import date
+from typing import List, Optional
 
 router = APIRouter(tags=["Pagos"])
 
 @router.post("/pagos", response_model=PagoOut)
 async def crear_pago(pago: PagoCreate, db: AsyncSession = Depends(get_async_session)):
-    return await crud_pago.crear_pago(db, pago)
+    """Registrar un pago; si con él se cubre el total, la factura pasa a 'pagada'"""
+    nuevo = await crud_pago.crear_pago(db, pago)
+    if not nuevo:
+        raise HTTPException(status_code=404, detail="Factura no encontrada")
+    return nuevo
 
 @router.get("/pagos", response_model=List[PagoOut])
-async def listar_pagos(db: AsyncSession = Depends(get_async_session)):
-    return await crud_pago.obtener_pagos(db)
\ No newline at end of file
+async def listar_pagos(
+    fecha_inicio: Optional[date] = Query(None, description="Desde esta fecha (inclusive)"),
+    fecha_fin: Optional[date] = Query(None, description="Hasta esta fecha (inclusive)"),
+    formato: listados.Formato = Query("json", description="json: un arreglo; ndjson: uno por línea; csv"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Listar pagos en orden de id. La respuesta se envía por partes a medida que se lee
+    de la base, así que no hay límite de filas ni se arma la lista entera en memoria.
+    """
+    listados.validar_periodo(fecha_inicio, fecha_fin)
+    return listados.respuesta_en_flujo(crud_pago.recorrer_pagos(db, fecha_inicio, fecha_fin), PagoOut, formato)
@@ -17,6 +17,17 @@ async def listar_parametros(
     parametros = await crud_parametro.get_parametros(db, skip=skip, limit=limit)
     return parametros
 
+@router.get("/parametros/claves", response_model=List[ParametroSchema], tags=["Parametros"])
+async def obtener_parametros_por_claves(
+    c: str = Query(..., description="Claves separadas por coma, por ejemplo c=IVA,HORA_CHECKIN"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Obtener varios parámetros por clave (desde la caché en memoria); las claves inexistentes se omiten"""
+    claves = list(dict.fromkeys(clave.strip() for clave in c.split(",") if clave.strip()))
+    if not claves:
+        raise HTTPException(status_code=400, detail="Indique al menos una clave")
+    return await crud_parametro.get_parametros_by_claves(db, claves)
+
 @router.get("/parametros/{parametro_id}", response_model=ParametroSchema, tags=["Parametros"])
 async def obtener_parametro(
     parametro_id: int,
@@ -45,12 +56,11 @@ async def crear_parametro(
     db: AsyncSession = Depends(get_async_session)
 ):
     """Crear un nuevo parámetro"""
-    # Verificar que la clave no exista
-    existente = await crud_parametro.get_parametro_by_clave(db, parametro.clave)
-    if existente:
+    # La clave es única: si ya existe, el INSERT no crea nada
+    nuevo = await crud_parametro.create_parametro(db, parametro)
+    if not nuevo:
         raise HTTPException(status_code=400, detail="Ya existe un parámetro con esa clave")
-    
-    return await crud_parametro.create_parametro(db, parametro)
+    return nuevo
 
 @router.put("/parametros/{parametro_id}", response_model=ParametroSchema, tags=["Parametros"])
 async def actualizar_parametro(
@@ -61,7 +71,7 @@ async def actualizar_parametro(
     """Actualizar un parámetro existente"""
     # Si se está actualizando la clave, verificar que no exista otra con esa clave
     if datos.clave:
-        existente = await crud_parametro.get_parametro_by_clave(db, datos.clave)
+        existente = await crud_parametro.get_parametro_by_clave(db, datos.clave, usar_cache=False)
         if existente and existente.id != parametro_id:
             raise HTTPException(status_code=400, detail="Ya existe un parámetro con esa clave")
     
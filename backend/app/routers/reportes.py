@@ -6,12 +6,14 @@ from app.schemas.reportes import (
     LibroDiarioSchema,
     RegistroHuespedesSchema,
     RegistroOcupacionSchema,
+    AntiguedadSaldoSchema,
     ResumenFinanciero,
     EstadisticasOcupacion,
     DashboardResponse,
     ExportacionResponse
 )
 from app.crud import reportes as crud_reportes
+from app.services import listados
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 import logging
@@ -131,6 +133,27 @@ async def obtener_registro_ocupacion(
         logger.error(f"Error al obtener registro de ocupación: {str(e)}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
+@router.get("/antiguedad-saldos", response_model=List[AntiguedadSaldoSchema])
+async def obtener_antiguedad_saldos(
+    fecha_corte: Optional[date] = Query(None, description="Fecha a la que se calculan los saldos; por defecto hoy"),
+    formato: listados.Formato = Query("json", description="json: un arreglo; ndjson: uno por línea; csv"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Antigüedad de las cuentas por cobrar: saldo pendiente de cada cliente en tramos de
+    0-30, 31-60, 61-90 y más de 90 días desde la emisión de la factura, con el total y
+    su porcentaje sobre toda la deuda. Se calcula en la base con una sola consulta y se
+    envía por partes; con formato=csv se descarga como archivo.
+    """
+    fecha_corte = fecha_corte or date.today()
+    return listados.respuesta_en_flujo(
+        crud_reportes.recorrer_antiguedad_saldos(db, fecha_corte),
+        AntiguedadSaldoSchema,
+        formato,
+        archivo=f"antiguedad_saldos_{fecha_corte.isoformat()}.csv",
+    )
+
+
 from sqlalchemy import text
 
 @router.get("/resumen-financiero-directo")
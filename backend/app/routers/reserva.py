@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
+from datetime import date
 from app.database import get_async_session
-from app.schemas.reserva import ReservaCreate, ReservaRead
+from app.schemas.reserva import ReservaCreate, ReservaRead, CalendarioOcupacion
+from app.schemas.retencion import RetencionCreate, RetencionRead
 from app.crud import reserva as crud_reserva
+from app.crud import retencion as crud_retencion
+from app.crud.paginacion import PAGINA_POR_DEFECTO, PAGINA_MAXIMA
 
 router = APIRouter()
 
@@ -11,9 +15,90 @@ router = APIRouter()
 async def crear_reserva(reserva: ReservaCreate, db: AsyncSession = Depends(get_async_session)):
     return await crud_reserva.crear_reserva(db, reserva)
 
+@router.post("/reservas/lote", response_model=List[ReservaRead], tags=["Reservas"])
+async def crear_reservas_lote(reservas: List[ReservaCreate], db: AsyncSession = Depends(get_async_session)):
+    """
+    Crear un bloque de reservas (grupos, operadores turísticos) de forma atómica.
+    Si alguna falla no se crea ninguna y se devuelve el error de cada reserva por su índice.
+    """
+    if not reservas:
+        raise HTTPException(status_code=400, detail="El lote está vacío.")
+    if len(reservas) > crud_reserva.LOTE_MAXIMO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El lote no puede tener más de {crud_reserva.LOTE_MAXIMO} reservas."
+        )
+    return await crud_reserva.crear_reservas_lote(db, reservas)
+
+@router.post("/reservas/holds", response_model=RetencionRead, tags=["Reservas"])
+async def crear_retencion(retencion: RetencionCreate, db: AsyncSession = Depends(get_async_session)):
+    """
+    Retener una habitación durante el checkout. Mientras no venza (expira_en), nadie más
+    puede reservarla ni retenerla en esas fechas y no aparece en la búsqueda de disponibles.
+    """
+    return await crud_retencion.crear_retencion(db, retencion)
+
+@router.post("/reservas/holds/{retencion_id}/confirmar", response_model=ReservaRead, tags=["Reservas"])
+async def confirmar_retencion(retencion_id: int, db: AsyncSession = Depends(get_async_session)):
+    """Convertir la retención en una reserva (por ejemplo, al aprobarse el pago)"""
+    reserva = await crud_reserva.confirmar_retencion(db, retencion_id)
+    if not reserva:
+        raise HTTPException(status_code=404, detail="Retención no encontrada o vencida")
+    return reserva
+
+@router.delete("/reservas/holds/{retencion_id}", tags=["Reservas"])
+async def liberar_retencion(retencion_id: int, db: AsyncSession = Depends(get_async_session)):
+    liberada = await crud_retencion.liberar_retencion(db, retencion_id)
+    if not liberada:
+        raise HTTPException(status_code=404, detail="Retención no encontrada")
+    return {"mensaje": "Retención liberada"}
+
 @router.get("/reservas/", response_model=List[ReservaRead], tags=["Reservas"])
-async def listar_reservas(db: AsyncSession = Depends(get_async_session)):
-    return await crud_reserva.obtener_reservas(db)
+async def listar_reservas(
+    response: Response,
+    cliente_id: Optional[int] = Query(None),
+    habitacion_id: Optional[int] = Query(None),
+    estado: Optional[str] = Query(None, description="reservada, cancelada, completada"),
+    desde: Optional[date] = Query(None, description="Fecha de inicio mínima (incluida)"),
+    hasta: Optional[date] = Query(None, description="Fecha de inicio máxima (incluida)"),
+    limite: int = Query(PAGINA_POR_DEFECTO, ge=1, le=PAGINA_MAXIMA),
+    cursor: Optional[str] = Query(None, description="Valor de X-Siguiente-Cursor de la página anterior"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Reservas ordenadas por fecha de inicio, de a `limite` por página.
+    Si hay más resultados, la respuesta trae el encabezado X-Siguiente-Cursor;
+    se pasa como `cursor` (con los mismos filtros) para pedir la página siguiente.
+    """
+    if desde and hasta and desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser mayor que la fecha de fin")
+    reservas, siguiente = await crud_reserva.obtener_reservas(
+        db, cliente_id, habitacion_id, estado, desde, hasta, limite, cursor
+    )
+    if siguiente:
+        response.headers["X-Siguiente-Cursor"] = siguiente
+    return reservas
+
+@router.get("/reservas/calendario", response_model=CalendarioOcupacion, tags=["Reservas"])
+async def calendario_ocupacion(
+    desde: date = Query(..., description="Primer día del calendario"),
+    hasta: date = Query(..., description="Último día del calendario (incluido)"),
+    formato: Literal["tramos", "bitmap"] = Query("tramos", description="Codificación de la ocupación"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Matriz de ocupación habitación x día para la grilla de calendario.
+    Cada habitación trae sus tramos ocupados [día, cantidad_de_días] (o un bitmap en base64)
+    y se incluye el total de habitaciones ocupadas por día y por tipo.
+    """
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser mayor que la fecha de fin")
+    if (hasta - desde).days >= crud_reserva.CALENDARIO_MAXIMO_DIAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El calendario no puede abarcar más de {crud_reserva.CALENDARIO_MAXIMO_DIAS} días"
+        )
+    return await crud_reserva.obtener_calendario(db, desde, hasta, formato)
 
 @router.put("/reservas/{reserva_id}/cancelar", response_model=ReservaRead, tags=["Reservas"])
 async def cancelar_reserva(reserva_id: int, db: AsyncSession = Depends(get_async_session)):
@@ -10,10 +10,10 @@ router = APIRouter(tags=["Usuarios"])
 
 @router.post("/usuarios/", response_model=Usuario, tags=["Usuarios"])
 async def crear_usuario(usuario: UsuarioCreate, db: AsyncSession = Depends(get_async_session)):
-    existente = await crud_usuario.obtener_usuario_correo(db, usuario.correo)
-    if existente:
+    nuevo = await crud_usuario.crear_usuario(db, usuario)
+    if not nuevo:
         raise HTTPException(status_code=400, detail="El usuario ya existe")
-    return await crud_usuario.crear_usuario(db, usuario)
+    return nuevo
 
 @router.get("/usuarios/", response_model=List[Usuario], tags=["Usuarios"])
 async def listar_usuarios(db: AsyncSession = Depends(get_async_session)):
@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel, EmailStr
+from typing import Optional
+
+class LoginIn(BaseModel):
+    correo: EmailStr
+    contraseña: str
+
+class TokenOut(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expira_en: datetime
+    usuario_id: int
+    rol_id: Optional[int] = None
+
+class SesionOut(BaseModel):
+    """Datos de la sesión leídos del token, sin consultar la base"""
+    usuario_id: int
+    rol_id: Optional[int] = None
+    expira_en: datetime
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from .reserva import ReservaConFacturas
 
 class ClienteBase(BaseModel):
     nombre: str
@@ -16,4 +17,22 @@ class Cliente(ClienteBase):
     #reservas: List[reservas] = []
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ErrorImportacion(BaseModel):
+    linea: int
+    detalle: str
+
+class ResultadoImportacion(BaseModel):
+    insertados: int
+    actualizados: int
+    sin_cambios: int
+    # Documentos repetidos dentro del archivo (se usó la última línea de cada uno)
+    duplicados: int
+    rechazados: int
+    # Muestra de las primeras líneas rechazadas
+    errores: List[ErrorImportacion] = []
+
+class ClienteResumen(Cliente):
+    """Cliente con su historial: reservas, facturas de cada reserva y pagos de cada factura"""
+    reservas: List[ReservaConFacturas] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 class CuentaBase(BaseModel):
     codigo: str = Field(..., min_length=1, max_length=20, description="Codigo de la cuenta")
@@ -21,4 +21,9 @@ class Cuenta(CuentaBase):
     id: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CuentaNodo(Cuenta):
+    """Cuenta dentro del árbol: sus hijas directas y cuántas cuentas cuelgan de ella en total"""
+    descendientes: int = 0
+    hijos: List["CuentaNodo"] = Field(default_factory=list)
@@ -17,4 +17,23 @@ class FacturaOut(FacturaBase):
     pagos: List[PagoOut] = []
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class FacturaSaldo(BaseModel):
+    """Factura con lo pagado y lo que falta pagar, calculados en la base"""
+    id: int
+    reserva_id: Optional[int] = None
+    fecha_emision: date
+    estado: Optional[str] = None
+    total: float
+    pagado: float
+    saldo: float
+
+    class Config:
+        orm_mode = True
+
+class ResultadoFacturacion(BaseModel):
+    """Resumen de una corrida de facturación"""
+    generadas: int
+    total: float
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class HabitacionBase(BaseModel):
     numero: str
@@ -12,6 +13,8 @@ class HabitacionCreate(HabitacionBase):
 
 class HabitacionOut(HabitacionBase):
     id: int
+    # Estado de hoy calculado a partir de las reservas activas (no se guarda)
+    estado_actual: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -45,6 +45,21 @@ class RegistroOcupacionSchema(BaseModel):
     cliente: Optional[str] = None
 
 
+class AntiguedadSaldoSchema(BaseModel):
+    """Saldo por cobrar de un cliente repartido por días desde la emisión de cada factura"""
+    model_config = ConfigDict(from_attributes=True)
+
+    cliente_id: int
+    nombre: str
+    documento_identidad: str
+    dias_0_30: float
+    dias_31_60: float
+    dias_61_90: float
+    dias_mas_90: float
+    total: float
+    porcentaje: float
+
+
 # Esquemas para filtros de reportes
 class FiltroFechas(BaseModel):
     fecha_inicio: Optional[date] = None
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 from datetime import date, datetime
+from typing import Dict, List, Literal, Union
+from .factura import FacturaOut
 
 class ReservaBase(BaseModel):
     cliente_id: int
@@ -16,4 +18,24 @@ class ReservaRead(ReservaBase):
     fecha_reserva: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ReservaConFacturas(ReservaRead):
+    facturas: List[FacturaOut] = []
+
+class CalendarioHabitacion(BaseModel):
+    id: int
+    numero: str
+    tipo: str
+    # "tramos": [[dia, cantidad_de_dias], ...] con el día 0 = `desde`
+    # "bitmap": un bit por día en base64, el bit más significativo del primer byte es `desde`
+    ocupacion: Union[List[List[int]], str]
+
+class CalendarioOcupacion(BaseModel):
+    desde: date
+    hasta: date
+    dias: int
+    formato: Literal["tramos", "bitmap"]
+    habitaciones: List[CalendarioHabitacion]
+    ocupadas_por_tipo: Dict[str, List[int]]
+    ocupadas_total: List[int]
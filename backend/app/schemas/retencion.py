@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+
+class RetencionCreate(BaseModel):
+    cliente_id: int
+    habitacion_id: int
+    fecha_inicio: date
+    fecha_fin: date
+
+class RetencionRead(RetencionCreate):
+    id: int
+    expira_en: datetime
+    creada_en: datetime
+
+    class Config:
+        orm_mode = True
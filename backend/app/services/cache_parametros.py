@@ -0,0 +1,103 @@
+"""
+Caché en memoria de la tabla parametros (tasas, horarios de check-in, etc.).
+
+Cada worker guarda todos los parámetros y los sirve sin ir a la base. La
+invalidación entre workers usa LISTEN/NOTIFY de PostgreSQL:
+- create/update/delete_parametro hacen pg_notify('parametros_cambiados', clave)
+  dentro de su transacción (PostgreSQL solo lo entrega si se confirma) e
+  invalidan la caché local en cuanto confirman, así el mismo worker nunca lee un
+  valor viejo después de escribirlo;
+- cada worker mantiene una conexión propia con LISTEN (escuchar_cambios); con
+  cada aviso invalida y recarga la tabla completa, que es chica;
+- mientras la caché está invalidada las lecturas van a la base;
+- si la conexión de LISTEN se cae, la caché queda invalidada hasta reconectar y
+  recargar; además se recarga cada PARAMETROS_RESYNC segundos por las dudas.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.future import select
+
+from app.models.parametro import Parametro
+from app.schemas.parametro import Parametro as ParametroSchema
+
+logger = logging.getLogger(__name__)
+
+CANAL = "parametros_cambiados"
+INTERVALO_RESYNC = float(os.getenv("PARAMETROS_RESYNC", "300"))
+ESPERA_RECONEXION = 5.0
+
+
+class CacheParametros:
+    def __init__(self):
+        self._por_clave: Dict[str, ParametroSchema] = {}
+        self._valida = False
+        # Sube con cada invalidación: una recarga que empezó antes no marca la caché como válida
+        self._version = 0
+
+    @property
+    def valida(self) -> bool:
+        return self._valida
+
+    def invalidar(self) -> None:
+        self._version += 1
+        self._valida = False
+
+    async def cargar(self, db) -> None:
+        version = self._version
+        result = await db.execute(select(Parametro))
+        por_clave = {p.clave: ParametroSchema.model_validate(p) for p in result.scalars().all()}
+        if version == self._version:
+            self._por_clave = por_clave
+            self._valida = True
+
+    def obtener(self, clave: str) -> Optional[ParametroSchema]:
+        return self._por_clave.get(clave)
+
+    def obtener_varias(self, claves: Iterable[str]) -> List[ParametroSchema]:
+        return [self._por_clave[c] for c in claves if c in self._por_clave]
+
+
+cache = CacheParametros()
+
+
+async def escuchar_cambios(engine, sesiones, cache: CacheParametros = cache,
+                           intervalo: float = INTERVALO_RESYNC) -> None:
+    """Tarea de fondo: LISTEN en una conexión propia y recarga de la caché con cada aviso"""
+    cambios = asyncio.Event()
+
+    def avisar(*_):
+        cache.invalidar()
+        cambios.set()
+
+    while True:
+        try:
+            async with engine.connect() as conn:
+                escucha = (await conn.get_raw_connection()).driver_connection
+                await escucha.add_listener(CANAL, avisar)
+                escucha.add_termination_listener(avisar)
+                try:
+                    # Lo que haya cambiado antes de empezar a escuchar entra con esta carga
+                    async with sesiones() as db:
+                        await cache.cargar(db)
+                    while not escucha.is_closed():
+                        try:
+                            await asyncio.wait_for(cambios.wait(), timeout=intervalo)
+                        except asyncio.TimeoutError:
+                            pass
+                        cambios.clear()
+                        async with sesiones() as db:
+                            await cache.cargar(db)
+                finally:
+                    # La conexión vuelve al pool: que no siga escuchando
+                    escucha.remove_termination_listener(avisar)
+                    if not escucha.is_closed():
+                        await escucha.remove_listener(CANAL, avisar)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            cache.invalidar()
+            logger.error(f"Error en la escucha de cambios de parámetros: {str(e)}")
+            await asyncio.sleep(ESPERA_RECONEXION)
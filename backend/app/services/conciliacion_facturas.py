@@ -0,0 +1,31 @@
+"""
+Conciliación periódica del estado de las facturas con sus pagos.
+
+crear_pago ya salda la factura en la misma transacción que registra el pago, así
+que esta tarea solo corrige lo que quede desfasado por otros caminos (pagos
+anteriores a ese cambio, cargas directas en la base, montos corregidos a mano).
+Lo hace con una sola pasada en bloque (crud.factura.conciliar_estados) al
+arrancar y cada FACTURAS_INTERVALO_CONCILIACION segundos.
+"""
+import asyncio
+import logging
+import os
+
+from app.crud import factura as crud_factura
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_CONCILIACION = float(os.getenv("FACTURAS_INTERVALO_CONCILIACION", "3600"))
+
+
+async def conciliar_periodicamente(sesiones, intervalo: float = INTERVALO_CONCILIACION) -> None:
+    """Tarea de fondo: corrige el estado de las facturas desfasadas cada `intervalo` segundos"""
+    while True:
+        try:
+            async with sesiones() as db:
+                corregidas = await crud_factura.conciliar_estados(db)
+            if corregidas:
+                logger.info(f"Facturas con el estado corregido: {corregidas}")
+        except Exception as e:
+            logger.error(f"Error al conciliar el estado de las facturas: {str(e)}")
+        await asyncio.sleep(intervalo)
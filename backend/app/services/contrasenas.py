@@ -0,0 +1,57 @@
+"""
+Hash y verificación de contraseñas (bcrypt) fuera del event loop.
+
+Un hash bcrypt tarda cientos de milisegundos de CPU; hecho dentro de una ruta async
+frena todas las demás peticiones del worker mientras dura. Aquí se ejecuta en un
+pool de hilos acotado (bcrypt libera el GIL mientras calcula, así que los hilos
+alcanzan y no hace falta un pool de procesos) y un semáforo limita cuántos hashes
+pueden estar en curso a la vez: los que sobran esperan su turno sin ocupar el loop
+ni encolar trabajo sin límite en el pool.
+
+    BCRYPT_ROUNDS            factor de trabajo de los hashes nuevos (default 12)
+    CONTRASENAS_HILOS        hilos del pool (default: núcleos, máximo 4)
+    CONTRASENAS_CONCURRENCIA hashes en curso a la vez (default: igual a los hilos)
+
+Los hashes existentes se siguen verificando con el factor con el que se crearon.
+"""
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HILOS = int(os.getenv("CONTRASENAS_HILOS", str(min(4, os.cpu_count() or 1))))
+CONCURRENCIA = int(os.getenv("CONTRASENAS_CONCURRENCIA", str(HILOS)))
+
+_pool = ThreadPoolExecutor(max_workers=HILOS, thread_name_prefix="contrasenas")
+# Un semáforo por event loop (los asyncio.Semaphore quedan atados al loop que los usa)
+_semaforos: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def hash_password(password: str, rondas: int = BCRYPT_ROUNDS) -> str:
+    """Hashear contraseña usando bcrypt (bloqueante: desde código async usar `hashear`)"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rondas)).decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verificar contraseña usando bcrypt (bloqueante: desde código async usar `verificar`)"""
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+async def _en_pool(funcion, *args):
+    loop = asyncio.get_running_loop()
+    semaforo = _semaforos.get(loop)
+    if semaforo is None:
+        semaforo = _semaforos[loop] = asyncio.Semaphore(CONCURRENCIA)
+    async with semaforo:
+        return await loop.run_in_executor(_pool, funcion, *args)
+
+
+async def hashear(password: str) -> str:
+    return await _en_pool(hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verificar(plain_password: str, hashed_password: str) -> bool:
+    return await _en_pool(verify_password, plain_password, hashed_password)
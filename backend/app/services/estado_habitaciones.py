@@ -0,0 +1,38 @@
+"""
+Refresco diario de habitaciones.estado.
+
+Reservar o cancelar ya no escribe en la tabla habitaciones: el estado de hoy se
+calcula en las consultas (crud.habitacion.estado_actual). Para que la columna
+guardada siga sirviendo a reportes y pantallas que la leen directamente, esta
+tarea la recalcula con un solo UPDATE masivo al arrancar y en cada cambio de día
+(ESTADO_HABITACIONES_HORA, por defecto a las 00:00 hora local del servidor).
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, time, timedelta
+
+from app.crud import habitacion as crud_habitacion
+
+logger = logging.getLogger(__name__)
+
+HORA_REFRESCO = time.fromisoformat(os.getenv("ESTADO_HABITACIONES_HORA", "00:00"))
+
+
+def segundos_hasta_proximo_refresco(ahora: datetime, hora: time = HORA_REFRESCO) -> float:
+    proximo = datetime.combine(ahora.date(), hora)
+    if proximo <= ahora:
+        proximo += timedelta(days=1)
+    return (proximo - ahora).total_seconds()
+
+
+async def refrescar_diariamente(sesiones) -> None:
+    """Tarea de fondo: refresca el estado de todas las habitaciones y espera al día siguiente"""
+    while True:
+        try:
+            async with sesiones() as db:
+                actualizadas = await crud_habitacion.refrescar_estados(db)
+            logger.info(f"Estado de habitaciones refrescado: {actualizadas} cambios")
+        except Exception as e:
+            logger.error(f"Error al refrescar el estado de las habitaciones: {str(e)}")
+        await asyncio.sleep(segundos_hasta_proximo_refresco(datetime.now()))
@@ -0,0 +1,253 @@
+"""
+PDF de facturas generados fuera del event loop.
+
+Armar un PDF es CPU en Python puro y retiene el GIL, así que a diferencia de bcrypt
+(services/contrasenas) un pool de hilos no alcanza: se renderiza en un
+ProcessPoolExecutor. Un semáforo por event loop acota las tareas en curso (la cola
+del pool): con un lote grande las que sobran esperan su turno sin ocupar el loop ni
+encolar datos sin límite en el pool. Cada PDF lleva menos de un milisegundo, así que
+los lotes se mandan al pool de a PDF_TANDA facturas por tarea para no pagar el viaje
+entre procesos por cada una.
+
+Cada PDF queda en disco como PDF_CACHE_DIR/<id>/<versión>.pdf. La versión es un
+hash de todo lo que se imprime (factura, cliente, reserva, pagos) y de FORMATO_PDF:
+si la factura cambia (un pago nuevo, otro estado) cambia la versión y se vuelve a
+generar; si no, se sirve el archivo. Al guardar una versión se borran las
+anteriores de la misma factura (una carpeta por factura: no hace falta listar toda
+la caché).
+
+    PDF_PROCESOS     procesos del pool (default: núcleos)
+    PDF_COLA         tareas en curso a la vez (default: el doble de procesos)
+    PDF_TANDA        facturas por tarea del pool en los lotes (default 50)
+    PDF_CACHE_DIR    carpeta de la caché (default: <tmp>/facturas_pdf)
+    PDF_LOTE_MAXIMO  facturas por pedido de /facturas/pdf-lote (default 1000)
+
+El PDF se escribe a mano (PDF 1.4, fuentes estándar Helvetica y Courier con
+WinAnsiEncoding) para no sumar una dependencia por una sola página de texto.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import weakref
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+PROCESOS = int(os.getenv("PDF_PROCESOS", str(os.cpu_count() or 1)))
+COLA = int(os.getenv("PDF_COLA", str(2 * PROCESOS)))
+TANDA = int(os.getenv("PDF_TANDA", "50"))
+CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "facturas_pdf"))
+LOTE_MAXIMO = int(os.getenv("PDF_LOTE_MAXIMO", "1000"))
+
+# Subirlo cuando cambie el diseño: invalida todos los PDF guardados
+FORMATO_PDF = 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Un semáforo por event loop (los asyncio.Semaphore quedan atados al loop que los usa)
+_semaforos: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Página A4 en puntos y márgenes
+ANCHO, ALTO = 595, 842
+MARGEN = 50
+
+
+def _pool_procesos() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: los procesos no heredan el loop, las conexiones ni los hilos del worker web
+        _pool = ProcessPoolExecutor(max_workers=PROCESOS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def version(datos: dict) -> str:
+    """Hash de los datos impresos en la factura y del formato del PDF"""
+    firma = json.dumps([FORMATO_PDF, datos], sort_keys=True, default=str)
+    return hashlib.sha256(firma.encode()).hexdigest()[:16]
+
+
+def ruta_en_cache(datos: dict) -> str:
+    return os.path.join(CACHE_DIR, str(datos["id"]), f"{version(datos)}.pdf")
+
+
+def _texto_pdf(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _monto(valor) -> str:
+    return f"{valor:.2f}"
+
+
+def _fecha(valor) -> str:
+    return valor.strftime("%d/%m/%Y") if valor else "-"
+
+
+def _lineas(datos: dict) -> List[tuple]:
+    """(fuente, tamaño, x, texto) de cada renglón; el renglón vacío es ('', 0, 0, '')"""
+    lineas = [
+        ("F2", 16, MARGEN, f"FACTURA N° {datos['id']}"),
+        ("F1", 10, MARGEN, f"Emisión: {_fecha(datos['fecha_emision'])}    Estado: {datos['estado'] or '-'}"),
+        ("", 0, 0, ""),
+    ]
+    if datos["reserva_id"] is not None:
+        lineas += [
+            ("F2", 11, MARGEN, "Cliente"),
+            ("F1", 10, MARGEN, f"{datos['cliente']}  -  Documento {datos['documento_identidad']}"),
+            ("", 0, 0, ""),
+            ("F2", 11, MARGEN, f"Reserva N° {datos['reserva_id']}"),
+            ("F1", 10, MARGEN, f"Habitación {datos['habitacion']} ({datos['tipo']}), "
+                               f"del {_fecha(datos['fecha_inicio'])} al {_fecha(datos['fecha_fin'])}"),
+            ("", 0, 0, ""),
+            ("F3", 10, MARGEN, f"{'Concepto':<36}{'Noches':>8}{'Precio':>12}{'Importe':>14}"),
+        ]
+        noches = (datos["fecha_fin"] - datos["fecha_inicio"]).days
+        precio = datos["precio_noche"]
+        lineas.append(("F3", 10, MARGEN, f"{'Alojamiento':<36}{noches:>8}{_monto(precio):>12}"
+                                         f"{_monto(noches * precio):>14}"))
+    lineas += [
+        ("F3", 10, MARGEN, f"{'TOTAL':<56}{_monto(datos['total']):>14}"),
+        ("", 0, 0, ""),
+        ("F2", 11, MARGEN, "Pagos"),
+    ]
+    pagado = 0
+    for fecha_pago, metodo, monto in datos["pagos"]:
+        pagado += monto
+        lineas.append(("F3", 10, MARGEN, f"{_fecha(fecha_pago):<12}{metodo[:44]:<44}{_monto(monto):>14}"))
+    if not datos["pagos"]:
+        lineas.append(("F1", 10, MARGEN, "Sin pagos registrados"))
+    lineas += [
+        ("F3", 10, MARGEN, f"{'Pagado':<56}{_monto(pagado):>14}"),
+        ("F3", 10, MARGEN, f"{'Saldo':<56}{_monto(datos['total'] - pagado):>14}"),
+    ]
+    return lineas
+
+
+def renderizar(datos: dict) -> bytes:
+    """PDF de la factura (bloqueante: desde código async usar `obtener_pdf`)"""
+    paginas, actual, y = [], [], ALTO - MARGEN
+    for fuente, tamano, x, texto in _lineas(datos):
+        salto = tamano * 1.5 if tamano else 10
+        if y - salto < MARGEN:
+            paginas.append(actual)
+            actual, y = [], ALTO - MARGEN
+        y -= salto
+        if texto:
+            actual.append(f"BT /{fuente} {tamano} Tf {x} {y:.1f} Td ({_texto_pdf(texto)}) Tj ET")
+    paginas.append(actual)
+
+    fuentes = {"F1": "Helvetica", "F2": "Helvetica-Bold", "F3": "Courier"}
+    # Objetos 1: catálogo, 2: páginas, 3-5: fuentes, luego (página, contenido) por página
+    objetos = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    for base in fuentes.values():
+        objetos.append(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode())
+    recursos = " ".join(f"/{nombre} {3 + i} 0 R" for i, nombre in enumerate(fuentes))
+    hijos = []
+    for operaciones in paginas:
+        contenido = zlib.compress("\n".join(operaciones).encode("cp1252", errors="replace"))
+        numero = len(objetos) + 1
+        hijos.append(f"{numero} 0 R")
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {ANCHO} {ALTO}] "
+            f"/Resources << /Font << {recursos} >> >> /Contents {numero + 1} 0 R >>".encode()
+        )
+        objetos.append(f"<< /Length {len(contenido)} /Filter /FlateDecode >>\nstream\n".encode()
+                       + contenido + b"\nendstream")
+    objetos[1] = f"<< /Type /Pages /Kids [{' '.join(hijos)}] /Count {len(hijos)} >>".encode()
+
+    salida = io.BytesIO()
+    salida.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    posiciones = []
+    for numero, cuerpo in enumerate(objetos, start=1):
+        posiciones.append(salida.tell())
+        salida.write(f"{numero} 0 obj\n".encode() + cuerpo + b"\nendobj\n")
+    inicio_xref = salida.tell()
+    salida.write(f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode())
+    salida.write("".join(f"{p:010d} 00000 n \n" for p in posiciones).encode())
+    salida.write(f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode())
+    return salida.getvalue()
+
+
+def _guardar(pdf: bytes, ruta: str) -> None:
+    carpeta, nombre = os.path.split(ruta)
+    os.makedirs(carpeta, exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(pdf)
+    # Atómico: quien lea la caché ve el PDF entero o ninguno
+    os.replace(temporal, ruta)
+    for viejo in os.listdir(carpeta):
+        if viejo != nombre and viejo.endswith(".pdf"):
+            try:
+                os.remove(os.path.join(carpeta, viejo))
+            except FileNotFoundError:
+                pass
+
+
+def _renderizar_y_guardar(tanda: Sequence[Tuple[dict, str]]) -> List[bytes]:
+    """Tarea del pool: renderiza cada (datos, ruta), guarda la versión y borra las anteriores"""
+    pdfs = []
+    for datos, ruta in tanda:
+        pdf = renderizar(datos)
+        _guardar(pdf, ruta)
+        pdfs.append(pdf)
+    return pdfs
+
+
+def _leer_cache(facturas: Sequence[dict]) -> Tuple[List[str], List[Optional[bytes]]]:
+    """Ruta de la versión actual de cada factura y su PDF si ya está guardado (si no, None)"""
+    rutas, pdfs = [], []
+    for datos in facturas:
+        ruta = ruta_en_cache(datos)
+        rutas.append(ruta)
+        try:
+            with open(ruta, "rb") as archivo:
+                pdfs.append(archivo.read())
+        except FileNotFoundError:
+            pdfs.append(None)
+    return rutas, pdfs
+
+
+async def _en_pool(funcion, *args):
+    loop = asyncio.get_running_loop()
+    semaforo = _semaforos.get(loop)
+    if semaforo is None:
+        semaforo = _semaforos[loop] = asyncio.Semaphore(COLA)
+    async with semaforo:
+        return await loop.run_in_executor(_pool_procesos(), funcion, *args)
+
+
+async def obtener_pdf(datos: dict) -> bytes:
+    """PDF de la factura desde la caché en disco, o renderizado en el pool si cambió"""
+    (ruta,), (pdf,) = _leer_cache([datos])
+    if pdf is None:
+        (pdf,) = await _en_pool(_renderizar_y_guardar, [(datos, ruta)])
+    return pdf
+
+
+def _armar_zip(archivos: Sequence[tuple]) -> bytes:
+    salida = io.BytesIO()
+    # Los PDF ya vienen comprimidos (FlateDecode): ZIP_STORED no gasta CPU en recomprimir
+    with zipfile.ZipFile(salida, "w", zipfile.ZIP_STORED) as zip_:
+        for nombre, pdf in archivos:
+            zip_.writestr(nombre, pdf)
+    return salida.getvalue()
+
+
+async def zip_de_facturas(facturas: Sequence[dict]) -> bytes:
+    """ZIP con el PDF de cada factura (factura_<id>.pdf), renderizando solo las que cambiaron"""
+    # Hashes y lecturas de disco de todo el lote, fuera del loop
+    rutas, pdfs = await asyncio.to_thread(_leer_cache, facturas)
+    faltan = [i for i, pdf in enumerate(pdfs) if pdf is None]
+    tandas = [faltan[i:i + TANDA] for i in range(0, len(faltan), TANDA)]
+    hechas = await asyncio.gather(*(
+        _en_pool(_renderizar_y_guardar, [(facturas[i], rutas[i]) for i in tanda]) for tanda in tandas
+    ))
+    for tanda, renderizados in zip(tandas, hechas):
+        for i, pdf in zip(tanda, renderizados):
+            pdfs[i] = pdf
+    archivos = [(f"factura_{datos['id']}.pdf", pdf) for datos, pdf in zip(facturas, pdfs)]
+    return await asyncio.to_thread(_armar_zip, archivos)
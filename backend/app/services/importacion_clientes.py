@@ -0,0 +1,125 @@
+"""
+Lectura incremental de archivos de clientes (CSV o NDJSON) para POST /clientes/importar.
+
+El cuerpo de la petición llega en trozos de bytes y se convierte en registros a
+medida que llega: nunca se guarda el archivo completo en memoria. Cada registro
+sale como (linea, datos, error); `datos` ya viene validado contra las columnas de
+la tabla clientes, o `error` explica por qué se rechaza.
+
+CSV: la primera línea es el encabezado (nombre, documento_identidad, correo, telefono;
+el orden es libre y se aceptan columnas de más). Los campos entre comillas pueden
+contener comas y saltos de línea.
+NDJSON: un objeto JSON por línea con esas mismas claves.
+
+Un registro (o una línea) de más de IMPORTACION_REGISTRO_MAXIMO caracteres corta la
+importación con un 400: así unas comillas sin cerrar no acumulan el resto del archivo.
+"""
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.models.cliente import Cliente
+
+COLUMNAS = ("nombre", "documento_identidad", "correo", "telefono")
+OBLIGATORIAS = ("nombre", "documento_identidad")
+LARGO_MAXIMO = {columna: Cliente.__table__.c[columna].type.length for columna in COLUMNAS}
+REGISTRO_MAXIMO = int(os.getenv("IMPORTACION_REGISTRO_MAXIMO", "65536"))
+
+Registro = Tuple[int, Optional[dict], Optional[str]]
+
+
+async def _lineas(trozos: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Líneas de texto completas (UTF-8, con o sin BOM) a partir de trozos de bytes"""
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pendiente = ""
+    async for trozo in trozos:
+        pendiente += decodificador.decode(trozo)
+        *completas, pendiente = pendiente.split("\n")
+        for linea in completas:
+            yield linea + "\n"
+        if len(pendiente) > REGISTRO_MAXIMO:
+            raise HTTPException(status_code=400, detail=f"Hay una línea de más de {REGISTRO_MAXIMO} caracteres.")
+    pendiente += decodificador.decode(b"", final=True)
+    if pendiente:
+        yield pendiente
+
+
+def validar(datos: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """Normaliza un registro: recorta espacios, vacíos a NULL y controla largos y obligatorios"""
+    fila = {}
+    for columna in COLUMNAS:
+        valor = datos.get(columna)
+        valor = str(valor).strip() if valor is not None else ""
+        if not valor:
+            if columna in OBLIGATORIAS:
+                return None, f"Falta {columna}"
+            valor = None
+        elif len(valor) > LARGO_MAXIMO[columna]:
+            return None, f"{columna} supera {LARGO_MAXIMO[columna]} caracteres"
+        fila[columna] = valor
+    return fila, None
+
+
+async def registros_csv(trozos: AsyncIterator[bytes]) -> AsyncIterator[Registro]:
+    encabezado = None
+    numero = 0
+    partes, largo, entre_comillas, inicio = [], 0, False, 0
+    async for linea in _lineas(trozos):
+        numero += 1
+        if not partes:
+            inicio = numero
+        partes.append(linea)
+        largo += len(linea)
+        # Cada línea con una cantidad impar de comillas abre o cierra un campo entre comillas;
+        # mientras haya uno abierto el registro sigue en la línea siguiente
+        if linea.count('"') % 2:
+            entre_comillas = not entre_comillas
+        if entre_comillas:
+            if largo > REGISTRO_MAXIMO:
+                raise HTTPException(status_code=400, detail=(
+                    f"El registro de la línea {inicio} supera {REGISTRO_MAXIMO} caracteres "
+                    "(¿comillas sin cerrar?)."
+                ))
+            continue
+        texto, partes, largo = "".join(partes), [], 0
+        if not texto.strip():
+            continue
+        try:
+            campos = next(csv.reader([texto]))
+        except csv.Error as e:
+            yield inicio, None, f"CSV inválido: {e}"
+            continue
+        if encabezado is None:
+            encabezado = [campo.strip().lower() for campo in campos]
+            faltantes = [c for c in OBLIGATORIAS if c not in encabezado]
+            if faltantes:
+                yield inicio, None, f"El encabezado no tiene las columnas: {', '.join(faltantes)}"
+                return
+            continue
+        if len(campos) != len(encabezado):
+            yield inicio, None, f"Se esperaban {len(encabezado)} campos y hay {len(campos)}"
+            continue
+        yield (inicio, *validar(dict(zip(encabezado, campos))))
+    if partes:
+        yield inicio, None, "CSV inválido: comillas sin cerrar"
+
+
+async def registros_ndjson(trozos: AsyncIterator[bytes]) -> AsyncIterator[Registro]:
+    numero = 0
+    async for linea in _lineas(trozos):
+        numero += 1
+        if not linea.strip():
+            continue
+        try:
+            datos = json.loads(linea)
+        except ValueError as e:
+            yield numero, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(datos, dict):
+            yield numero, None, "Cada línea debe ser un objeto JSON"
+            continue
+        yield (numero, *validar(datos))
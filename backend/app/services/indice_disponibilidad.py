@@ -0,0 +1,216 @@
+"""
+Índice de disponibilidad en memoria (opcional).
+
+Guarda, por cada habitación, sus estancias activas ordenadas por fecha de inicio.
+Como la restricción reservas_sin_solapamiento garantiza que las estancias activas
+de una habitación nunca se cruzan, ordenar por inicio también ordena por fin, y
+saber si un rango está libre es una búsqueda binaria (O(log n)) sin consultar la base.
+
+PostgreSQL sigue siendo la fuente de verdad:
+- crear_reserva / cancelar_reserva y los cambios de habitación actualizan el índice
+  después de confirmar la transacción;
+- una tarea de fondo lo recarga completo cada INDICE_DISPONIBILIDAD_RESYNC segundos
+  (así se ven los cambios hechos por otros workers);
+- si pasa INDICE_DISPONIBILIDAD_TTL sin una recarga exitosa, el índice deja de usarse
+  y las consultas vuelven a la ruta SQL.
+
+Se activa con INDICE_DISPONIBILIDAD=1.
+"""
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.future import select
+
+from app.models.habitacion import Habitacion, ESTADOS_OCUPACION
+from app.models.reserva import Reserva
+from app.schemas.habitacion import HabitacionOut
+
+logger = logging.getLogger(__name__)
+
+
+class EstanciasHabitacion:
+    """Estancias activas de una habitación en arreglos paralelos ordenados por inicio"""
+
+    __slots__ = ("inicios", "fines", "ids")
+
+    def __init__(self):
+        self.inicios: List[date] = []
+        self.fines: List[date] = []
+        self.ids: List[int] = []
+
+    def agregar(self, reserva_id: int, inicio: date, fin: date) -> None:
+        pos = bisect_right(self.inicios, inicio)
+        self.inicios.insert(pos, inicio)
+        self.fines.insert(pos, fin)
+        self.ids.insert(pos, reserva_id)
+
+    def quitar(self, reserva_id: int, inicio: date) -> None:
+        pos = bisect_left(self.inicios, inicio)
+        while pos < len(self.ids) and self.inicios[pos] == inicio:
+            if self.ids[pos] == reserva_id:
+                del self.inicios[pos], self.fines[pos], self.ids[pos]
+                return
+            pos += 1
+
+    def esta_libre(self, inicio: date, fin: date) -> bool:
+        # Primera estancia que termina después de `inicio`: si empieza antes de `fin`, se cruza
+        pos = bisect_right(self.fines, inicio)
+        return pos == len(self.inicios) or self.inicios[pos] >= fin
+
+    def entre(self, desde: date, hasta: date) -> List[Tuple[date, date]]:
+        """Estancias que tocan el rango [desde, hasta)"""
+        pos = bisect_right(self.fines, desde)
+        fin_pos = bisect_left(self.inicios, hasta, lo=pos)
+        return list(zip(self.inicios[pos:fin_pos], self.fines[pos:fin_pos]))
+
+
+class IndiceDisponibilidad:
+    def __init__(self, ttl_segundos: float = 180, dias_historia: int = 31):
+        self.ttl_segundos = ttl_segundos
+        self.dias_historia = dias_historia
+        self.cargado_en: Optional[float] = None
+        self.desde: Optional[date] = None
+        self._estancias: Dict[int, EstanciasHabitacion] = {}
+        self._reservas: Dict[int, Tuple[int, date]] = {}
+        self._habitaciones: Dict[int, HabitacionOut] = {}
+        # Cambios recibidos mientras se recarga; se reaplican sobre la foto nueva
+        self._pendientes: Optional[list] = None
+        self._lock = asyncio.Lock()
+
+    # ---------- estado ----------
+
+    @property
+    def vigente(self) -> bool:
+        return self.cargado_en is not None and time.monotonic() - self.cargado_en < self.ttl_segundos
+
+    def cubre(self, fecha: date) -> bool:
+        """Las estancias que terminaron antes de `desde` no se cargan en memoria"""
+        return self.vigente and fecha >= self.desde
+
+    def invalidar(self) -> None:
+        self.cargado_en = None
+
+    # ---------- carga y resincronización ----------
+
+    async def cargar(self, db) -> None:
+        async with self._lock:
+            self._pendientes = []
+            try:
+                desde = date.today() - timedelta(days=self.dias_historia)
+                habitaciones = (await db.execute(select(Habitacion))).scalars().all()
+                reservas = (await db.execute(
+                    select(Reserva.id, Reserva.habitacion_id, Reserva.fecha_inicio, Reserva.fecha_fin)
+                    .where(Reserva.estado == "reservada", Reserva.fecha_fin > desde)
+                )).all()
+                self._reconstruir(habitaciones, reservas, desde)
+            finally:
+                self._pendientes = None
+
+    def _reconstruir(self, habitaciones, reservas, desde: date) -> None:
+        # Todo ocurre sin `await` de por medio: ninguna petición ve una foto a medias
+        pendientes = self._pendientes or []
+        self._estancias, self._reservas, self._habitaciones = {}, {}, {}
+        for habitacion in habitaciones:
+            self._poner_habitacion(habitacion)
+        for reserva_id, habitacion_id, inicio, fin in reservas:
+            self._poner_reserva(reserva_id, habitacion_id, inicio, fin)
+        for operacion, *args in pendientes:
+            operacion(*args)
+        self.desde = desde
+        self.cargado_en = time.monotonic()
+
+    def _registrar(self, operacion, *args) -> None:
+        operacion(*args)
+        if self._pendientes is not None:
+            self._pendientes.append((operacion, *args))
+
+    # ---------- actualizaciones desde el CRUD ----------
+
+    def registrar_reserva(self, reserva) -> None:
+        if reserva.estado == "reservada":
+            self._registrar(self._poner_reserva, reserva.id, reserva.habitacion_id,
+                            reserva.fecha_inicio, reserva.fecha_fin)
+        else:
+            self._registrar(self._sacar_reserva, reserva.id)
+
+    def quitar_reserva(self, reserva_id: int) -> None:
+        self._registrar(self._sacar_reserva, reserva_id)
+
+    def registrar_habitacion(self, habitacion) -> None:
+        self._registrar(self._poner_habitacion, habitacion)
+
+    def _poner_reserva(self, reserva_id: int, habitacion_id: int, inicio: date, fin: date) -> None:
+        if reserva_id in self._reservas:
+            return
+        self._estancias.setdefault(habitacion_id, EstanciasHabitacion()).agregar(reserva_id, inicio, fin)
+        self._reservas[reserva_id] = (habitacion_id, inicio)
+
+    def _sacar_reserva(self, reserva_id: int) -> None:
+        ubicacion = self._reservas.pop(reserva_id, None)
+        if ubicacion:
+            habitacion_id, inicio = ubicacion
+            self._estancias[habitacion_id].quitar(reserva_id, inicio)
+
+    def _poner_habitacion(self, habitacion) -> None:
+        self._habitaciones[habitacion.id] = HabitacionOut.model_validate(habitacion, from_attributes=True)
+
+    # ---------- consultas ----------
+
+    def esta_libre(self, habitacion_id: int, inicio: date, fin: date) -> bool:
+        estancias = self._estancias.get(habitacion_id)
+        return estancias is None or estancias.esta_libre(inicio, fin)
+
+    def estado_actual(self, habitacion: HabitacionOut, hoy: date) -> str:
+        """Igual que crud.habitacion.estado_actual, con las estancias del índice"""
+        if habitacion.estado not in ESTADOS_OCUPACION:
+            return habitacion.estado
+        return "disponible" if self.esta_libre(habitacion.id, hoy, hoy + timedelta(days=1)) else "ocupada"
+
+    def habitaciones_disponibles(self, inicio: date, fin: date, tipo: Optional[str] = None) -> List[HabitacionOut]:
+        """Mismo resultado que crud.habitacion.obtener_habitaciones_disponibles"""
+        hoy = date.today()
+        libres = [
+            hab.model_copy(update={"estado_actual": self.estado_actual(hab, hoy)})
+            for hab in self._habitaciones.values()
+            if hab.estado in ESTADOS_OCUPACION
+            and (not tipo or hab.tipo == tipo)
+            and self.esta_libre(hab.id, inicio, fin)
+        ]
+        return sorted(libres, key=lambda hab: hab.numero)
+
+    def habitaciones(self) -> List[HabitacionOut]:
+        return list(self._habitaciones.values())
+
+    def estancias_entre(self, habitacion_id: int, desde: date, hasta: date) -> List[Tuple[date, date]]:
+        estancias = self._estancias.get(habitacion_id)
+        return estancias.entre(desde, hasta) if estancias else []
+
+
+def _habilitado() -> bool:
+    return os.getenv("INDICE_DISPONIBILIDAD", "0").lower() in ("1", "true", "si", "sí")
+
+
+HABILITADO = _habilitado()
+INTERVALO_RESYNC = float(os.getenv("INDICE_DISPONIBILIDAD_RESYNC", "60"))
+
+indice = IndiceDisponibilidad(
+    ttl_segundos=float(os.getenv("INDICE_DISPONIBILIDAD_TTL", "180")),
+    dias_historia=int(os.getenv("INDICE_DISPONIBILIDAD_DIAS_HISTORIA", "31")),
+)
+
+
+async def mantener_sincronizado(sesiones, intervalo: float = INTERVALO_RESYNC) -> None:
+    """Tarea de fondo: recarga el índice desde PostgreSQL cada `intervalo` segundos"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            async with sesiones() as db:
+                await indice.cargar(db)
+        except Exception as e:
+            # El índice caduca solo (TTL) y las consultas vuelven a SQL
+            logger.error(f"Error al resincronizar el índice de disponibilidad: {str(e)}")
@@ -0,0 +1,125 @@
+"""
+Listados grandes (ingresos, egresos, pagos) enviados a medida que se leen.
+
+En lugar de cargar la tabla entera y serializar una sola lista, el CRUD recorre la
+consulta con un cursor del lado del servidor (AsyncSession.stream con yield_per) y
+entrega las filas de a LISTADOS_LOTE. Cada tanda se serializa y se envía antes de
+pedir la siguiente, así la memoria del worker depende del tamaño de la tanda y no
+del de la tabla.
+
+Formatos:
+    json    un arreglo JSON como hasta ahora, enviado por partes (chunked)
+    ndjson  un objeto JSON por línea (application/x-ndjson)
+    csv     encabezado con los campos del esquema y una fila por registro (text/csv)
+"""
+import csv
+import io
+import os
+from datetime import date
+from functools import lru_cache
+from typing import AsyncIterator, Literal, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+LISTADOS_LOTE = int(os.getenv("LISTADOS_LOTE", "1000"))
+
+Formato = Literal["json", "ndjson", "csv"]
+
+# Armar un TypeAdapter cuesta más que serializar una tanda: uno por esquema y proceso
+_adaptador = lru_cache(maxsize=None)(TypeAdapter)
+
+
+def validar_periodo(fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> None:
+    if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser mayor que la fecha de fin")
+
+
+async def recorrer(
+    db: AsyncSession,
+    modelo,
+    columna_fecha,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+) -> AsyncIterator[Sequence]:
+    """
+    Filas de la tabla de `modelo` (solo columnas, sin entidades ORM) en orden de id, de a
+    LISTADOS_LOTE, leídas de un cursor del servidor y filtradas por `columna_fecha`.
+    """
+    consulta = select(*modelo.__table__.columns).order_by(modelo.id)
+    if fecha_inicio:
+        consulta = consulta.where(columna_fecha >= fecha_inicio)
+    if fecha_fin:
+        consulta = consulta.where(columna_fecha <= fecha_fin)
+    async for tanda in recorrer_consulta(db, consulta):
+        yield tanda
+
+
+async def recorrer_consulta(db: AsyncSession, consulta) -> AsyncIterator[Sequence]:
+    """Filas de cualquier SELECT de a LISTADOS_LOTE, leídas de un cursor del servidor"""
+    result = await db.stream(consulta.execution_options(yield_per=LISTADOS_LOTE))
+    try:
+        async for tanda in result.partitions():
+            yield tanda
+    finally:
+        # Si el cliente corta la descarga, el cursor se cierra sin esperar al fin de la sesión
+        await result.close()
+
+
+async def _arreglo_json(tandas: AsyncIterator[Sequence], lista: TypeAdapter) -> AsyncIterator[bytes]:
+    yield b"["
+    primera = True
+    async for filas in tandas:
+        if not filas:
+            continue
+        # dump_json de la tanda entera (en Rust) sin los corchetes: "{...},{...}"
+        cuerpo = lista.dump_json(lista.validate_python(filas, from_attributes=True))[1:-1]
+        yield cuerpo if primera else b"," + cuerpo
+        primera = False
+    yield b"]"
+
+
+async def _lineas_json(tandas: AsyncIterator[Sequence], lista: TypeAdapter, fila: TypeAdapter) -> AsyncIterator[bytes]:
+    async for filas in tandas:
+        yield b"".join(fila.dump_json(m) + b"\n" for m in lista.validate_python(filas, from_attributes=True))
+
+
+async def _filas_csv(tandas: AsyncIterator[Sequence], lista: TypeAdapter, esquema: Type[BaseModel]) -> AsyncIterator[bytes]:
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    campos = list(esquema.model_fields)
+    escritor.writerow(campos)
+    async for filas in tandas:
+        for m in lista.validate_python(filas, from_attributes=True):
+            datos = m.model_dump(mode="json")
+            escritor.writerow([datos[c] for c in campos])
+        yield salida.getvalue().encode()
+        salida.seek(0)
+        salida.truncate()
+    if salida.tell():
+        yield salida.getvalue().encode()
+
+
+def respuesta_en_flujo(
+    tandas: AsyncIterator[Sequence],
+    esquema: Type[BaseModel],
+    formato: Formato = "json",
+    archivo: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    StreamingResponse que serializa cada tanda de filas con `esquema` apenas llega. Con
+    `archivo`, el CSV se ofrece para descargar con ese nombre.
+    """
+    if formato == "csv":
+        encabezados = {"Content-Disposition": f'attachment; filename="{archivo}"'} if archivo else None
+        return StreamingResponse(
+            _filas_csv(tandas, _adaptador(list[esquema]), esquema), media_type="text/csv", headers=encabezados
+        )
+    if formato == "ndjson":
+        return StreamingResponse(
+            _lineas_json(tandas, _adaptador(list[esquema]), _adaptador(esquema)), media_type="application/x-ndjson"
+        )
+    return StreamingResponse(_arreglo_json(tandas, _adaptador(list[esquema])), media_type="application/json")
@@ -0,0 +1,30 @@
+"""
+Purga periódica de retenciones vencidas.
+
+Las consultas de disponibilidad ya ignoran las retenciones con expira_en pasado,
+así que la purga no afecta la correctitud: solo evita que la tabla crezca con
+carritos abandonados. Se borran todas de una vez cada RETENCIONES_INTERVALO_PURGA
+segundos en lugar de revisar vencimientos en cada petición.
+"""
+import asyncio
+import logging
+import os
+
+from app.crud import retencion as crud_retencion
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_PURGA = float(os.getenv("RETENCIONES_INTERVALO_PURGA", "60"))
+
+
+async def purgar_periodicamente(sesiones, intervalo: float = INTERVALO_PURGA) -> None:
+    """Tarea de fondo: borra las retenciones vencidas cada `intervalo` segundos"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            async with sesiones() as db:
+                eliminadas = await crud_retencion.purgar_retenciones_vencidas(db)
+            if eliminadas:
+                logger.info(f"Retenciones vencidas eliminadas: {eliminadas}")
+        except Exception as e:
+            logger.error(f"Error al purgar retenciones vencidas: {str(e)}")
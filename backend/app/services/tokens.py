@@ -0,0 +1,126 @@
+"""
+Tokens de sesión firmados con HMAC-SHA256.
+
+El login verifica la contraseña una sola vez (bcrypt) y entrega un token con el
+usuario, su rol y el vencimiento. Las peticiones siguientes se autorizan sin ir a
+la base ni recalcular hashes: basta con comprobar la firma (microsegundos) y que el
+token no esté vencido ni revocado.
+
+Formato: base64url(JSON con sub, rol, exp, jti) + "." + base64url(firma).
+
+Los tokens revocados (logout) se guardan por su jti en memoria, hasta
+TOKENS_REVOCADOS_MAXIMO entradas; cada una se descarta cuando su token vence,
+porque a partir de ahí lo rechaza la fecha. Nunca se descarta un revocado vigente:
+si la lista se llena de tokens vigentes, sale el que vence antes y se rechazan
+todos los tokens que vencen hasta ese momento (esos usuarios vuelven a iniciar
+sesión), así ningún token revocado vuelve a valer. La lista es por proceso: con
+varios workers, un logout solo se ve en el worker que lo atendió hasta que el
+token vence, por eso conviene una duración corta (TOKEN_MINUTOS).
+
+    AUTH_SECRETO            clave de firma; si falta se genera una al arrancar y los
+                            tokens dejan de valer al reiniciar
+    TOKEN_MINUTOS           duración de cada token (default 480)
+    TOKENS_REVOCADOS_MAXIMO revocados vigentes que se guardan (default 10000)
+"""
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOKEN_MINUTOS = int(os.getenv("TOKEN_MINUTOS", "480"))
+TOKENS_REVOCADOS_MAXIMO = int(os.getenv("TOKENS_REVOCADOS_MAXIMO", "10000"))
+
+_secreto = os.getenv("AUTH_SECRETO")
+if not _secreto:
+    logger.warning("AUTH_SECRETO no está definido: se usa una clave temporal y los tokens no sobreviven a un reinicio")
+    _secreto = secrets.token_urlsafe(32)
+SECRETO = _secreto.encode()
+
+
+def _b64(datos: bytes) -> str:
+    return base64.urlsafe_b64encode(datos).rstrip(b"=").decode()
+
+
+def _desde_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _firma(carga: str) -> str:
+    return _b64(hmac.new(SECRETO, carga.encode(), hashlib.sha256).digest())
+
+
+class Revocados:
+    """jti revocados -> vencimiento del token, con un montículo por vencimiento para purgar"""
+
+    def __init__(self, maximo: int = TOKENS_REVOCADOS_MAXIMO):
+        self.maximo = maximo
+        self._jtis: Dict[str, float] = {}
+        self._por_vencimiento: List[Tuple[float, str]] = []
+        # Los tokens que vencen hasta aquí se rechazan: alguno revocado tuvo que salir de la lista
+        self._rechazar_hasta = 0.0
+
+    def agregar(self, jti: str, exp: float, ahora: Optional[float] = None) -> None:
+        if jti in self._jtis:
+            return
+        self._jtis[jti] = exp
+        heapq.heappush(self._por_vencimiento, (exp, jti))
+        ahora = time.time() if ahora is None else ahora
+        # Primero salen los vencidos (la fecha ya los rechaza)
+        while self._por_vencimiento and self._por_vencimiento[0][0] <= ahora:
+            _, vencido = heapq.heappop(self._por_vencimiento)
+            del self._jtis[vencido]
+        if len(self._jtis) > self.maximo:
+            # Lleno de vigentes: sale el que vence antes y todo lo que vence hasta entonces se rechaza
+            exp_salida, salida = heapq.heappop(self._por_vencimiento)
+            del self._jtis[salida]
+            self._rechazar_hasta = max(self._rechazar_hasta, exp_salida)
+            logger.warning("Lista de tokens revocados llena: se rechazan los tokens que vencen "
+                           f"antes de {exp_salida:.0f}; conviene subir TOKENS_REVOCADOS_MAXIMO")
+
+    def contiene(self, jti: str, exp: float) -> bool:
+        """Indica si el token (jti, exp) está revocado"""
+        return exp <= self._rechazar_hasta or jti in self._jtis
+
+    def __len__(self) -> int:
+        return len(self._jtis)
+
+
+revocados = Revocados()
+
+
+def emitir(usuario_id: int, rol_id: Optional[int], minutos: int = TOKEN_MINUTOS) -> tuple[str, float]:
+    """Token firmado para el usuario; devuelve (token, vencimiento como timestamp)"""
+    exp = time.time() + minutos * 60
+    carga = _b64(json.dumps(
+        {"sub": usuario_id, "rol": rol_id, "exp": exp, "jti": secrets.token_urlsafe(12)},
+        separators=(",", ":"),
+    ).encode())
+    return f"{carga}.{_firma(carga)}", exp
+
+
+def validar(token: str) -> Optional[dict]:
+    """Datos del token (sub, rol, exp, jti) si la firma es válida y no está vencido ni revocado; si no, None"""
+    carga, separador, firma = token.partition(".")
+    # En bytes: compare_digest rechaza str con caracteres no ASCII (TypeError)
+    if not separador or not hmac.compare_digest(firma.encode(), _firma(carga).encode()):
+        return None
+    try:
+        datos = json.loads(_desde_b64(carga))
+    except ValueError:
+        return None
+    ahora = time.time()
+    if datos["exp"] <= ahora or revocados.contiene(datos["jti"], datos["exp"]):
+        return None
+    return datos
+
+
+def revocar(datos: dict) -> None:
+    revocados.agregar(datos["jti"], datos["exp"])
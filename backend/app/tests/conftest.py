@@ -0,0 +1,15 @@
+import os
+import pytest
+
+
+@pytest.fixture
+def test_database_url():
+    """URL de una base PostgreSQL desechable para las pruebas de integración.
+
+    Estas pruebas borran y recrean las tablas, por eso solo se ejecutan cuando
+    se define TEST_DATABASE_URL (nunca contra la DATABASE_URL de la aplicación).
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("Defina TEST_DATABASE_URL para ejecutar las pruebas de integración")
+    return url
@@ -0,0 +1,110 @@
+import time
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from app.main import app
+from app.routers import auth
+from app.services import contrasenas, tokens
+
+client = TestClient(app)
+
+HASH = contrasenas.hash_password("secreta", rondas=4)
+
+
+def _usuario():
+    return MagicMock(id=7, rol_id=2, correo="ana@hotel.com", contraseña=HASH)
+
+
+def _login(contraseña="secreta", usuario=None):
+    with patch("app.crud.usuario.obtener_usuario_correo", new_callable=AsyncMock) as mock_obtener:
+        mock_obtener.return_value = usuario
+        return client.post("/auth/login", json={"correo": "ana@hotel.com", "contraseña": contraseña})
+
+
+def test_login_y_sesion():
+    response = _login(usuario=_usuario())
+    assert response.status_code == 200
+    datos = response.json()
+    assert datos["token_type"] == "bearer"
+    assert datos["usuario_id"] == 7 and datos["rol_id"] == 2
+
+    # La sesión se valida con la firma: no se consulta la base ni se vuelve a hashear
+    with patch("app.services.contrasenas.verificar", new_callable=AsyncMock) as mock_verificar:
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {datos['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["usuario_id"] == 7 and me.json()["rol_id"] == 2
+    mock_verificar.assert_not_awaited()
+
+
+def test_login_credenciales_incorrectas():
+    assert _login(contraseña="otra", usuario=_usuario()).status_code == 401
+    response = _login(usuario=None)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Correo o contraseña incorrectos"
+
+
+def test_hash_de_relleno_se_calcula_una_vez_en_el_pool():
+    auth._hash_relleno = None
+    with patch("app.services.contrasenas.hashear", new_callable=AsyncMock) as mock_hashear:
+        mock_hashear.return_value = HASH
+        assert _login(usuario=None).status_code == 401
+        assert _login(usuario=None).status_code == 401
+    mock_hashear.assert_awaited_once()
+    assert auth._hash_relleno == HASH
+
+
+def test_token_alterado_o_ausente():
+    # La carga de otro token con la firma de este
+    token, _ = tokens.emitir(7, 2)
+    otro, _ = tokens.emitir(1, 1)
+    alterado = f"{otro.split('.')[0]}.{token.split('.')[1]}"
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {alterado}"}).status_code == 401
+    assert client.get("/auth/me").status_code == 401
+
+
+def test_token_no_ascii():
+    """Un token con caracteres no ASCII se rechaza con 401, no con un error"""
+    token, _ = tokens.emitir(7, 2)
+    carga, firma = token.split(".")
+    assert tokens.validar(f"{carga}.{firma[:-1]}ñ") is None
+    assert tokens.validar(f"ñ{carga}.{firma}") is None
+    cabecera = {"Authorization": f"Bearer {carga}.{firma[:-1]}ñ".encode()}
+    assert client.get("/auth/me", headers=cabecera).status_code == 401
+
+
+def test_token_vencido():
+    token, _ = tokens.emitir(7, 2, minutos=-1)
+    assert tokens.validar(token) is None
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_logout_revoca_el_token():
+    token, _ = tokens.emitir(7, 2)
+    cabecera = {"Authorization": f"Bearer {token}"}
+    assert client.post("/auth/logout", headers=cabecera).status_code == 204
+    assert client.get("/auth/me", headers=cabecera).status_code == 401
+
+
+def test_revocados_descarta_solo_vencidos():
+    revocados = tokens.Revocados(maximo=2)
+    ahora = time.time()
+    revocados.agregar("a", ahora + 10, ahora)
+    revocados.agregar("b", ahora + 60, ahora)
+    assert revocados.contiene("a", ahora + 10) and revocados.contiene("b", ahora + 60)
+    # Al agregar después de que "a" venció, sale "a" y no hace falta sacar un vigente
+    revocados.agregar("c", ahora + 90, ahora + 20)
+    assert len(revocados) == 2
+    assert revocados.contiene("b", ahora + 60) and revocados.contiene("c", ahora + 90)
+    assert not revocados.contiene("otro", ahora + 60)
+
+
+def test_revocados_llenos_de_vigentes_no_vuelven_a_valer():
+    """Con la lista llena de vigentes, el que sale sigue rechazado (y lo que vence antes que él)"""
+    revocados = tokens.Revocados(maximo=2)
+    ahora = time.time()
+    for jti, minutos in (("a", 30), ("b", 60), ("c", 90)):
+        revocados.agregar(jti, ahora + minutos * 60, ahora)
+    assert len(revocados) == 2
+    assert revocados.contiene("a", ahora + 30 * 60)
+    assert revocados.contiene("otro", ahora + 20 * 60)
+    assert not revocados.contiene("otro", ahora + 40 * 60)
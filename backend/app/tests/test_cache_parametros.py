@@ -0,0 +1,81 @@
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import AsyncMock, MagicMock
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.database import Base, crear_esquema
+from app.crud import parametro as crud_parametro
+from app.schemas.parametro import ParametroCreate, ParametroUpdate
+from app.services.cache_parametros import CacheParametros, cache as cache_local, escuchar_cambios
+
+
+def _resultado(*parametros):
+    return MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=list(parametros)))))
+
+
+def test_recarga_vieja_no_valida_la_cache():
+    """Si se invalida mientras se recarga, la recarga no deja la caché como vigente"""
+    cache = CacheParametros()
+    iva = MagicMock(id=1, clave="IVA", valor="12", descripcion=None)
+    db = AsyncMock()
+
+    async def consulta_lenta(*args):
+        cache.invalidar()  # llega un NOTIFY a mitad de la consulta
+        return _resultado(iva)
+
+    db.execute.side_effect = consulta_lenta
+    asyncio.run(cache.cargar(db))
+    assert not cache.valida
+
+    db.execute.side_effect = None
+    db.execute.return_value = _resultado(iva)
+    asyncio.run(cache.cargar(db))
+    assert cache.valida
+    assert cache.obtener("IVA").valor == "12"
+    assert cache.obtener_varias(["NO", "IVA"])[0].clave == "IVA"
+
+
+class TestInvalidacionEntreWorkers:
+    """LISTEN/NOTIFY contra PostgreSQL real"""
+
+    def test_otro_worker_ve_los_cambios(self, test_database_url):
+        async def esperar(condicion):
+            for _ in range(200):
+                if condicion():
+                    return True
+                await asyncio.sleep(0.01)
+            return False
+
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            # Caché de "otro worker", con su propia conexión de LISTEN
+            otro = CacheParametros()
+            escucha = asyncio.create_task(escuchar_cambios(engine, Sesion, cache=otro))
+            assert await esperar(lambda: otro.valida)
+
+            async with Sesion() as db:
+                iva = await crud_parametro.create_parametro(db, ParametroCreate(clave="IVA", valor="12"))
+                # El worker que escribe deja de usar su caché en cuanto confirma
+                assert not cache_local.valida
+                assert (await crud_parametro.get_parametro_by_clave(db, "IVA")).valor == "12"
+            creado = await esperar(lambda: otro.valida and otro.obtener("IVA") is not None)
+
+            async with Sesion() as db:
+                await crud_parametro.update_parametro(db, iva.id, ParametroUpdate(valor="15"))
+            actualizado = await esperar(lambda: otro.valida and otro.obtener("IVA").valor == "15")
+
+            async with Sesion() as db:
+                await crud_parametro.delete_parametro(db, iva.id)
+            eliminado = await esperar(lambda: otro.valida and otro.obtener("IVA") is None)
+
+            escucha.cancel()
+            await asyncio.gather(escucha, return_exceptions=True)
+            await engine.dispose()
+            return creado, actualizado, eliminado
+
+        assert asyncio.run(escenario()) == (True, True, True)
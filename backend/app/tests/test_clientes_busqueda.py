@@ -0,0 +1,70 @@
+import asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import patch
+
+from app.main import app
+from app.database import Base, crear_esquema
+from app.crud import cliente as crud_cliente
+
+client = TestClient(app)
+
+
+@patch("app.crud.cliente.list_clientes")
+def test_buscar_clientes(mock_listar):
+    """Los filtros llegan al CRUD y el cursor siguiente va en el encabezado"""
+    mock_listar.return_value = ([{"id": 1, "nombre": "Ana", "documento_identidad": "A-1"}], "c1")
+    response = client.get("/clientes/?nombre=an&telefono=099&limite=1")
+    assert response.status_code == 200
+    assert response.json()[0]["nombre"] == "Ana"
+    assert response.headers["X-Siguiente-Cursor"] == "c1"
+    assert mock_listar.call_args.args[1:] == ("an", None, None, "099", 1, None)
+
+
+def test_patron_escapa_comodines():
+    assert crud_cliente._patron("50%_a\\b") == "50\\%\\_a\\\\b"
+
+
+class TestBusquedaClientes:
+    def test_busqueda_y_paginacion(self, test_database_url):
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("""
+                    INSERT INTO clientes (nombre, documento_identidad, correo, telefono)
+                    SELECT 'Cliente ' || lpad(n::text, 3, '0'), 'DOC-' || n, 'c' || n || '@hotel.com', '099' || n
+                    FROM generate_series(1, 120) AS n
+                """))
+                await conn.execute(text(
+                    "INSERT INTO clientes (nombre, documento_identidad, correo) VALUES ('María Pérez', 'X-9', 'maria_p@correo.com')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with Sesion() as db:
+                # Recorrer todo el listado de a 50
+                vistos, cursor, paginas = [], None, 0
+                while True:
+                    pagina, cursor = await crud_cliente.list_clientes(db, limite=50, cursor=cursor)
+                    vistos += [c.nombre for c in pagina]
+                    paginas += 1
+                    if not cursor:
+                        break
+                por_nombre = [c.nombre for c in (await crud_cliente.list_clientes(db, nombre="cliente 11"))[0]]
+                por_documento = [c.documento_identidad for c in (await crud_cliente.list_clientes(db, documento="c-11"))[0]]
+                por_correo = [c.nombre for c in (await crud_cliente.list_clientes(db, correo="A_P"))[0]]
+                comodin = (await crud_cliente.list_clientes(db, correo="a%p"))[0]
+            await engine.dispose()
+            return vistos, paginas, por_nombre, por_documento, por_correo, comodin
+
+        vistos, paginas, por_nombre, por_documento, por_correo, comodin = asyncio.run(escenario())
+        assert paginas == 3
+        assert len(vistos) == 121 and len(set(vistos)) == 121
+        assert vistos == sorted(vistos)
+        assert por_nombre == [f"Cliente 11{i}" for i in range(10)]
+        assert sorted(por_documento) == sorted(["DOC-11"] + [f"DOC-11{i}" for i in range(10)])
+        # '_' y '%' se buscan literalmente
+        assert por_correo == ["María Pérez"]
+        assert comodin == []
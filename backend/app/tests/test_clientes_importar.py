@@ -0,0 +1,154 @@
+import asyncio
+import json
+import pytest
+import tracemalloc
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import patch
+
+from app.main import app
+from app.database import Base, crear_esquema
+from app.crud import cliente as crud_cliente
+from app.services import importacion_clientes
+from app.services.importacion_clientes import registros_csv, registros_ndjson
+
+client = TestClient(app)
+
+
+async def _trozos(contenido: bytes, tamano: int = 7):
+    # Trozos pequeños para que las líneas y los caracteres UTF-8 queden partidos
+    for i in range(0, len(contenido), tamano):
+        yield contenido[i:i + tamano]
+
+
+def _leer(lector, contenido: bytes):
+    async def juntar():
+        return [registro async for registro in lector(_trozos(contenido))]
+    return asyncio.run(juntar())
+
+
+def test_registros_csv():
+    contenido = (
+        "﻿Documento_Identidad,nombre,correo,telefono\r\n"
+        "D-1,José Núñez,jose@x.com,099\r\n"
+        "D-2,\"Pérez, Ana\",,\r\n"
+        "D-3,\"Varias\nlíneas\",a@b.c,1\r\n"
+        "D-4,,x@y.z,2\r\n"
+        "D-5,Corto\r\n"
+        f"{'9' * 21},Largo,,\r\n"
+    ).encode()
+    registros = _leer(registros_csv, contenido)
+    assert registros[0] == (2, {"nombre": "José Núñez", "documento_identidad": "D-1",
+                                "correo": "jose@x.com", "telefono": "099"}, None)
+    assert registros[1][1] == {"nombre": "Pérez, Ana", "documento_identidad": "D-2", "correo": None, "telefono": None}
+    assert registros[2][0] == 4 and registros[2][1]["nombre"] == "Varias\nlíneas"
+    assert registros[3] == (6, None, "Falta nombre")
+    assert registros[4][0] == 7 and "campos" in registros[4][2]
+    assert registros[5] == (8, None, "documento_identidad supera 20 caracteres")
+
+
+def test_registros_csv_sin_columnas_obligatorias():
+    registros = _leer(registros_csv, b"nombre,correo\nAna,a@b.c\n")
+    assert registros == [(1, None, "El encabezado no tiene las columnas: documento_identidad")]
+
+
+def test_registros_csv_comillas_sin_cerrar(monkeypatch):
+    monkeypatch.setattr(importacion_clientes, "REGISTRO_MAXIMO", 200)
+    # Al final del archivo se rechaza solo el registro abierto
+    registros = _leer(registros_csv, b'nombre,documento_identidad\nAna,A-1\n"Sin cerrar,B-1\nLuis,C-1\n')
+    assert registros == [
+        (2, {"nombre": "Ana", "documento_identidad": "A-1", "correo": None, "telefono": None}, None),
+        (3, None, "CSV inválido: comillas sin cerrar"),
+    ]
+    # Si el registro abierto crece más allá del máximo se corta con un 400
+    contenido = b'nombre,documento_identidad\n"Sin cerrar,B-1\n' + b"Luis,C-1\n" * 100
+    with pytest.raises(HTTPException) as error:
+        _leer(registros_csv, contenido)
+    assert error.value.status_code == 400 and "línea 2" in error.value.detail
+    # Una línea sola sin fin de línea tampoco se acumula entera
+    with pytest.raises(HTTPException):
+        _leer(registros_ndjson, b"x" * 1000)
+
+
+def test_registros_ndjson():
+    contenido = b'{"nombre": "Ana", "documento_identidad": 123}\n\n{no es json\n[1, 2]\n'
+    registros = _leer(registros_ndjson, contenido)
+    assert registros[0] == (1, {"nombre": "Ana", "documento_identidad": "123", "correo": None, "telefono": None}, None)
+    assert registros[1][0] == 3 and registros[1][2].startswith("JSON inválido")
+    assert registros[2] == (4, None, "Cada línea debe ser un objeto JSON")
+
+
+@patch("app.crud.cliente.importar_clientes")
+def test_importar_elige_formato(mock_importar):
+    mock_importar.return_value = {"insertados": 1, "actualizados": 0, "sin_cambios": 0,
+                                  "duplicados": 0, "rechazados": 0, "errores": []}
+    response = client.post("/clientes/importar", content=b'{"nombre": "Ana", "documento_identidad": "A"}\n',
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json()["insertados"] == 1
+    assert mock_importar.call_args.args[1].__name__ == "registros_ndjson"
+    client.post("/clientes/importar?formato=csv", content=b"nombre,documento_identidad\n")
+    assert mock_importar.call_args.args[1].__name__ == "registros_csv"
+
+
+class TestImportacionClientes:
+    """COPY a tabla temporal + ON CONFLICT contra PostgreSQL real"""
+
+    def test_importar_y_fusionar(self, test_database_url):
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text(
+                    "INSERT INTO clientes (nombre, documento_identidad, correo) VALUES "
+                    "('Viejo', 'D-1', 'v@x.com'), ('Igual', 'D-2', 'i@x.com')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            contenido = (
+                "nombre,documento_identidad,correo\n"
+                "Nuevo nombre,D-1,v@x.com\n"    # actualiza
+                "Igual,D-2,i@x.com\n"           # sin cambios
+                "Primero,D-3,\n"                # repetido: gana la última línea
+                "Segundo,D-3,s@x.com\n"
+                ",D-4,\n"                       # rechazado
+            ).encode()
+            async with Sesion() as db:
+                resultado = await crud_cliente.importar_clientes(db, registros_csv(_trozos(contenido, 1024)))
+                filas = dict((await db.execute(text("SELECT documento_identidad, nombre FROM clientes"))).all())
+            await engine.dispose()
+            return resultado, filas
+
+        resultado, filas = asyncio.run(escenario())
+        assert resultado == {"insertados": 1, "actualizados": 1, "sin_cambios": 1, "duplicados": 1,
+                             "rechazados": 1, "errores": [{"linea": 6, "detalle": "Falta nombre"}]}
+        assert filas == {"D-1": "Nuevo nombre", "D-2": "Igual", "D-3": "Segundo"}
+
+    def test_memoria_no_crece_con_el_archivo(self, test_database_url):
+        """El pico de memoria de 60.000 filas es del orden del de 6.000: nada se acumula"""
+        async def ndjson(filas, desde):
+            for i in range(desde, desde + filas):
+                yield (json.dumps({"nombre": f"Cliente {i}", "documento_identidad": f"M-{i}"}) + "\n").encode()
+
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            picos = []
+            for filas, desde in ((6_000, 0), (60_000, 100_000)):
+                async with Sesion() as db:
+                    tracemalloc.start()
+                    resultado = await crud_cliente.importar_clientes(db, registros_ndjson(ndjson(filas, desde)))
+                    picos.append(tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+                    assert resultado["insertados"] == filas
+            await engine.dispose()
+            return picos
+
+        pequeno, grande = asyncio.run(escenario())
+        assert grande < pequeno * 2
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from unittest.mock import patch
+
+from app.main import app
+from app.database import Base, crear_esquema
+from app.crud import cliente as crud_cliente
+from app.schemas.cliente import ClienteResumen
+
+client = TestClient(app)
+
+
+class TestClientesResumenEndpoints:
+    """Ruta GET /clientes/{id}/resumen con el CRUD simulado"""
+
+    @patch("app.crud.cliente.get_cliente_resumen")
+    def test_resumen_cliente(self, mock_resumen):
+        mock_resumen.return_value = {
+            "id": 1, "nombre": "Ana", "documento_identidad": "A-1",
+            "reservas": [{
+                "id": 3, "cliente_id": 1, "habitacion_id": 1, "estado": "reservada",
+                "fecha_inicio": "2025-01-10", "fecha_fin": "2025-01-12", "fecha_reserva": "2025-01-01T10:00:00",
+                "facturas": [{
+                    "id": 5, "reserva_id": 3, "fecha_emision": "2025-01-12", "total": 200.0, "estado": "pagada",
+                    "pagos": [{"id": 8, "factura_id": 5, "fecha_pago": "2025-01-12", "monto": 200.0, "metodo_pago": "tarjeta"}],
+                }],
+            }],
+        }
+        response = client.get("/clientes/1/resumen")
+        assert response.status_code == 200
+        assert response.json()["reservas"][0]["facturas"][0]["pagos"][0]["monto"] == 200.0
+
+        mock_resumen.return_value = None
+        assert client.get("/clientes/999/resumen").status_code == 404
+
+
+class TestResumenConsultas:
+    """El resumen se carga con un número fijo de consultas, tenga el cliente 1 o 40 reservas"""
+
+    def test_numero_de_consultas_fijo(self, test_database_url):
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text(
+                    "INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Frecuente', 'F-1'), (2, 'Nuevo', 'N-1')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) VALUES (1, '101', 'doble', 90, 'disponible')"
+                ))
+                # Cliente 1: 40 reservas, 2 facturas por reserva y 3 pagos por factura; cliente 2: una de cada
+                await conn.execute(text("""
+                    INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado)
+                    SELECT CASE WHEN k = 0 THEN 2 ELSE 1 END, 1,
+                           CAST(:inicio AS date) + k * 3, CAST(:inicio AS date) + k * 3 + 2, 'completada'
+                    FROM generate_series(0, 40) AS k
+                """), {"inicio": date(2024, 1, 1)})
+                await conn.execute(text("""
+                    INSERT INTO facturas (reserva_id, fecha_emision, total)
+                    SELECT r.id, r.fecha_fin, 180 FROM reservas r CROSS JOIN generate_series(1, 2)
+                """))
+                await conn.execute(text("""
+                    INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago)
+                    SELECT f.id, f.fecha_emision, 60, 'tarjeta' FROM facturas f CROSS JOIN generate_series(1, 3)
+                """))
+
+            consultas = []
+            event.listen(engine.sync_engine, "before_cursor_execute",
+                         lambda conn, cursor, sql, *args: consultas.append(sql))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            conteos, resumenes = [], []
+            for cliente_id in (1, 2):
+                async with Sesion() as db:
+                    consultas.clear()
+                    cliente = await crud_cliente.get_cliente_resumen(db, cliente_id)
+                    # Serializar no dispara cargas perezosas: todo está en memoria
+                    resumenes.append(ClienteResumen.model_validate(cliente, from_attributes=True))
+                    conteos.append(len(consultas))
+            await engine.dispose()
+            return conteos, resumenes
+
+        conteos, (frecuente, nuevo) = asyncio.run(escenario())
+        assert conteos == [4, 4]
+        assert len(frecuente.reservas) == 40
+        assert sum(len(f.pagos) for r in frecuente.reservas for f in r.facturas) == 240
+        assert len(nuevo.reservas) == 1
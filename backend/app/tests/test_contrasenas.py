@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+from app.services import contrasenas
+
+
+def test_hashear_y_verificar(monkeypatch):
+    monkeypatch.setattr(contrasenas, "BCRYPT_ROUNDS", 5)
+
+    async def escenario():
+        hash_ = await contrasenas.hashear("secreta")
+        return hash_, await contrasenas.verificar("secreta", hash_), await contrasenas.verificar("otra", hash_)
+
+    hash_, correcta, incorrecta = asyncio.run(escenario())
+    assert hash_.startswith("$2b$05$")
+    assert correcta and not incorrecta
+
+
+def test_el_loop_sigue_atendiendo_mientras_se_hashea(monkeypatch):
+    """Con el hash en el pool, otra tarea del loop no queda frenada mientras dura"""
+    monkeypatch.setattr(contrasenas, "BCRYPT_ROUNDS", 10)
+
+    async def escenario():
+        huecos = []
+
+        async def latido():
+            anterior = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.005)
+                ahora = time.perf_counter()
+                huecos.append(ahora - anterior)
+                anterior = ahora
+
+        tarea = asyncio.create_task(latido())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(contrasenas.hashear("secreta") for _ in range(3)))
+        duracion = time.perf_counter() - inicio
+        tarea.cancel()
+        return duracion, max(huecos)
+
+    duracion, hueco_maximo = asyncio.run(escenario())
+    # El latido nunca espera lo que tarda un hash completo
+    assert hueco_maximo < duracion / 3
+
+
+def test_concurrencia_acotada(monkeypatch):
+    monkeypatch.setattr(contrasenas, "CONCURRENCIA", 1)
+    en_curso, maximo = 0, 0
+    cerrojo = threading.Lock()
+
+    def hash_lento(password, rondas):
+        nonlocal en_curso, maximo
+        with cerrojo:
+            en_curso += 1
+            maximo = max(maximo, en_curso)
+        time.sleep(0.02)
+        with cerrojo:
+            en_curso -= 1
+        return password
+
+    monkeypatch.setattr(contrasenas, "hash_password", hash_lento)
+
+    async def escenario():
+        return await asyncio.gather(*(contrasenas.hashear(str(i)) for i in range(5)))
+
+    assert asyncio.run(escenario()) == ["0", "1", "2", "3", "4"]
+    assert maximo == 1
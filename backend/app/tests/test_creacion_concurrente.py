@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.database import Base, crear_esquema
+from app.crud import cliente as crud_cliente, cuenta as crud_cuenta, parametro as crud_parametro
+from app.models.cliente import Cliente
+from app.models.cuenta import Cuenta
+from app.models.parametro import Parametro
+from app.schemas.cliente import ClienteCreate
+from app.schemas.cuenta import CuentaCreate
+from app.schemas.parametro import ParametroCreate
+
+PETICIONES = 10
+
+CASOS = [
+    (crud_cliente.create_cliente, Cliente,
+     lambda i: ClienteCreate(nombre=f"Cliente {i}", documento_identidad="DOC-1")),
+    (crud_cuenta.crear_cuenta, Cuenta,
+     lambda i: CuentaCreate(codigo="1001", nombre=f"Caja {i}", tipo="activo", nivel=1)),
+    (crud_parametro.create_parametro, Parametro,
+     lambda i: ParametroCreate(clave="IVA", valor=str(i))),
+]
+
+
+class TestCreacionConcurrente:
+    """Altas simultáneas con la misma clave única contra PostgreSQL real"""
+
+    @pytest.mark.parametrize("crear, modelo, datos", CASOS, ids=["cliente", "cuenta", "parametro"])
+    def test_una_sola_alta_gana(self, test_database_url, crear, modelo, datos):
+        async def escenario():
+            engine = create_async_engine(test_database_url, pool_size=PETICIONES)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+            async def alta(i):
+                async with Sesion() as db:
+                    return await crear(db, datos(i))
+
+            # Sin la consulta previa, ninguna alta termina en IntegrityError: las que pierden devuelven None
+            creados = await asyncio.gather(*(alta(i) for i in range(PETICIONES)))
+            async with Sesion() as db:
+                filas = (await db.execute(select(func.count()).select_from(modelo))).scalar()
+            await engine.dispose()
+            return creados, filas
+
+        creados, filas = asyncio.run(escenario())
+        ganadores = [c for c in creados if c is not None]
+        assert len(ganadores) == 1
+        assert ganadores[0].id is not None
+        assert filas == 1
@@ -1,7 +1,9 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from app.main import app
+from app.crud import cuenta as crud_cuenta
 
 client = TestClient(app)
 
@@ -49,10 +51,8 @@ class TestCuentasEndpoints:
         return mock_cuenta
     
     @patch("app.crud.cuenta.crear_cuenta")
-    @patch("app.crud.cuenta.obtener_cuenta_por_codigo")
-    def test_crear_cuenta_exitoso(self, mock_obtener_por_codigo, mock_crear_cuenta, mock_cuenta):
+    def test_crear_cuenta_exitoso(self, mock_crear_cuenta, mock_cuenta):
         """Test para crear una cuenta correctamente"""
-        mock_obtener_por_codigo.return_value = None  # No existe cuenta con ese código
         mock_crear_cuenta.return_value = mock_cuenta
         
         payload = {
@@ -69,6 +69,16 @@ class TestCuentasEndpoints:
         assert data["nombre"] == "Caja General"
         assert data["tipo"] == "activo"
         assert data["nivel"] == 1
+
+    @patch("app.crud.cuenta.crear_cuenta")
+    def test_crear_cuenta_codigo_duplicado(self, mock_crear_cuenta):
+        """Si el código ya existe el INSERT no devuelve fila y la ruta responde 400"""
+        mock_crear_cuenta.return_value = None
+
+        payload = {"codigo": "1001", "nombre": "Caja General", "tipo": "activo", "nivel": 1}
+        response = client.post("/cuentas/", json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Ya existe una cuenta con ese código"
   
     
     @patch("app.crud.cuenta.obtener_cuenta")
@@ -150,6 +160,75 @@ class TestCuentasEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert data["mensaje"] == "Cuenta eliminada correctamente"
+    @patch("app.crud.cuenta.obtener_arbol")
+    def test_arbol_de_cuentas(self, mock_obtener_arbol):
+        """La ruta /cuentas/arbol no debe confundirse con /cuentas/{cuenta_id}"""
+        mock_obtener_arbol.return_value = crud_cuenta.armar_arbol([
+            self.create_mock_cuenta_object(id=1, codigo="1", nombre="Activo", nivel=1),
+            self.create_mock_cuenta_object(id=2, codigo="11", nombre="Activo corriente", nivel=2),
+        ])
+        response = client.get("/cuentas/arbol?prefijo=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["codigo"] == "1"
+        assert data[0]["hijos"][0]["codigo"] == "11"
+        assert mock_obtener_arbol.call_args.args[1] == "1"
+
+    def test_armar_arbol(self):
+        """Cada cuenta cuelga de la de código más largo que sea prefijo del suyo"""
+        codigos = ["2", "1101", "1", "11", "1102", "110201", "12", "3"]
+        cuentas = [self.create_mock_cuenta_object(id=i, codigo=c) for i, c in enumerate(codigos, 1)]
+        raices = crud_cuenta.armar_arbol(cuentas)
+
+        def forma(nodos):
+            return [(n.codigo, n.descendientes, forma(n.hijos)) for n in nodos]
+
+        assert forma(raices) == [
+            ("1", 5, [
+                ("11", 3, [("1101", 0, []), ("1102", 1, [("110201", 0, [])])]),
+                ("12", 0, []),
+            ]),
+            ("2", 0, []),
+            ("3", 0, []),
+        ]
+
+    def test_arbol_en_memoria_hasta_un_cambio(self):
+        """El árbol completo se arma una vez y se vuelve a consultar después de un alta"""
+        crud_cuenta.invalidar_arbol()
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(scalars=MagicMock(return_value=MagicMock(
+            all=MagicMock(return_value=[self.create_mock_cuenta_object()])
+        )))
+        asyncio.run(crud_cuenta.obtener_arbol(db))
+        asyncio.run(crud_cuenta.obtener_arbol(db))
+        assert db.execute.await_count == 1
+
+        db.execute.return_value.scalar_one_or_none.return_value = self.create_mock_cuenta_object(id=2)
+        with patch("app.crud.cuenta.insertar", new_callable=AsyncMock) as mock_insertar:
+            mock_insertar.return_value = self.create_mock_cuenta_object(id=2, codigo="1002")
+            asyncio.run(crud_cuenta.crear_cuenta(db, MagicMock()))
+        asyncio.run(crud_cuenta.obtener_arbol(db))
+        assert db.execute.await_count == 2
+        crud_cuenta.invalidar_arbol()
+
+    def test_arbol_leido_antes_de_un_cambio_no_se_guarda(self):
+        """Si se invalida mientras se consulta, el árbol viejo no queda en memoria"""
+        crud_cuenta.invalidar_arbol()
+        resultado = MagicMock(all=MagicMock(return_value=[self.create_mock_cuenta_object()]))
+
+        async def consulta_con_alta_en_medio(*args):
+            crud_cuenta.invalidar_arbol()  # otra petición confirmó un cambio mientras tanto
+            return resultado
+
+        db = AsyncMock()
+        db.execute.side_effect = consulta_con_alta_en_medio
+        arbol = asyncio.run(crud_cuenta.obtener_arbol(db))
+        assert [n.codigo for n in arbol] == ["1001"]
+        db.execute.side_effect = None
+        db.execute.return_value = resultado
+        asyncio.run(crud_cuenta.obtener_arbol(db))
+        assert db.execute.await_count == 2
+        crud_cuenta.invalidar_arbol()
    
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -7,6 +7,11 @@ from app.main import app
 client = TestClient(app)
 
 
+async def _tandas(*tandas):
+    for tanda in tandas:
+        yield tanda
+
+
 class TestEgresosEndpoints:
     """Tests para las rutas de egresos con mocks"""
 
@@ -41,10 +46,10 @@ class TestEgresosEndpoints:
         
 
 
-    @patch("app.crud.egreso.obtener_egresos")
-    def test_listar_egresos(self, mock_obtener_egresos, mock_egreso):
+    @patch("app.crud.egreso.recorrer_egresos")
+    def test_listar_egresos(self, mock_recorrer_egresos, mock_egreso):
         """Test para listar egresos"""
-        mock_obtener_egresos.return_value = [mock_egreso]
+        mock_recorrer_egresos.return_value = _tandas([mock_egreso])
 
         response = client.get("/egresos/")
         assert response.status_code == 200
@@ -54,6 +59,23 @@ class TestEgresosEndpoints:
         assert data[0]["monto"] == mock_egreso["monto"]
         assert data[0]["descripcion"] == mock_egreso["descripcion"]
 
+    @patch("app.crud.egreso.crear_egresos_lote")
+    def test_crear_egresos_lote(self, mock_crear_lote):
+        """Test para cargar un lote de egresos y recibir los ids en orden"""
+        mock_crear_lote.return_value = [11, 12, 13]
+        payload = [{"descripcion": f"Compra {i}", "monto": 10.0 * i} for i in range(1, 4)]
+
+        response = client.post("/egresos/lote", json=payload)
+        assert response.status_code == 200
+        assert response.json() == [11, 12, 13]
+        assert [e.descripcion for e in mock_crear_lote.call_args.args[1]] == ["Compra 1", "Compra 2", "Compra 3"]
+
+    def test_crear_egresos_lote_vacio_o_invalido(self):
+        """Test para rechazar un lote vacío o con una línea inválida"""
+        assert client.post("/egresos/lote", json=[]).status_code == 400
+        payload = [{"descripcion": "Compra", "monto": 10.0}, {"descripcion": "Sin monto"}]
+        assert client.post("/egresos/lote", json=payload).status_code == 422
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.database import Base, crear_esquema
+from app.crud import habitacion as crud_habitacion
+from app.crud.reserva import crear_reserva, cancelar_reserva
+from app.schemas.reserva import ReservaCreate
+from app.services.estado_habitaciones import segundos_hasta_proximo_refresco
+
+HOY = date.today()
+
+
+def test_segundos_hasta_proximo_refresco():
+    assert segundos_hasta_proximo_refresco(datetime(2025, 1, 1, 23, 0), time(0, 0)) == 3600
+    assert segundos_hasta_proximo_refresco(datetime(2025, 1, 1, 0, 0), time(0, 0)) == 86400
+    assert segundos_hasta_proximo_refresco(datetime(2025, 1, 1, 1, 0), time(3, 0)) == 7200
+
+
+class TestEstadoDerivado:
+    """El estado de la habitación sale de las reservas, no de escrituras en cada reserva"""
+
+    def test_reservar_no_escribe_habitaciones(self, test_database_url):
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'A', 'A-1')"))
+                await conn.execute(text(
+                    "INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) VALUES "
+                    "(1, '101', 'suite', 120, 'disponible'), (2, '102', 'suite', 120, 'mantenimiento')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with Sesion() as db:
+                # Una estancia dentro de tres meses y otra que cubre hoy, en la misma habitación
+                futura = await crear_reserva(db, ReservaCreate(
+                    cliente_id=1, habitacion_id=1,
+                    fecha_inicio=HOY + timedelta(days=90), fecha_fin=HOY + timedelta(days=92)
+                ))
+                guardado_tras_futura = (await db.execute(text("SELECT estado FROM habitaciones WHERE id = 1"))).scalar()
+                actual_tras_futura = (await crud_habitacion.obtener_habitacion_por_id(db, 1)).estado_actual
+                await crear_reserva(db, ReservaCreate(
+                    cliente_id=1, habitacion_id=1, fecha_inicio=HOY, fecha_fin=HOY + timedelta(days=1)
+                ))
+                actuales = {h.numero: h.estado_actual for h in await crud_habitacion.obtener_habitaciones(db)}
+                actualizadas = await crud_habitacion.refrescar_estados(db)
+                guardados = dict((await db.execute(text("SELECT numero, estado FROM habitaciones"))).all())
+                await cancelar_reserva(db, futura.id)
+            await engine.dispose()
+            return guardado_tras_futura, actual_tras_futura, actuales, actualizadas, guardados
+
+        guardado, actual, actuales, actualizadas, guardados = asyncio.run(escenario())
+        assert guardado == "disponible"
+        assert actual == "disponible"
+        assert actuales == {"101": "ocupada", "102": "mantenimiento"}
+        # El refresco masivo solo toca la habitación que cambió
+        assert actualizadas == 1
+        assert guardados == {"101": "ocupada", "102": "mantenimiento"}
@@ -0,0 +1,172 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date
+from unittest.mock import patch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.crud import factura as crud_factura
+from app.database import Base, crear_esquema
+
+client = TestClient(app)
+
+
+class TestFacturasEndpoints:
+    """Tests para las rutas de facturas con mocks"""
+
+    @pytest.fixture
+    def mock_saldo(self):
+        return {
+            "id": 3,
+            "reserva_id": 1,
+            "fecha_emision": "2030-01-03",
+            "estado": "pendiente",
+            "total": 180.0,
+            "pagado": 50.0,
+            "saldo": 130.0,
+        }
+
+    @patch("app.crud.factura.obtener_saldos")
+    def test_listar_saldos(self, mock_obtener_saldos, mock_saldo):
+        """Test para listar saldos con filtros y cursor de la página siguiente"""
+        mock_obtener_saldos.return_value = ([mock_saldo], "siguiente")
+
+        response = client.get("/facturas/saldos", params={"cliente_id": 1, "con_saldo": True, "limite": 1})
+        assert response.status_code == 200
+        assert response.json() == [mock_saldo]
+        assert response.headers["X-Siguiente-Cursor"] == "siguiente"
+        assert mock_obtener_saldos.call_args.args[1:] == (None, None, None, 1, True, 1, None)
+
+    def test_listar_saldos_periodo_invertido(self):
+        """Test para rechazar una fecha de inicio posterior a la de fin"""
+        response = client.get("/facturas/saldos", params={"desde": "2030-02-01", "hasta": "2030-01-01"})
+        assert response.status_code == 400
+
+    @patch("app.crud.factura.generar_facturas")
+    def test_generar_facturas(self, mock_generar_facturas):
+        """Test para la corrida de facturación hasta una fecha"""
+        mock_generar_facturas.return_value = (2, 450.0)
+
+        response = client.post("/facturas/generar", params={"hasta": "2030-01-31"})
+        assert response.status_code == 200
+        assert response.json() == {"generadas": 2, "total": 450.0}
+        assert mock_generar_facturas.call_args.args[1] == date(2030, 1, 31)
+
+    def test_generar_facturas_contra_postgres(self, test_database_url):
+        """Solo reservas terminadas, no canceladas y sin factura; repetir no duplica"""
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Ana', 'D1')"))
+                await conn.execute(text(
+                    "INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90), (2, '102', 'suite', 150)"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) VALUES "
+                    "(1, 1, 1, '2030-01-01', '2030-01-03', 'reservada'), (2, 1, 2, '2030-01-01', '2030-01-02', 'completada'), "
+                    "(3, 1, 1, '2030-01-05', '2030-01-07', 'cancelada'), (4, 1, 1, '2030-01-10', '2030-01-12', 'reservada'), "
+                    "(5, 1, 2, '2030-02-01', '2030-02-05', 'reservada')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO facturas (reserva_id, fecha_emision, total, estado) VALUES (4, '2030-01-12', 100, 'pagada')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with Sesion() as db:
+                primera = await crud_factura.generar_facturas(db, date(2030, 1, 31))
+                segunda = await crud_factura.generar_facturas(db, date(2030, 1, 31))
+                facturas = (await db.execute(text(
+                    "SELECT reserva_id, fecha_emision, total, estado FROM facturas ORDER BY reserva_id"
+                ))).all()
+            await engine.dispose()
+            return primera, segunda, facturas
+
+        primera, segunda, facturas = asyncio.run(escenario())
+        assert primera == (2, 330.0)
+        assert segunda == (0, 0.0)
+        assert [(r, e, float(t), s) for r, e, t, s in facturas] == [
+            (1, date(2030, 1, 3), 180, "pendiente"),
+            (2, date(2030, 1, 2), 150, "pendiente"),
+            (4, date(2030, 1, 12), 100, "pagada"),
+        ]
+
+    def test_datos_pdf_contra_postgres(self, test_database_url):
+        """Factura con cliente, habitación y pagos en orden; las inexistentes no aparecen"""
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Ana', 'D1')"))
+                await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+                await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                                        "VALUES (1, 1, 1, '2030-01-01', '2030-01-03')"))
+                await conn.execute(text(
+                    "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) VALUES "
+                    "(1, 1, '2030-01-03', 180, 'pendiente'), (2, NULL, '2030-01-04', 40, 'pendiente')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) VALUES "
+                    "(1, '2030-01-04', 30, 'tarjeta'), (1, '2030-01-03', 100, 'efectivo')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with Sesion() as db:
+                datos = await crud_factura.obtener_datos_pdf(db, [1, 2, 99])
+            await engine.dispose()
+            return datos
+
+        datos = asyncio.run(escenario())
+        assert sorted(datos) == [1, 2]
+        assert (datos[1]["cliente"], datos[1]["habitacion"], float(datos[1]["precio_noche"])) == ("Ana", "101", 90)
+        assert [(f, m, float(x)) for f, m, x in datos[1]["pagos"]] == [
+            (date(2030, 1, 3), "efectivo", 100), (date(2030, 1, 4), "tarjeta", 30)
+        ]
+        assert datos[2]["reserva_id"] is None and datos[2]["pagos"] == []
+
+    def test_saldos_contra_postgres(self, test_database_url):
+        """Sumas, filtros y páginas contra PostgreSQL real"""
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text(
+                    "INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Ana', 'D1'), (2, 'Luis', 'D2')"
+                ))
+                await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+                await conn.execute(text(
+                    "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                    "VALUES (1, 1, 1, '2030-01-01', '2030-01-03'), (2, 2, 1, '2030-01-05', '2030-01-07')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) VALUES "
+                    "(1, 1, '2030-01-03', 180, 'pendiente'), (2, 1, '2030-01-03', 40, 'pagada'), "
+                    "(3, 2, '2030-01-07', 200, 'pendiente')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) VALUES "
+                    "(1, '2030-01-03', 100, 'efectivo'), (1, '2030-01-04', 30, 'tarjeta'), (2, '2030-01-03', 40, 'tarjeta')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with Sesion() as db:
+                todas, _ = await crud_factura.obtener_saldos(db)
+                primera, cursor = await crud_factura.obtener_saldos(db, limite=2)
+                segunda, fin = await crud_factura.obtener_saldos(db, limite=2, cursor=cursor)
+                de_ana, _ = await crud_factura.obtener_saldos(db, cliente_id=1, con_saldo=True)
+                pendientes, _ = await crud_factura.obtener_saldos(db, estado="pendiente", desde=date(2030, 1, 5))
+            await engine.dispose()
+            return todas, primera, segunda, fin, de_ana, pendientes
+
+        todas, primera, segunda, fin, de_ana, pendientes = asyncio.run(escenario())
+        assert [(f.id, float(f.pagado), float(f.saldo)) for f in todas] == [(1, 130, 50), (2, 40, 0), (3, 0, 200)]
+        assert [f.id for f in primera + segunda] == [1, 2, 3] and fin is None
+        assert [f.id for f in de_ana] == [1]
+        assert [f.id for f in pendientes] == [3]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+import asyncio
+import io
+import os
+import zipfile
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.main import app
+from app.services import facturas_pdf
+
+client = TestClient(app)
+
+
+def _datos(factura_id=7, pagos=()):
+    return {
+        "id": factura_id, "fecha_emision": date(2030, 1, 3), "estado": "pendiente", "total": Decimal("180.00"),
+        "reserva_id": 1, "fecha_inicio": date(2030, 1, 1), "fecha_fin": date(2030, 1, 3),
+        "cliente": "José (Pepe) Núñez", "documento_identidad": "D1",
+        "habitacion": "101", "tipo": "doble", "precio_noche": Decimal("90.00"), "pagos": list(pagos),
+    }
+
+
+def test_renderizar_arma_un_pdf_valido():
+    pdf = facturas_pdf.renderizar(_datos(pagos=[(date(2030, 1, 3), "efectivo", Decimal("100"))]))
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    # La tabla xref apunta al comienzo de cada objeto
+    inicio_xref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    entradas = pdf[inicio_xref:].split(b"\n")[3:]
+    for numero, entrada in enumerate(entradas[:5], start=1):
+        posicion = int(entrada[:10])
+        assert pdf[posicion:].startswith(f"{numero} 0 obj".encode())
+
+
+def test_muchos_pagos_ocupan_varias_paginas():
+    pdf = facturas_pdf.renderizar(_datos(pagos=[(date(2030, 1, 3), "efectivo", Decimal("1"))] * 80))
+    assert b"/Count 2" in pdf
+
+
+def test_cache_por_version(monkeypatch, tmp_path):
+    """El segundo pedido sale del disco; un pago nuevo genera otra versión y borra la anterior"""
+    monkeypatch.setattr(facturas_pdf, "CACHE_DIR", str(tmp_path))
+
+    async def escenario():
+        primero = await facturas_pdf.obtener_pdf(_datos())
+        with patch.object(facturas_pdf, "_en_pool") as mock_pool:
+            segundo = await facturas_pdf.obtener_pdf(_datos())
+        tercero = await facturas_pdf.obtener_pdf(_datos(pagos=[(date(2030, 1, 3), "tarjeta", Decimal("180"))]))
+        return primero, segundo, mock_pool.called, tercero
+
+    primero, segundo, uso_el_pool, tercero = asyncio.run(escenario())
+    assert primero == segundo and not uso_el_pool
+    assert tercero != primero
+    assert os.listdir(tmp_path / "7") == [os.path.basename(facturas_pdf.ruta_en_cache(
+        _datos(pagos=[(date(2030, 1, 3), "tarjeta", Decimal("180"))])
+    ))]
+
+
+class TestFacturasPdfEndpoints:
+    """Tests para las rutas de PDF de facturas con mocks"""
+
+    @patch("app.services.facturas_pdf.obtener_pdf")
+    @patch("app.crud.factura.obtener_datos_pdf")
+    def test_factura_pdf(self, mock_datos, mock_pdf):
+        mock_datos.return_value = {7: _datos()}
+        mock_pdf.return_value = b"%PDF-1.4 ..."
+
+        response = client.get("/facturas/7/pdf")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content == b"%PDF-1.4 ..."
+
+    @patch("app.crud.factura.obtener_datos_pdf")
+    def test_factura_pdf_inexistente(self, mock_datos):
+        mock_datos.return_value = {}
+        assert client.get("/facturas/99/pdf").status_code == 404
+
+    @patch("app.crud.factura.obtener_datos_pdf")
+    def test_pdf_lote(self, mock_datos, monkeypatch, tmp_path):
+        """ZIP con un PDF por factura, sin repetir ids"""
+        monkeypatch.setattr(facturas_pdf, "CACHE_DIR", str(tmp_path))
+        mock_datos.return_value = {7: _datos(7), 8: _datos(8)}
+
+        response = client.post("/facturas/pdf-lote", json=[8, 7, 8])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zip_:
+            assert zip_.namelist() == ["factura_8.pdf", "factura_7.pdf"]
+            assert zip_.read("factura_7.pdf") == facturas_pdf.renderizar(_datos(7))
+        assert mock_datos.call_args.args[1] == [8, 7]
+        assert sorted(os.listdir(tmp_path)) == ["7", "8"]
+
+    @patch("app.crud.factura.obtener_datos_pdf")
+    def test_pdf_lote_con_facturas_inexistentes(self, mock_datos):
+        mock_datos.return_value = {7: _datos(7)}
+        response = client.post("/facturas/pdf-lote", json=[7, 99])
+        assert response.status_code == 404
+        assert "99" in response.json()["detail"]
+
+    def test_pdf_lote_vacio_o_excedido(self, monkeypatch):
+        assert client.post("/facturas/pdf-lote", json=[]).status_code == 400
+        monkeypatch.setattr(facturas_pdf, "LOTE_MAXIMO", 2)
+        assert client.post("/facturas/pdf-lote", json=[1, 2, 3]).status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
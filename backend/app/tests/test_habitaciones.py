@@ -45,6 +45,25 @@ class TestHabitacionesEndpoints:
         assert isinstance(data, list)
         assert data[0]["id"] == 1
 
+    @patch("app.crud.habitacion.obtener_habitaciones_disponibles")
+    def test_listar_habitaciones_disponibles(self, mock_disponibles, mock_habitacion):
+        """Test para buscar habitaciones libres en un rango de fechas"""
+        mock_disponibles.return_value = [mock_habitacion]
+        response = client.get(
+            "/habitaciones/disponibles?fecha_inicio=2025-01-10&fecha_fin=2025-01-12&tipo=simple"
+        )
+        assert response.status_code == 200
+        assert response.json()[0]["numero"] == "101"
+        args = mock_disponibles.call_args.args
+        assert str(args[1]) == "2025-01-10"
+        assert str(args[2]) == "2025-01-12"
+        assert args[3] == "simple"
+
+    def test_listar_habitaciones_disponibles_rango_invalido(self):
+        """Test para rechazar un rango de fechas invertido"""
+        response = client.get("/habitaciones/disponibles?fecha_inicio=2025-01-12&fecha_fin=2025-01-10")
+        assert response.status_code == 400
+
     @patch("app.crud.habitacion.obtener_habitacion_por_id")
     def test_obtener_habitacion_por_id(self, mock_obtener_por_id, mock_habitacion):
         """Test para obtener habitación por ID"""
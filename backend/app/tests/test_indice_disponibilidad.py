@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from datetime import date, timedelta
+from types import SimpleNamespace
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.database import Base, crear_esquema
+from app.crud.habitacion import obtener_habitaciones_disponibles
+from app.schemas.habitacion import HabitacionOut
+from app.services import indice_disponibilidad
+from app.services.indice_disponibilidad import IndiceDisponibilidad
+
+
+def habitacion(id, numero, tipo="simple", estado="disponible"):
+    return SimpleNamespace(id=id, numero=numero, tipo=tipo, precio_noche=50.0, estado=estado)
+
+
+class TestIndiceDisponibilidad:
+    """Tests del índice de disponibilidad en memoria (sin base de datos)"""
+
+    @pytest.fixture
+    def indice(self):
+        indice = IndiceDisponibilidad(ttl_segundos=60)
+        indice._reconstruir(
+            [habitacion(1, "101"), habitacion(2, "102", "suite"), habitacion(3, "103", estado="mantenimiento")],
+            [
+                (10, 1, date(2025, 1, 10), date(2025, 1, 12)),
+                (11, 1, date(2025, 1, 15), date(2025, 1, 20)),
+                (12, 2, date(2025, 1, 1), date(2025, 1, 31)),
+            ],
+            date(2025, 1, 1),
+        )
+        return indice
+
+    def test_rangos_libres_y_ocupados(self, indice):
+        """Test de cruces en los bordes: la salida y la entrada pueden ser el mismo día"""
+        assert indice.esta_libre(1, date(2025, 1, 12), date(2025, 1, 15))
+        assert indice.esta_libre(1, date(2025, 1, 5), date(2025, 1, 10))
+        assert not indice.esta_libre(1, date(2025, 1, 11), date(2025, 1, 13))
+        assert not indice.esta_libre(1, date(2025, 1, 9), date(2025, 1, 25))
+        assert indice.esta_libre(1, date(2025, 1, 20), date(2025, 1, 22))
+        assert indice.esta_libre(99, date(2025, 1, 1), date(2025, 1, 2))
+
+    def test_habitaciones_disponibles_como_sql(self, indice):
+        """Test de que excluye ocupadas y habitaciones que no están 'disponible'"""
+        libres = indice.habitaciones_disponibles(date(2025, 1, 12), date(2025, 1, 14))
+        assert [h.numero for h in libres] == ["101"]
+        assert indice.habitaciones_disponibles(date(2025, 2, 1), date(2025, 2, 3), tipo="suite")[0].id == 2
+
+    def test_cancelar_y_crear_actualizan_el_indice(self, indice):
+        indice.quitar_reserva(11)
+        assert indice.esta_libre(1, date(2025, 1, 15), date(2025, 1, 20))
+        indice.registrar_reserva(SimpleNamespace(
+            id=13, habitacion_id=1, fecha_inicio=date(2025, 1, 16), fecha_fin=date(2025, 1, 18), estado="reservada"
+        ))
+        assert not indice.esta_libre(1, date(2025, 1, 17), date(2025, 1, 19))
+        assert indice.estancias_entre(1, date(2025, 1, 11), date(2025, 1, 17)) == [
+            (date(2025, 1, 10), date(2025, 1, 12)), (date(2025, 1, 16), date(2025, 1, 18))
+        ]
+
+    def test_cambios_durante_la_recarga_no_se_pierden(self, indice):
+        """Test de que lo registrado mientras se recarga se reaplica sobre la foto nueva"""
+        indice._pendientes = []
+        indice.quitar_reserva(10)
+        indice._reconstruir(
+            [habitacion(1, "101")],
+            [(10, 1, date(2025, 1, 10), date(2025, 1, 12))],  # foto leída antes de cancelar
+            date(2025, 1, 1),
+        )
+        assert indice.esta_libre(1, date(2025, 1, 10), date(2025, 1, 12))
+
+    def test_estado_actual_con_las_estancias_del_indice(self, indice):
+        """Test de que una estancia que cubre hoy deja la habitación 'ocupada'"""
+        assert indice.estado_actual(indice._habitaciones[1], date(2025, 1, 11)) == "ocupada"
+        assert indice.estado_actual(indice._habitaciones[1], date(2025, 1, 12)) == "disponible"
+        assert indice.estado_actual(indice._habitaciones[3], date(2025, 1, 11)) == "mantenimiento"
+
+    def test_caduca_sin_resincronizar(self, indice):
+        """Test de que un índice sin recarga reciente deja de usarse"""
+        assert indice.cubre(date(2025, 1, 1))
+        assert not indice.cubre(date(2024, 12, 31))
+        indice.ttl_segundos = 0
+        assert not indice.vigente
+        assert not indice.cubre(date(2025, 1, 5))
+
+
+class TestIndiceContraSQL:
+    """El índice y la ruta SQL devuelven lo mismo contra PostgreSQL real"""
+
+    def test_disponibles_iguales_con_y_sin_indice(self, test_database_url, monkeypatch):
+        hoy = date.today()
+
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'A', 'A-1')"))
+                await conn.execute(text(
+                    "INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) VALUES "
+                    "(1, '101', 'simple', 50, 'disponible'), (2, '102', 'simple', 50, 'disponible'), "
+                    "(3, '103', 'suite', 90, 'disponible'), (4, '104', 'suite', 90, 'mantenimiento')"
+                ))
+                # 101 ocupada hoy, 102 libre hoy pero reservada más adelante, 103 libre
+                await conn.execute(text(
+                    "INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) VALUES "
+                    "(1, 1, :ayer, :manana, 'reservada'), (1, 2, :en_10, :en_12, 'reservada')"
+                ), {"ayer": hoy - timedelta(days=1), "manana": hoy + timedelta(days=1),
+                    "en_10": hoy + timedelta(days=10), "en_12": hoy + timedelta(days=12)})
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            indice = IndiceDisponibilidad(ttl_segundos=60)
+            monkeypatch.setattr(indice_disponibilidad, "indice", indice)
+
+            resultados = {}
+            async with Sesion() as db:
+                await indice.cargar(db)
+                for habilitado in (False, True):
+                    monkeypatch.setattr(indice_disponibilidad, "HABILITADO", habilitado)
+                    resultados[habilitado] = [
+                        [HabitacionOut.model_validate(h, from_attributes=True).model_dump()
+                         for h in await obtener_habitaciones_disponibles(db, inicio, fin)]
+                        for inicio, fin in [
+                            (hoy + timedelta(days=2), hoy + timedelta(days=4)),
+                            (hoy + timedelta(days=9), hoy + timedelta(days=11)),
+                        ]
+                    ]
+            await engine.dispose()
+            return resultados
+
+        resultados = asyncio.run(escenario())
+        assert resultados[True] == resultados[False]
+        cerca, lejos = resultados[True]
+        assert [(h["numero"], h["estado_actual"]) for h in cerca] == [
+            ("101", "ocupada"), ("102", "disponible"), ("103", "disponible")
+        ]
+        assert [h["numero"] for h in lejos] == ["101", "103"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
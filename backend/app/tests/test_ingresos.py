@@ -1,13 +1,30 @@
+import asyncio
+import json
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from datetime import date
 from unittest.mock import patch
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.main import app
+from app.crud import ingreso as crud_ingreso
+from app.database import Base, crear_esquema, get_async_session
+from app.models.ingreso import Ingreso
+from app.schemas.ingreso import IngresoCreate
 
 client = TestClient(app)
 
 
+async def _tandas(*tandas):
+    for tanda in tandas:
+        yield tanda
+
+
 class TestIngresosEndpoints:
     """Tests para las rutas de ingresos con mocks"""
 
@@ -44,10 +61,10 @@ class TestIngresosEndpoints:
         assert data["reserva_id"] == mock_ingreso["reserva_id"]
 
 
-    @patch("app.crud.ingreso.obtener_ingresos")
-    def test_listar_ingresos(self, mock_obtener_ingresos, mock_ingreso):
+    @patch("app.crud.ingreso.recorrer_ingresos")
+    def test_listar_ingresos(self, mock_recorrer_ingresos, mock_ingreso):
         """Test para listar ingresos"""
-        mock_obtener_ingresos.return_value = [mock_ingreso]
+        mock_recorrer_ingresos.return_value = _tandas([mock_ingreso])
 
         response = client.get("/ingresos/")
         assert response.status_code == 200
@@ -58,6 +75,113 @@ class TestIngresosEndpoints:
         assert data[0]["monto"] == mock_ingreso["monto"]
         assert data[0]["reserva_id"] == mock_ingreso["reserva_id"]
 
+    @patch("app.crud.ingreso.recorrer_ingresos")
+    def test_listar_ingresos_ndjson_por_periodo(self, mock_recorrer_ingresos, mock_ingreso):
+        """Test para listar un período como NDJSON, con una línea por ingreso de cada tanda"""
+        segundo = dict(mock_ingreso, id=7)
+        mock_recorrer_ingresos.return_value = _tandas([mock_ingreso], [], [segundo])
+
+        response = client.get("/ingresos/", params={
+            "fecha_inicio": "2030-01-01", "fecha_fin": "2030-01-31", "formato": "ndjson",
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(linea)["id"] for linea in response.text.splitlines()] == [6, 7]
+        assert mock_recorrer_ingresos.call_args.args[1:] == (date(2030, 1, 1), date(2030, 1, 31))
+
+    def test_listar_ingresos_periodo_invertido(self):
+        """Test para rechazar una fecha de inicio posterior a la de fin"""
+        response = client.get("/ingresos/", params={"fecha_inicio": "2030-02-01", "fecha_fin": "2030-01-01"})
+        assert response.status_code == 400
+
+    @patch("app.crud.ingreso.crear_ingresos_lote")
+    def test_crear_ingresos_lote(self, mock_crear_lote):
+        """Test para cargar un lote de ingresos y recibir los ids en orden"""
+        mock_crear_lote.return_value = [7, 8]
+        payload = [
+            {"reserva_id": 2, "monto": 20.0, "descripcion": "Minibar"},
+            {"reserva_id": 3, "monto": 35.5, "descripcion": "Restaurante"},
+        ]
+
+        response = client.post("/ingresos/lote", json=payload)
+        assert response.status_code == 200
+        assert response.json() == [7, 8]
+        assert len(mock_crear_lote.call_args.args[1]) == 2
+
+    def test_crear_ingresos_lote_vacio(self):
+        """Test para rechazar un lote sin ingresos"""
+        assert client.post("/ingresos/lote", json=[]).status_code == 400
+
+    def test_lote_contra_postgres(self, test_database_url):
+        """Los ids vuelven en el orden del lote y una reserva inexistente no deja nada a medias"""
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'D1')"))
+                await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+                await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                                        "VALUES (1, 1, 1, '2030-01-01', '2030-01-03')"))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            lote = [IngresoCreate(reserva_id=1, monto=i, descripcion=f"Línea {i}") for i in range(1, 2501)]
+            async with Sesion() as db:
+                ids = await crud_ingreso.crear_ingresos_lote(db, lote)
+            async with Sesion() as db:
+                montos = dict((await db.execute(select(Ingreso.id, Ingreso.monto))).all())
+                with pytest.raises(HTTPException) as error:
+                    await crud_ingreso.crear_ingresos_lote(db, [lote[0], IngresoCreate(reserva_id=99, monto=1)])
+            async with Sesion() as db:
+                total = (await db.execute(select(func.count()).select_from(Ingreso))).scalar()
+            await engine.dispose()
+            return ids, montos, error.value, total
+
+        ids, montos, error, total = asyncio.run(escenario())
+        assert [montos[i] for i in ids] == list(range(1, 2501))
+        assert error.status_code == 400
+        assert error.detail["errores"] == [{"indice": 1, "detalle": "Reserva no encontrada."}]
+        assert total == 2500
+
+    def test_listado_en_flujo_contra_postgres(self, test_database_url):
+        """El listado sale completo por tandas del cursor, con la sesión abierta hasta el final"""
+        async def sembrar():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'D1')"))
+                await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+                await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                                        "VALUES (1, 1, 1, '2030-01-01', '2030-01-03')"))
+                await conn.execute(text(
+                    "INSERT INTO ingresos (reserva_id, monto, descripcion, fecha) "
+                    "SELECT 1, n, 'Línea ' || n, DATE '2030-01-01' + n % 10 FROM generate_series(1, 2500) AS n"
+                ))
+            await engine.dispose()
+
+        asyncio.run(sembrar())
+        # Sin pool: las conexiones se abren en el event loop del TestClient
+        engine = create_async_engine(test_database_url, poolclass=NullPool)
+        Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def sesion():
+            async with Sesion() as db:
+                yield db
+
+        app.dependency_overrides[get_async_session] = sesion
+        try:
+            with patch("app.services.listados.LISTADOS_LOTE", 300):
+                todos = client.get("/ingresos/").json()
+                del_periodo = client.get("/ingresos/", params={
+                    "fecha_inicio": "2030-01-03", "fecha_fin": "2030-01-04", "formato": "ndjson",
+                }).text.splitlines()
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [i["id"] for i in todos] == list(range(1, 2501))
+        assert len(del_periodo) == 500
+        assert {json.loads(linea)["fecha"] for linea in del_periodo} == {"2030-01-03", "2030-01-04"}
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
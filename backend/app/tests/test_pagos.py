@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date
+from unittest.mock import patch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.crud import factura as crud_factura, pago as crud_pago
+from app.database import Base, crear_esquema
+from app.schemas.pago import PagoCreate
+
+client = TestClient(app)
+
+PAGOS_SIMULTANEOS = 8
+
+
+async def _preparar(test_database_url):
+    engine = create_async_engine(test_database_url, pool_size=PAGOS_SIMULTANEOS)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await crear_esquema(conn)
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Ana', 'D1')"))
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+        await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                                "VALUES (1, 1, 1, '2030-01-01', '2030-01-03')"))
+        await conn.execute(text(
+            "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) VALUES "
+            "(1, 1, '2030-01-03', 180, 'pendiente'), (2, 1, '2030-01-03', 80, 'anulada'), "
+            "(3, 1, '2030-01-03', 100, 'pendiente')"
+        ))
+    return engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _pago(factura_id, monto):
+    return PagoCreate(factura_id=factura_id, fecha_pago=date(2030, 1, 3), monto=monto, metodo_pago="efectivo")
+
+
+class TestPagosEndpoints:
+    """Tests para las rutas de pagos"""
+
+    @patch("app.crud.pago.crear_pago")
+    def test_crear_pago_factura_inexistente(self, mock_crear_pago):
+        """Test para responder 404 si la factura no existe"""
+        mock_crear_pago.return_value = None
+        payload = {"factura_id": 99, "fecha_pago": "2030-01-03", "monto": 10.0, "metodo_pago": "efectivo"}
+        response = client.post("/pagos", json=payload)
+        assert response.status_code == 404
+
+    def test_pago_salda_la_factura(self, test_database_url):
+        """La factura pasa a 'pagada' en la transacción del pago que completa el total"""
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+            estados = []
+            async with Sesion() as db:
+                for monto in (100, 80):
+                    await crud_pago.crear_pago(db, _pago(1, monto))
+                    estados.append((await db.execute(text("SELECT estado FROM facturas WHERE id = 1"))).scalar())
+                await crud_pago.crear_pago(db, _pago(2, 80))
+                anulada = (await db.execute(text("SELECT estado FROM facturas WHERE id = 2"))).scalar()
+                inexistente = await crud_pago.crear_pago(db, _pago(99, 10))
+            await engine.dispose()
+            return estados, anulada, inexistente
+
+        estados, anulada, inexistente = asyncio.run(escenario())
+        assert estados == ["pendiente", "pagada"]
+        assert anulada == "anulada"
+        assert inexistente is None
+
+    def test_pagos_simultaneos_de_la_misma_factura(self, test_database_url):
+        """Con el bloqueo de la factura, el pago que completa el total siempre la salda"""
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+
+            async def pagar():
+                async with Sesion() as db:
+                    await crud_pago.crear_pago(db, _pago(3, 100 / PAGOS_SIMULTANEOS))
+
+            await asyncio.gather(*(pagar() for _ in range(PAGOS_SIMULTANEOS)))
+            async with Sesion() as db:
+                estado = (await db.execute(text("SELECT estado FROM facturas WHERE id = 3"))).scalar()
+            await engine.dispose()
+            return estado
+
+        assert asyncio.run(escenario()) == "pagada"
+
+    def test_conciliar_estados(self, test_database_url):
+        """La conciliación corrige en bloque solo las facturas desfasadas"""
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+            async with engine.begin() as conn:
+                # Pagos cargados sin pasar por crear_pago y una factura marcada pagada por error
+                await conn.execute(text(
+                    "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) VALUES "
+                    "(1, '2030-01-03', 180, 'efectivo'), (2, '2030-01-03', 80, 'efectivo')"
+                ))
+                await conn.execute(text("UPDATE facturas SET estado = 'pagada' WHERE id = 3"))
+            async with Sesion() as db:
+                corregidas = await crud_factura.conciliar_estados(db)
+                estados = dict((await db.execute(text("SELECT id, estado FROM facturas"))).all())
+                otra_vez = await crud_factura.conciliar_estados(db)
+            await engine.dispose()
+            return corregidas, estados, otra_vez
+
+        corregidas, estados, otra_vez = asyncio.run(escenario())
+        assert corregidas == 2
+        assert estados == {1: "pagada", 2: "anulada", 3: "pendiente"}
+        assert otra_vez == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -18,10 +18,8 @@ class TestParametrosEndpoints:
         }
     
     @patch("app.crud.parametro.create_parametro")
-    @patch("app.crud.parametro.get_parametro_by_clave")
-    def test_crear_parametro_exitoso(self, mock_get_by_clave, mock_crear_parametro, mock_parametro):
+    def test_crear_parametro_exitoso(self, mock_crear_parametro, mock_parametro):
         """Test para crear un parámetro correctamente"""
-        mock_get_by_clave.return_value = None  # No existe parámetro con esa clave
         mock_crear_parametro.return_value = mock_parametro
         
         payload = {
@@ -36,6 +34,15 @@ class TestParametrosEndpoints:
         assert data["clave"] == "TEST_PARAM"
         assert data["valor"] == "valor_test"
         assert data["descripcion"] == "Parámetro de prueba"
+
+    @patch("app.crud.parametro.create_parametro")
+    def test_crear_parametro_clave_duplicada(self, mock_crear_parametro):
+        """Si la clave ya existe el INSERT no devuelve fila y la ruta responde 400"""
+        mock_crear_parametro.return_value = None
+
+        response = client.post("/parametros", json={"clave": "TEST_PARAM", "valor": "otro"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Ya existe un parámetro con esa clave"
     
     
     
@@ -112,8 +119,22 @@ class TestParametrosEndpoints:
         
         response = client.delete("/parametros/1")
         assert response.status_code == 204
-   
+
+    @patch("app.crud.parametro.get_parametros_by_claves")
+    def test_obtener_parametros_por_claves(self, mock_por_claves):
+        """La ruta /parametros/claves no debe confundirse con /parametros/{parametro_id}"""
+        mock_por_claves.return_value = [
+            {"id": 1, "clave": "IVA", "valor": "12", "descripcion": None},
+            {"id": 2, "clave": "HORA_CHECKIN", "valor": "14:00", "descripcion": None},
+        ]
+        response = client.get("/parametros/claves?c=IVA, HORA_CHECKIN,IVA,NO_EXISTE")
+        assert response.status_code == 200
+        assert [p["clave"] for p in response.json()] == ["IVA", "HORA_CHECKIN"]
+        # Claves sin espacios ni repetidas, en el orden pedido
+        assert mock_por_claves.call_args.args[1] == ["IVA", "HORA_CHECKIN", "NO_EXISTE"]
+
+        assert client.get("/parametros/claves?c=,").status_code == 400
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from datetime import date
+from unittest.mock import patch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.crud import reportes as crud_reportes
+from app.database import Base, crear_esquema
+
+client = TestClient(app)
+
+
+async def _tandas(*tandas):
+    for tanda in tandas:
+        yield tanda
+
+
+class TestAntiguedadSaldos:
+    """Tests para el reporte de antigüedad de saldos por cobrar"""
+
+    @pytest.fixture
+    def mock_fila(self):
+        return {
+            "cliente_id": 1,
+            "nombre": "Ana",
+            "documento_identidad": "D1",
+            "dias_0_30": 60.0,
+            "dias_31_60": 200.0,
+            "dias_61_90": 0.0,
+            "dias_mas_90": 50.0,
+            "total": 310.0,
+            "porcentaje": 100.0,
+        }
+
+    @patch("app.crud.reportes.recorrer_antiguedad_saldos")
+    def test_antiguedad_saldos_json(self, mock_recorrer, mock_fila):
+        """Test para el reporte en JSON con la fecha de corte indicada"""
+        mock_recorrer.return_value = _tandas([mock_fila])
+
+        response = client.get("/reportes/antiguedad-saldos", params={"fecha_corte": "2030-04-30"})
+        assert response.status_code == 200
+        assert response.json() == [mock_fila]
+        assert mock_recorrer.call_args.args[1] == date(2030, 4, 30)
+
+    @patch("app.crud.reportes.recorrer_antiguedad_saldos")
+    def test_antiguedad_saldos_csv(self, mock_recorrer, mock_fila):
+        """Test para descargar el reporte como CSV"""
+        mock_recorrer.return_value = _tandas([mock_fila], [dict(mock_fila, cliente_id=2, nombre="Luis, hijo")])
+
+        response = client.get("/reportes/antiguedad-saldos", params={"fecha_corte": "2030-04-30", "formato": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "antiguedad_saldos_2030-04-30.csv" in response.headers["content-disposition"]
+        assert response.text.splitlines() == [
+            "cliente_id,nombre,documento_identidad,dias_0_30,dias_31_60,dias_61_90,dias_mas_90,total,porcentaje",
+            "1,Ana,D1,60.0,200.0,0.0,50.0,310.0,100.0",
+            '2,"Luis, hijo",D1,60.0,200.0,0.0,50.0,310.0,100.0',
+        ]
+
+    def test_antiguedad_saldos_contra_postgres(self, test_database_url):
+        """Tramos, pagos posteriores al corte, anuladas y porcentajes contra PostgreSQL real"""
+        async def escenario():
+            engine = create_async_engine(test_database_url)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await crear_esquema(conn)
+                await conn.execute(text(
+                    "INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Ana', 'D1'), (2, 'Luis', 'D2'), (3, 'Eva', 'D3')"
+                ))
+                await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+                await conn.execute(text(
+                    "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) VALUES "
+                    "(1, 1, 1, '2030-01-01', '2030-01-03', 'completada'), (2, 2, 1, '2030-01-01', '2030-01-03', 'completada'), "
+                    "(3, 3, 1, '2030-01-01', '2030-01-03', 'completada')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) VALUES "
+                    "(1, 1, '2030-04-20', 100, 'pendiente'), (2, 1, '2030-03-01', 200, 'pendiente'), "
+                    "(3, 1, '2030-01-01', 50, 'pagada'), (4, 2, '2030-02-15', 300, 'pendiente'), "
+                    "(5, 2, '2030-04-01', 500, 'anulada'), (6, 3, '2030-04-01', 80, 'pagada'), "
+                    "(7, 2, '2030-05-05', 90, 'pendiente')"
+                ))
+                await conn.execute(text(
+                    "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) VALUES "
+                    "(1, '2030-04-21', 40, 'efectivo'), (3, '2030-05-10', 50, 'tarjeta'), (6, '2030-04-02', 80, 'efectivo')"
+                ))
+            Sesion = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with Sesion() as db:
+                filas = [f async for tanda in crud_reportes.recorrer_antiguedad_saldos(db, date(2030, 4, 30)) for f in tanda]
+            await engine.dispose()
+            return filas
+
+        filas = asyncio.run(escenario())
+        assert [
+            (f.cliente_id, float(f.dias_0_30), float(f.dias_31_60), float(f.dias_61_90), float(f.dias_mas_90),
+             float(f.total), float(f.porcentaje))
+            for f in filas
+        ] == [
+            (1, 60, 200, 0, 50, 310, 50.82),
+            (2, 0, 0, 300, 0, 300, 49.18),
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,9 +1,15 @@
+import asyncio
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from datetime import date, timedelta
-from unittest.mock import patch
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from unittest.mock import patch, AsyncMock, MagicMock
 
 from app.main import app
+from app.crud import reserva as crud_reserva
+from app.crud.paginacion import codificar_cursor, decodificar_cursor
+from app.schemas.reserva import ReservaCreate
 
 client = TestClient(app)
 
@@ -40,15 +46,230 @@ class TestReservasEndpoints:
         assert data["habitacion_id"] == 1
         assert data["estado"] == "reservada"
 
+    def test_crear_reserva_solapada_devuelve_400(self):
+        """La violación de la restricción de exclusión se traduce al 400 de siempre"""
+        db = AsyncMock()
+        violacion = Exception("conflicting key value violates exclusion constraint")
+        violacion.sqlstate = "23P01"
+        # Si está retenida se pregunta aparte, después de bloquear la habitación
+        db.scalar.return_value = False
+        db.execute.side_effect = [
+            # La habitación, bloqueada FOR SHARE
+            MagicMock(scalar_one_or_none=MagicMock(return_value=MagicMock(estado="disponible"))),
+            # El INSERT ... RETURNING choca con la restricción de exclusión
+            IntegrityError("INSERT INTO reservas", {}, violacion),
+        ]
+        reserva = ReservaCreate(
+            cliente_id=1, habitacion_id=1,
+            fecha_inicio=date.today(), fecha_fin=date.today() + timedelta(days=2)
+        )
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(crud_reserva.crear_reserva(db, reserva))
+        assert exc.value.status_code == 400
+        assert exc.value.detail == "Ya existe una reserva para esa habitación en el rango de fechas."
+        db.rollback.assert_awaited_once()
+        db.commit.assert_not_awaited()
+        # Habitación, retenciones y el INSERT: no hay SELECT previo de conflictos de reservas
+        assert db.execute.await_count == 2
+        assert db.scalar.await_count == 1
+        consulta = db.execute.await_args_list[0].args[0]
+        assert consulta._for_update_arg.read
+
+    @patch("app.crud.reserva.asyncio.sleep", new_callable=AsyncMock)
+    def test_crear_reserva_reintenta_deadlock(self, mock_sleep):
+        """Un deadlock o falla de serialización repite la transacción con espera acotada"""
+        db = AsyncMock()
+        db.add = MagicMock()
+        # El rollback expira la habitación: cada intento la vuelve a leer "disponible"
+        db.execute.side_effect = lambda *args: MagicMock(
+            scalar_one_or_none=MagicMock(return_value=MagicMock(estado="disponible"))
+        )
+        db.scalar.return_value = False
+        deadlock = Exception("deadlock detected")
+        deadlock.sqlstate = "40P01"
+        db.commit.side_effect = [DBAPIError("UPDATE habitaciones", {}, deadlock), None]
+        reserva = ReservaCreate(
+            cliente_id=1, habitacion_id=1,
+            fecha_inicio=date.today(), fecha_fin=date.today() + timedelta(days=2)
+        )
+        asyncio.run(crud_reserva.crear_reserva(db, reserva, modo="bloqueo"))
+        assert db.commit.await_count == 2
+        db.rollback.assert_awaited_once()
+        mock_sleep.assert_awaited_once()
+        assert 0 < mock_sleep.await_args.args[0] <= crud_reserva.ESPERA_MAXIMA
+        # La habitación se vuelve a leer con FOR UPDATE en cada intento
+        consulta = db.execute.await_args_list[0].args[0]
+        assert consulta._for_update_arg is not None and not consulta._for_update_arg.read
+
+    @patch("app.crud.reserva.asyncio.sleep", new_callable=AsyncMock)
+    def test_crear_reserva_agota_reintentos(self, mock_sleep):
+        db = AsyncMock()
+        db.add = MagicMock()
+        db.execute.side_effect = lambda *args: MagicMock(
+            scalar_one_or_none=MagicMock(return_value=MagicMock(estado="disponible"))
+        )
+        db.scalar.return_value = False
+        falla = Exception("could not serialize access")
+        falla.sqlstate = "40001"
+        db.commit.side_effect = DBAPIError("INSERT INTO reservas", {}, falla)
+        reserva = ReservaCreate(
+            cliente_id=1, habitacion_id=1,
+            fecha_inicio=date.today(), fecha_fin=date.today() + timedelta(days=2)
+        )
+        with pytest.raises(DBAPIError):
+            asyncio.run(crud_reserva.crear_reserva(db, reserva, modo="advisory"))
+        assert db.commit.await_count == crud_reserva.REINTENTOS_MAXIMOS + 1
+        assert mock_sleep.await_count == crud_reserva.REINTENTOS_MAXIMOS
+
+    def test_crear_reserva_habitacion_retenida(self):
+        """Una retención vigente de otro checkout bloquea la reserva directa"""
+        db = AsyncMock()
+        db.add = MagicMock()
+        db.execute.return_value = MagicMock(
+            scalar_one_or_none=MagicMock(return_value=MagicMock(estado="disponible"))
+        )
+        db.scalar.return_value = True
+        reserva = ReservaCreate(
+            cliente_id=1, habitacion_id=1,
+            fecha_inicio=date.today(), fecha_fin=date.today() + timedelta(days=2)
+        )
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(crud_reserva.crear_reserva(db, reserva))
+        assert exc.value.status_code == 400
+        db.commit.assert_not_awaited()
+        db.rollback.assert_awaited_once()
+
+    @patch("app.crud.retencion.crear_retencion")
+    def test_crear_retencion(self, mock_crear_retencion):
+        mock_crear_retencion.return_value = {
+            "id": 7, "cliente_id": 1, "habitacion_id": 1,
+            "fecha_inicio": "2025-01-10", "fecha_fin": "2025-01-12",
+            "expira_en": "2025-01-01T10:15:00", "creada_en": "2025-01-01T10:00:00",
+        }
+        response = client.post("/reservas/holds", json={
+            "cliente_id": 1, "habitacion_id": 1, "fecha_inicio": "2025-01-10", "fecha_fin": "2025-01-12"
+        })
+        assert response.status_code == 200
+        assert response.json()["expira_en"] == "2025-01-01T10:15:00"
+
+    @patch("app.crud.reserva.confirmar_retencion")
+    def test_confirmar_retencion(self, mock_confirmar, mock_reserva):
+        mock_confirmar.return_value = mock_reserva
+        response = client.post("/reservas/holds/7/confirmar")
+        assert response.status_code == 200
+        assert response.json()["estado"] == "reservada"
+        mock_confirmar.return_value = None
+        response = client.post("/reservas/holds/7/confirmar")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Retención no encontrada o vencida"
+
+    @patch("app.crud.retencion.liberar_retencion")
+    def test_liberar_retencion(self, mock_liberar):
+        mock_liberar.return_value = True
+        assert client.delete("/reservas/holds/7").status_code == 200
+        mock_liberar.return_value = False
+        assert client.delete("/reservas/holds/7").status_code == 404
+
+    @patch("app.crud.reserva.crear_reservas_lote")
+    def test_crear_reservas_lote(self, mock_crear_lote, mock_reserva):
+        """Test para crear un bloque de reservas en una sola petición"""
+        segunda = dict(mock_reserva, id=2, habitacion_id=2)
+        mock_crear_lote.return_value = [mock_reserva, segunda]
+        payload = [
+            {k: mock_reserva[k] for k in ("cliente_id", "habitacion_id", "fecha_inicio", "fecha_fin")},
+            {k: segunda[k] for k in ("cliente_id", "habitacion_id", "fecha_inicio", "fecha_fin")},
+        ]
+        response = client.post("/reservas/lote", json=payload)
+        assert response.status_code == 200
+        assert [r["id"] for r in response.json()] == [1, 2]
+        assert len(mock_crear_lote.call_args.args[1]) == 2
+
+    def test_crear_reservas_lote_vacio(self):
+        """Test para rechazar un lote sin reservas"""
+        response = client.post("/reservas/lote", json=[])
+        assert response.status_code == 400
+
+    def test_cruces_dentro_del_lote(self):
+        """Test para detectar reservas del mismo lote que se cruzan entre sí"""
+        def r(habitacion_id, inicio, fin):
+            return ReservaCreate(cliente_id=1, habitacion_id=habitacion_id,
+                                 fecha_inicio=date(2025, 1, inicio), fecha_fin=date(2025, 1, fin))
+        lote = [r(1, 1, 10), r(2, 3, 5), r(1, 4, 6), r(1, 8, 12), r(1, 10, 11), r(2, 5, 7)]
+        assert crud_reserva._cruces_en_lote(lote) == {2: 0, 3: 0, 4: 3}
+
+    def test_matriz_ocupacion(self):
+        """Test de la matriz habitación x día comprimida por tramos"""
+        desde = date(2025, 1, 1)
+        calendario = crud_reserva._matriz_ocupacion(
+            desde, 10,
+            [(1, "101", "simple"), (2, "102", "suite"), (3, "103", "simple")],
+            [
+                (0, date(2024, 12, 28), date(2025, 1, 3)),  # empieza antes del calendario
+                (0, date(2025, 1, 3), date(2025, 1, 5)),    # pegada a la anterior: un solo tramo
+                (0, date(2025, 1, 8), date(2025, 1, 20)),   # termina después del calendario
+                (1, date(2025, 1, 2), date(2025, 1, 3)),
+            ],
+        )
+        habitaciones = calendario["habitaciones"]
+        assert habitaciones[0]["ocupacion"] == [[0, 4], [7, 3]]
+        assert habitaciones[1]["ocupacion"] == [[1, 1]]
+        assert habitaciones[2]["ocupacion"] == []
+        assert calendario["hasta"] == date(2025, 1, 10)
+        assert calendario["ocupadas_por_tipo"]["simple"] == [1, 1, 1, 1, 0, 0, 0, 1, 1, 1]
+        assert calendario["ocupadas_por_tipo"]["suite"] == [0, 1, 0, 0, 0, 0, 0, 0, 0, 0]
+        assert calendario["ocupadas_total"][1] == 2
+
+        bitmap = crud_reserva._matriz_ocupacion(
+            desde, 10, [(1, "101", "simple")], [(0, date(2025, 1, 1), date(2025, 1, 3))], formato="bitmap"
+        )
+        assert bitmap["habitaciones"][0]["ocupacion"] == "wAA="  # 11000000 00000000
+
+    @patch("app.crud.reserva.obtener_calendario")
+    def test_calendario_ocupacion(self, mock_calendario):
+        """Test para obtener el calendario de ocupación"""
+        mock_calendario.return_value = {
+            "desde": "2025-01-01", "hasta": "2025-01-02", "dias": 2, "formato": "tramos",
+            "habitaciones": [{"id": 1, "numero": "101", "tipo": "simple", "ocupacion": [[0, 1]]}],
+            "ocupadas_por_tipo": {"simple": [1, 0]},
+            "ocupadas_total": [1, 0],
+        }
+        response = client.get("/reservas/calendario?desde=2025-01-01&hasta=2025-01-02")
+        assert response.status_code == 200
+        assert response.json()["habitaciones"][0]["ocupacion"] == [[0, 1]]
+
+    def test_calendario_rango_invalido(self):
+        """Test para rechazar rangos invertidos o demasiado largos"""
+        assert client.get("/reservas/calendario?desde=2025-02-01&hasta=2025-01-01").status_code == 400
+        assert client.get("/reservas/calendario?desde=2025-01-01&hasta=2026-06-01").status_code == 400
+
     @patch("app.crud.reserva.obtener_reservas")
     def test_listar_reservas(self, mock_obtener_reservas, mock_reserva):
         """Test para listar reservas"""
-        mock_obtener_reservas.return_value = [mock_reserva]
+        mock_obtener_reservas.return_value = ([mock_reserva], None)
         response = client.get("/reservas/")
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
         assert data[0]["id"] == 1
+        assert "X-Siguiente-Cursor" not in response.headers
+
+    @patch("app.crud.reserva.obtener_reservas")
+    def test_listar_reservas_paginado(self, mock_obtener_reservas, mock_reserva):
+        """Los filtros y el cursor llegan al CRUD y el cursor siguiente va en el encabezado"""
+        mock_obtener_reservas.return_value = ([mock_reserva], "abc")
+        response = client.get("/reservas/?cliente_id=1&estado=reservada&desde=2025-01-01&limite=1&cursor=xyz")
+        assert response.status_code == 200
+        assert response.headers["X-Siguiente-Cursor"] == "abc"
+        args = mock_obtener_reservas.call_args.args
+        assert args[1:] == (1, None, "reservada", date(2025, 1, 1), None, 1, "xyz")
+        assert client.get("/reservas/?limite=0").status_code == 422
+
+    def test_cursor_ida_y_vuelta(self):
+        cursor = codificar_cursor(date(2025, 1, 10), 42)
+        assert decodificar_cursor(cursor, (date.fromisoformat, int)) == (date(2025, 1, 10), 42)
+        with pytest.raises(HTTPException) as exc:
+            decodificar_cursor("no-es-un-cursor", (date.fromisoformat, int))
+        assert exc.value.status_code == 400
 
     @patch("app.crud.reserva.cancelar_reserva")
     def test_cancelar_reserva_valida(self, mock_cancelar_reserva, mock_reserva):
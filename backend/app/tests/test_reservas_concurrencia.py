@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from datetime import date, timedelta
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.database import Base, crear_esquema
+from app.crud.reserva import crear_reserva, es_solapamiento
+from app.models.reserva import Reserva
+from app.schemas.reserva import ReservaCreate
+
+SOLICITUDES = 50
+INICIO = date(2025, 3, 1)
+
+CONTAR_SOLAPAMIENTOS = text("""
+    SELECT count(*)
+    FROM reservas a
+    JOIN reservas b ON a.habitacion_id = b.habitacion_id AND a.id < b.id
+    WHERE a.estado = 'reservada' AND b.estado = 'reservada'
+      AND daterange(a.fecha_inicio, a.fecha_fin) && daterange(b.fecha_inicio, b.fecha_fin)
+""")
+
+
+async def _preparar(url):
+    engine = create_async_engine(url, pool_size=SOLICITUDES, max_overflow=0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await crear_esquema(conn)
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Carga', 'CARGA-1')"))
+        await conn.execute(text(
+            "INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) VALUES (1, '101', 'suite', 120, 'disponible')"
+        ))
+    return engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _contar(engine):
+    async with engine.connect() as conn:
+        solapadas = (await conn.execute(CONTAR_SOLAPAMIENTOS)).scalar()
+        activas = (await conn.execute(text("SELECT count(*) FROM reservas WHERE estado = 'reservada'"))).scalar()
+    return solapadas, activas
+
+
+class TestReservasConcurrencia:
+    """Pruebas de carga concurrente contra PostgreSQL real: cero reservas dobles"""
+
+    @pytest.mark.parametrize("modo", ["optimista", "bloqueo", "advisory"])
+    def test_peticiones_simultaneas_mismas_fechas(self, test_database_url, modo):
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+
+            async def intentar():
+                async with Sesion() as db:
+                    try:
+                        await crear_reserva(db, ReservaCreate(
+                            cliente_id=1, habitacion_id=1,
+                            fecha_inicio=INICIO, fecha_fin=INICIO + timedelta(days=3)
+                        ), modo=modo)
+                        return True
+                    except HTTPException as e:
+                        assert e.status_code == 400
+                        return False
+
+            resultados = await asyncio.gather(*(intentar() for _ in range(SOLICITUDES)))
+            conteo = await _contar(engine)
+            await engine.dispose()
+            return resultados, conteo
+
+        resultados, (solapadas, activas) = asyncio.run(escenario())
+        assert sum(resultados) == 1
+        assert activas == 1
+        assert solapadas == 0
+
+    def test_restriccion_rechaza_inserciones_cruzadas(self, test_database_url):
+        """Sin la verificación previa en Python, la base sigue impidiendo el doble registro"""
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+
+            async def insertar(desplazamiento):
+                async with Sesion() as db:
+                    inicio = INICIO + timedelta(days=desplazamiento)
+                    db.add(Reserva(cliente_id=1, habitacion_id=1, fecha_inicio=inicio,
+                                   fecha_fin=inicio + timedelta(days=4)))
+                    try:
+                        await db.commit()
+                        return "ok"
+                    except IntegrityError as e:
+                        return "solapada" if es_solapamiento(e) else "otro"
+                    except DBAPIError as e:
+                        # Dos chequeos de exclusión cruzados pueden esperar uno al otro;
+                        # PostgreSQL aborta a una de las transacciones (deadlock_detected)
+                        return "abortada" if getattr(e.orig, "sqlstate", None) == "40P01" else "otro"
+
+            # Rangos de 4 noches que arrancan cada 2 días: cada uno cruza con sus vecinos
+            resultados = await asyncio.gather(*(insertar(i % 20 * 2) for i in range(SOLICITUDES)))
+            conteo = await _contar(engine)
+            await engine.dispose()
+            return resultados, conteo
+
+        resultados, (solapadas, activas) = asyncio.run(escenario())
+        assert "otro" not in resultados
+        assert resultados.count("ok") == activas
+        assert solapadas == 0
@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+from datetime import date, timedelta
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (registra todos los modelos)
+from app.database import Base, crear_esquema
+from app.crud import retencion as crud_retencion
+from app.crud.habitacion import obtener_habitaciones_disponibles
+from app.crud.reserva import crear_reserva, confirmar_retencion
+from app.schemas.reserva import ReservaCreate
+from app.schemas.retencion import RetencionCreate
+
+INICIO = date(2025, 3, 1)
+FIN = INICIO + timedelta(days=3)
+
+
+async def _preparar(url):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await crear_esquema(conn)
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'A', 'A-1'), (2, 'B', 'B-1')"))
+        await conn.execute(text(
+            "INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) VALUES (1, '101', 'suite', 120, 'disponible')"
+        ))
+    return engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class TestRetenciones:
+    """Ciclo de vida de una retención contra PostgreSQL real"""
+
+    def test_retencion_bloquea_y_se_confirma(self, test_database_url):
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+            async with Sesion() as db:
+                retencion = await crud_retencion.crear_retencion(
+                    db, RetencionCreate(cliente_id=1, habitacion_id=1, fecha_inicio=INICIO, fecha_fin=FIN)
+                )
+                assert retencion.expira_en is not None
+                retencion_id = retencion.id
+                assert await obtener_habitaciones_disponibles(db, INICIO, FIN) == []
+
+                # Otro cliente no puede reservar ni retener las mismas fechas
+                with pytest.raises(HTTPException):
+                    await crear_reserva(db, ReservaCreate(cliente_id=2, habitacion_id=1,
+                                                          fecha_inicio=INICIO + timedelta(days=1), fecha_fin=FIN))
+                with pytest.raises(HTTPException):
+                    await crud_retencion.crear_retencion(
+                        db, RetencionCreate(cliente_id=2, habitacion_id=1, fecha_inicio=INICIO, fecha_fin=FIN)
+                    )
+
+                reserva = await confirmar_retencion(db, retencion_id)
+                assert (reserva.cliente_id, reserva.fecha_inicio, reserva.fecha_fin) == (1, INICIO, FIN)
+                # La retención se consumió: no se puede confirmar dos veces
+                assert await confirmar_retencion(db, retencion_id) is None
+                quedan = (await db.execute(text("SELECT count(*) FROM retenciones"))).scalar()
+            await engine.dispose()
+            return quedan
+
+        assert asyncio.run(escenario()) == 0
+
+    def test_retencion_vencida_no_cuenta_y_se_purga(self, test_database_url):
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+            async with Sesion() as db:
+                retencion = await crud_retencion.crear_retencion(
+                    db, RetencionCreate(cliente_id=1, habitacion_id=1, fecha_inicio=INICIO, fecha_fin=FIN)
+                )
+                await db.execute(text("UPDATE retenciones SET expira_en = now() - interval '1 minute'"))
+                await db.commit()
+
+                disponibles = [h.numero for h in await obtener_habitaciones_disponibles(db, INICIO, FIN)]
+                confirmada = await confirmar_retencion(db, retencion.id)
+                eliminadas = await crud_retencion.purgar_retenciones_vencidas(db)
+            await engine.dispose()
+            return disponibles, confirmada, eliminadas
+
+        disponibles, confirmada, eliminadas = asyncio.run(escenario())
+        assert disponibles == ["101"]
+        assert confirmada is None
+        assert eliminadas == 1
+
+    @pytest.mark.parametrize("modo", ["optimista", "advisory", "bloqueo"])
+    def test_reserva_espera_a_retencion_en_curso(self, test_database_url, modo):
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+            async with Sesion() as checkout, Sesion() as db:
+                # Un checkout a mitad de crear_retencion: fila bloqueada y retención sin confirmar
+                await checkout.execute(text("SELECT id FROM habitaciones WHERE id = 1 FOR UPDATE"))
+                await checkout.execute(text(
+                    "INSERT INTO retenciones (cliente_id, habitacion_id, fecha_inicio, fecha_fin, expira_en) "
+                    "VALUES (1, 1, :inicio, :fin, now() + interval '15 minutes')"
+                ), {"inicio": INICIO, "fin": FIN})
+
+                reserva = asyncio.create_task(crear_reserva(
+                    db, ReservaCreate(cliente_id=2, habitacion_id=1, fecha_inicio=INICIO, fecha_fin=FIN), modo=modo
+                ))
+                await asyncio.sleep(0.3)
+                esperaba = not reserva.done()
+                await checkout.commit()
+                with pytest.raises(HTTPException) as error:
+                    await reserva
+                reservas = (await db.execute(text("SELECT count(*) FROM reservas"))).scalar()
+            await engine.dispose()
+            return esperaba, error.value, reservas
+
+        esperaba, error, reservas = asyncio.run(escenario())
+        assert esperaba
+        assert error.status_code == 400 and "retenida" in error.detail
+        assert reservas == 0
+
+    def test_retencion_espera_a_reserva_en_curso(self, test_database_url):
+        async def escenario():
+            engine, Sesion = await _preparar(test_database_url)
+            async with Sesion() as reservando, Sesion() as db:
+                # Una reserva optimista a mitad de camino: fila FOR SHARE y reserva sin confirmar
+                await reservando.execute(text("SELECT id FROM habitaciones WHERE id = 1 FOR SHARE"))
+                await reservando.execute(text(
+                    "INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+                    "VALUES (1, 1, :inicio, :fin, 'reservada')"
+                ), {"inicio": INICIO, "fin": FIN})
+
+                retencion = asyncio.create_task(crud_retencion.crear_retencion(
+                    db, RetencionCreate(cliente_id=2, habitacion_id=1, fecha_inicio=INICIO, fecha_fin=FIN)
+                ))
+                await asyncio.sleep(0.3)
+                esperaba = not retencion.done()
+                await reservando.commit()
+                with pytest.raises(HTTPException) as error:
+                    await retencion
+                retenciones = (await db.execute(text("SELECT count(*) FROM retenciones"))).scalar()
+            await engine.dispose()
+            return esperaba, error.value, retenciones
+
+        esperaba, error, retenciones = asyncio.run(escenario())
+        assert esperaba
+        assert error.status_code == 400
+        assert retenciones == 0
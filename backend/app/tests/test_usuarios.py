@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
@@ -14,6 +15,9 @@ except ImportError:
     from fastapi import FastAPI
     app = FastAPI()
 
+from app.crud import usuario as crud_usuario
+from app.schemas.usuario import UsuarioCreate
+
 client = TestClient(app)
 
 class TestUsuariosEndpoints:
@@ -39,10 +43,7 @@ class TestUsuariosEndpoints:
     
     def test_crear_usuario_exitoso(self, mock_usuario, mock_usuario_create):
         """Test para crear un usuario correctamente"""
-        with patch("app.crud.usuario.obtener_usuario_correo", new_callable=AsyncMock) as mock_obtener_usuario_correo, \
-             patch("app.crud.usuario.crear_usuario", new_callable=AsyncMock) as mock_crear_usuario:
-            
-            mock_obtener_usuario_correo.return_value = None  # Usuario no existe
+        with patch("app.crud.usuario.crear_usuario", new_callable=AsyncMock) as mock_crear_usuario:
             mock_crear_usuario.return_value = mock_usuario
             
             response = client.post("/usuarios/", json=mock_usuario_create)
@@ -53,6 +54,34 @@ class TestUsuariosEndpoints:
             assert data["correo"] == "juan.perez@email.com"
             assert data["rol_id"] == 1
             assert data["id"] == 1
+
+    def test_crear_usuario_correo_duplicado(self, mock_usuario_create):
+        """Si el correo ya está registrado el INSERT no devuelve fila y la ruta responde 400"""
+        with patch("app.crud.usuario.crear_usuario", new_callable=AsyncMock) as mock_crear_usuario:
+            mock_crear_usuario.return_value = None
+
+            response = client.post("/usuarios/", json=mock_usuario_create)
+
+            assert response.status_code == 400
+            assert response.json()["detail"] == "El usuario ya existe"
+
+    def test_crear_usuario_duplicado_no_hashea(self, mock_usuario_create):
+        """Un correo ya registrado se descarta con un SELECT, sin pasar por bcrypt"""
+        db = AsyncMock()
+        db.scalar.return_value = True
+        with patch("app.crud.usuario.hashear", new_callable=AsyncMock) as mock_hashear, \
+                patch("app.crud.usuario.insertar", new_callable=AsyncMock) as mock_insertar:
+            assert asyncio.run(crud_usuario.crear_usuario(db, UsuarioCreate(**mock_usuario_create))) is None
+            mock_hashear.assert_not_awaited()
+            mock_insertar.assert_not_awaited()
+
+            # Correo libre: se hashea y el INSERT conserva ON CONFLICT para altas simultáneas
+            db.scalar.return_value = False
+            mock_hashear.return_value = "hash"
+            asyncio.run(crud_usuario.crear_usuario(db, UsuarioCreate(**mock_usuario_create)))
+            mock_hashear.assert_awaited_once_with("password123")
+            assert mock_insertar.await_args.args[2]["contraseña"] == "hash"
+            assert mock_insertar.await_args.kwargs["conflicto"] == [crud_usuario.Usuario.correo]
     
     
     def test_listar_usuarios(self, mock_usuario):
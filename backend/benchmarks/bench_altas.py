@@ -0,0 +1,67 @@
+"""
+Benchmark de las altas (POST /clientes/, /cuentas/, /parametros).
+
+Compara el camino anterior (consulta previa por la clave única + INSERT + COMMIT +
+refresh, tres viajes a la base) con el actual (INSERT ... ON CONFLICT DO NOTHING
+RETURNING + COMMIT), tanto para altas nuevas como para claves repetidas.
+Los usuarios no se miden: el hash bcrypt de la contraseña tapa cualquier diferencia.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_altas
+"""
+import asyncio
+import itertools
+import os
+
+from app.crud import cliente as crud_cliente, cuenta as crud_cuenta, parametro as crud_parametro
+from app.models.cliente import Cliente
+from app.models.cuenta import Cuenta
+from app.models.parametro import Parametro
+from app.schemas.cliente import ClienteCreate
+from app.schemas.cuenta import CuentaCreate
+from app.schemas.parametro import ParametroCreate
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+REPETICIONES = int(os.getenv("BENCH_REPETICIONES", "2000"))
+
+CASOS = [
+    ("cliente", Cliente, crud_cliente.get_cliente_by_documento, crud_cliente.create_cliente,
+     lambda clave: ClienteCreate(nombre="Cliente", documento_identidad=clave)),
+    ("cuenta", Cuenta, crud_cuenta.obtener_cuenta_por_codigo, crud_cuenta.crear_cuenta,
+     lambda clave: CuentaCreate(codigo=clave, nombre="Cuenta", tipo="activo", nivel=1)),
+    ("parametro", Parametro, crud_parametro.get_parametro_by_clave, crud_parametro.create_parametro,
+     lambda clave: ParametroCreate(clave=clave, valor="1")),
+]
+
+
+async def alta_anterior(db, modelo, buscar, datos, clave):
+    """Lo que hacían la ruta y el CRUD antes: consulta previa, add, commit y refresh"""
+    if await buscar(db, clave):
+        return None
+    fila = modelo(**datos.model_dump())
+    db.add(fila)
+    await db.commit()
+    await db.refresh(fila)
+    return fila
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    Sesion = crear_sesiones(engine)
+    async with Sesion() as db:
+        for nombre, modelo, buscar, crear, datos in CASOS:
+            claves = (f"A{i}" for i in itertools.count())
+            reportar(f"{nombre}: alta nueva (consulta + INSERT + refresh)", await medir(
+                lambda: alta_anterior(db, modelo, buscar, datos(c := next(claves)), c), REPETICIONES))
+            claves = (f"B{i}" for i in itertools.count())
+            reportar(f"{nombre}: alta nueva (ON CONFLICT RETURNING)", await medir(
+                lambda: crear(db, datos(next(claves))), REPETICIONES))
+            reportar(f"{nombre}: repetida (consulta previa)", await medir(
+                lambda: alta_anterior(db, modelo, buscar, datos("A0"), "A0"), REPETICIONES))
+            reportar(f"{nombre}: repetida (ON CONFLICT RETURNING)", await medir(
+                lambda: crear(db, datos("B0")), REPETICIONES))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
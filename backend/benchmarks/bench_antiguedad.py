@@ -0,0 +1,104 @@
+"""
+Benchmark del reporte de antigüedad de saldos (GET /reportes/antiguedad-saldos).
+
+Siembra FACTURAS facturas de CLIENTES clientes con 0 a 5 pagos cada una y compara:
+  - lo que había que hacer antes: exportar facturas (con sus pagos), reservas y
+    clientes y armar los tramos en Python;
+  - el reporte completo con una sola consulta agregada, leído por tandas;
+  - el mismo reporte enviado como CSV por la aplicación (cuerpo completo).
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_antiguedad
+"""
+import asyncio
+import os
+from collections import defaultdict
+from datetime import date
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from app.crud import factura as crud_factura, reportes as crud_reportes
+from app.database import get_async_session
+from app.main import app
+from app.models.cliente import Cliente
+from app.models.reserva import Reserva
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+FACTURAS = int(os.getenv("BENCH_FACTURAS", "200000"))
+CLIENTES = int(os.getenv("BENCH_CLIENTES", "20000"))
+CORTE = date(2028, 3, 1)
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO clientes (id, nombre, documento_identidad) "
+            "SELECT n, 'Cliente ' || n, 'D' || n FROM generate_series(1, :c) AS n"
+        ), {"c": CLIENTES})
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+        await conn.execute(text(
+            "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+            "SELECT n, 1 + n % :c, 1, DATE '2020-01-01' + n % 3000, DATE '2020-01-03' + n % 3000, 'completada' "
+            "FROM generate_series(1, :n) AS n"
+        ), {"c": CLIENTES, "n": FACTURAS})
+        await conn.execute(text(
+            "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) "
+            "SELECT n, n, DATE '2020-01-03' + n % 3000, 100 + n % 400, "
+            "CASE WHEN n % 50 = 0 THEN 'anulada' ELSE 'pendiente' END FROM generate_series(1, :n) AS n"
+        ), {"n": FACTURAS})
+        await conn.execute(text(
+            "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) "
+            "SELECT f, DATE '2020-01-03' + f % 3000, 20, 'efectivo' "
+            "FROM generate_series(1, :n) AS f CROSS JOIN generate_series(1, 5) AS k WHERE k <= f % 6"
+        ), {"n": FACTURAS})
+        await conn.execute(text("ANALYZE"))
+        return (await conn.execute(text("SELECT count(*) FROM pagos"))).scalar()
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    pagos = await sembrar(engine)
+    print(f"{FACTURAS} facturas, {pagos} pagos, {CLIENTES} clientes")
+    Sesion = crear_sesiones(engine)
+
+    async def antes():
+        async with Sesion() as db:
+            facturas = await crud_factura.obtener_facturas(db)
+            reservas = dict((await db.execute(select(Reserva.id, Reserva.cliente_id))).all())
+            clientes = dict((await db.execute(select(Cliente.id, Cliente.nombre))).all())
+            tramos = defaultdict(lambda: [0, 0, 0, 0])
+            for f in facturas:
+                if f.estado == "anulada" or f.fecha_emision > CORTE:
+                    continue
+                saldo = f.total - sum(p.monto for p in f.pagos if p.fecha_pago <= CORTE)
+                if saldo > 0:
+                    dias = (CORTE - f.fecha_emision).days
+                    tramos[reservas[f.reserva_id]][min(3, max(0, (dias - 1) // 30))] += saldo
+            return {clientes[c]: t for c, t in tramos.items()}
+
+    async def reporte():
+        async with Sesion() as db:
+            return sum([len(t) async for t in crud_reportes.recorrer_antiguedad_saldos(db, CORTE)])
+
+    async def sesion_bench():
+        async with Sesion() as db:
+            yield db
+
+    app.dependency_overrides[get_async_session] = sesion_bench
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        async def csv():
+            respuesta = await http.get("/reportes/antiguedad-saldos", params={"fecha_corte": CORTE, "formato": "csv"})
+            return len(respuesta.content)
+
+        print(f"clientes con saldo: {await reporte()}, CSV de {await csv() / 1024:.0f} KiB")
+        reportar("antes: exportar las tablas y agrupar en Python", await medir(antes, 3))
+        reportar("consulta agregada (todas las filas)", await medir(reporte, 10))
+        reportar("CSV completo por HTTP", await medir(csv, 10))
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
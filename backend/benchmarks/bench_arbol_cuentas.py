@@ -0,0 +1,58 @@
+"""
+Benchmark del plan de cuentas jerárquico (GET /cuentas/arbol).
+
+Siembra un plan de 4 niveles (1 dígito + 3 niveles de 2 dígitos) y mide el árbol
+completo armado desde la base, el mismo árbol servido desde memoria, un subárbol
+pedido por prefijo (LIKE '11%' con el índice text_pattern_ops) y, como referencia,
+la búsqueda anterior buscar_cuentas (ILIKE '%11%', recorre la tabla entera).
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_arbol_cuentas
+"""
+import asyncio
+import os
+from sqlalchemy import text
+
+from app.crud import cuenta as crud_cuenta
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+RAMAS = int(os.getenv("BENCH_RAMAS", "25"))  # hijas por cuenta en los niveles 2 a 4
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            WITH RECURSIVE plan(codigo, nivel) AS (
+                SELECT n::text, 1 FROM generate_series(1, 5) AS n
+                UNION ALL
+                SELECT plan.codigo || lpad(h::text, 2, '0'), plan.nivel + 1
+                FROM plan CROSS JOIN generate_series(1, :ramas) AS h
+                WHERE plan.nivel < 4
+            )
+            INSERT INTO cuentas (codigo, nombre, tipo, nivel)
+            SELECT codigo, 'Cuenta ' || codigo, 'activo', nivel FROM plan
+        """), {"ramas": RAMAS})
+        await conn.execute(text("ANALYZE cuentas"))
+        return (await conn.execute(text("SELECT count(*) FROM cuentas"))).scalar()
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    total = await sembrar(engine)
+    print(f"{total} cuentas")
+    Sesion = crear_sesiones(engine)
+    async with Sesion() as db:
+        async def sin_cache():
+            crud_cuenta.invalidar_arbol()
+            return await crud_cuenta.obtener_arbol(db)
+
+        reportar("árbol completo (consulta + armado)", await medir(sin_cache, 10))
+        reportar("árbol completo (en memoria)", await medir(lambda: crud_cuenta.obtener_arbol(db), 100))
+        reportar("subárbol prefijo '11' (LIKE + índice)", await medir(lambda: crud_cuenta.obtener_arbol(db, "11"), 100))
+        reportar("subárbol prefijo '1101' (LIKE + índice)", await medir(lambda: crud_cuenta.obtener_arbol(db, "1101"), 100))
+        reportar("buscar_cuentas '11' (ILIKE %11%)", await medir(lambda: crud_cuenta.buscar_cuentas(db, "11"), 20))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
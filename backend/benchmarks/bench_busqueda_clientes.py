@@ -0,0 +1,74 @@
+"""
+Benchmark de búsqueda de clientes (GET /clientes/) con 2.000.000 de clientes.
+
+Mide la búsqueda por prefijo de nombre y por coincidencia parcial de documento,
+correo y teléfono (ILIKE '%texto%' sobre índices GIN de pg_trgm), además de la
+primera página del listado y una página profunda pedida con cursor.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_busqueda_clientes
+    BENCH_CLIENTES=200000 BENCH_DATABASE_URL=... python -m benchmarks.bench_busqueda_clientes
+"""
+import asyncio
+import os
+import random
+from sqlalchemy import text
+
+from app.crud.cliente import list_clientes
+from app.crud.paginacion import codificar_cursor
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+CLIENTES = int(os.getenv("BENCH_CLIENTES", "2000000"))
+NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Jorge", "Lucía", "Pedro", "Sofía", "Diego",
+           "Valeria", "Andrés", "Camila", "Mateo", "Isabel", "Gabriel", "Paula", "Tomás", "Elena", "Martín"]
+APELLIDOS = ["García", "Rodríguez", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Díaz", "Torres", "Vega",
+             "Ramírez", "Flores", "Rojas", "Castro", "Morales", "Ortiz", "Silva", "Mendoza", "Herrera", "Aguilar"]
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            INSERT INTO clientes (nombre, documento_identidad, correo, telefono)
+            SELECT (CAST(:nombres AS text[]))[1 + n % 20] || ' ' ||
+                   (CAST(:apellidos AS text[]))[1 + (n / 20) % 20] || ' ' ||
+                   (CAST(:apellidos AS text[]))[1 + (n / 400) % 20],
+                   lpad(n::text, 10, '0'),
+                   'cliente' || n || '@' || (ARRAY['gmail.com', 'hotmail.com', 'outlook.com'])[1 + n % 3],
+                   '09' || lpad(((n * 7919) % 100000000)::text, 8, '0')
+            FROM generate_series(1, :n) AS n
+        """), {"n": CLIENTES, "nombres": NOMBRES, "apellidos": APELLIDOS})
+        await conn.execute(text("ANALYZE clientes"))
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    print(f"Sembrando {CLIENTES} clientes...")
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+
+    async with Sesion() as db:
+        def azar(valores):
+            return lambda: random.choice(valores)
+
+        nombres = [f"{n} {a}" for n in NOMBRES for a in APELLIDOS[:5]]
+        documentos = [str(random.randint(1, CLIENTES))[-6:] for _ in range(50)]
+        correos = [f"cliente{random.randint(1, CLIENTES)}@" for _ in range(50)]
+        telefonos = [f"{random.randint(0, 99999999):08d}"[:6] for _ in range(50)]
+        casos = [
+            ("prefijo de nombre", "nombre", azar(nombres)),
+            ("documento parcial", "documento", azar(documentos)),
+            ("correo parcial", "correo", azar(correos)),
+            ("teléfono parcial", "telefono", azar(telefonos)),
+        ]
+        for nombre, filtro, valor in casos:
+            tiempos = await medir(lambda: list_clientes(db, **{filtro: valor()}), 30)
+            reportar(f"búsqueda: {nombre}", tiempos)
+
+        reportar("listado: primera página", await medir(lambda: list_clientes(db), 30))
+        cursor = codificar_cursor("Sofía Torres", CLIENTES // 2)
+        reportar("listado: página profunda (cursor)", await medir(lambda: list_clientes(db, cursor=cursor), 30))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
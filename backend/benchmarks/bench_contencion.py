@@ -0,0 +1,93 @@
+"""
+Benchmark de contención: muchas peticiones simultáneas reservando la misma suite.
+
+Para cada modo de crear_reserva (optimista, bloqueo FOR UPDATE, advisory lock)
+lanza rondas de 1, 10 y 100 peticiones concurrentes contra una sola habitación y
+reporta el rendimiento (peticiones/s), la latencia p50/p99, cuántas se aceptaron,
+cuántas se rechazaron con 400 y cuántas terminaron en error pese a los reintentos.
+
+Las peticiones comparten un pool de BENCH_POOL conexiones (20 por defecto),
+como los workers de la aplicación, así que con 100 concurrentes también se mide
+la espera por conexión.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_contencion
+"""
+import asyncio
+import os
+import random
+import time
+from datetime import date, timedelta
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.crud.reserva import crear_reserva, MODOS_CONCURRENCIA
+from app.schemas.reserva import ReservaCreate
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, percentil
+
+CONCURRENCIAS = (1, 10, 100)
+PETICIONES_POR_NIVEL = 300
+POOL = int(os.getenv("BENCH_POOL", "20"))
+INICIO = date.today() + timedelta(days=30)
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Bench', 'BENCH-1')"))
+        await conn.execute(text(
+            "INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) VALUES (1, 'S-1', 'suite', 300, 'disponible')"
+        ))
+
+
+async def reiniciar_habitacion(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM reservas"))
+        await conn.execute(text("UPDATE habitaciones SET estado = 'disponible'"))
+
+
+async def ronda(Sesion, concurrentes, modo):
+    """Lanza `concurrentes` reservas a la vez sobre la misma habitación, con fechas que se cruzan"""
+    async def reservar():
+        inicio = INICIO + timedelta(days=random.randint(0, 3))
+        reserva = ReservaCreate(cliente_id=1, habitacion_id=1, fecha_inicio=inicio,
+                                fecha_fin=inicio + timedelta(days=random.randint(1, 3)))
+        comienzo = time.perf_counter()
+        async with Sesion() as db:
+            try:
+                await crear_reserva(db, reserva, modo=modo)
+                resultado = "aceptada"
+            except HTTPException:
+                resultado = "rechazada"
+            except Exception:
+                resultado = "error"
+        return resultado, (time.perf_counter() - comienzo) * 1000
+
+    return await asyncio.gather(*(reservar() for _ in range(concurrentes)))
+
+
+async def main():
+    engine = crear_motor(pool_size=POOL, max_overflow=0)
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+
+    for modo in MODOS_CONCURRENCIA:
+        for concurrentes in CONCURRENCIAS:
+            resultados, transcurrido = [], 0.0
+            for _ in range(max(3, PETICIONES_POR_NIVEL // concurrentes)):
+                await reiniciar_habitacion(engine)
+                comienzo = time.perf_counter()
+                resultados += await ronda(Sesion, concurrentes, modo)
+                transcurrido += time.perf_counter() - comienzo
+            latencias = [ms for _, ms in resultados]
+            conteo = {r: sum(1 for res, _ in resultados if res == r) for r in ("aceptada", "rechazada", "error")}
+            print(
+                f"{modo:<10} c={concurrentes:<4} "
+                f"{len(resultados) / transcurrido:8.1f} pet/s  "
+                f"p50={percentil(latencias, 50):8.2f} ms  p99={percentil(latencias, 99):8.2f} ms  "
+                f"aceptadas={conteo['aceptada']} rechazadas={conteo['rechazada']} errores={conteo['error']}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark de latencia de rutas ajenas durante una ráfaga de altas y cambios de contraseña.
+
+Mientras corren RAFAGA llamadas concurrentes a POST /usuarios/ y PUT /usuarios/{id}
+(con contraseña nueva), una sonda pide GET /clientes/{id} cada 10 ms y se reporta su
+latencia. Se compara el hash bcrypt hecho dentro del event loop (como antes) con el
+pool de app/services/contrasenas.py. Sin ráfaga se mide la línea base.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_contrasenas
+    BCRYPT_ROUNDS=10 BENCH_DATABASE_URL=... python -m benchmarks.bench_contrasenas
+"""
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("DATABASE_URL", os.getenv("BENCH_DATABASE_URL", ""))
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.database import get_async_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import contrasenas  # noqa: E402
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, reportar  # noqa: E402
+
+RAFAGA = int(os.getenv("BENCH_RAFAGA", "40"))
+PERIODO_SONDA = 0.01
+
+
+async def hashear_en_el_loop(password: str) -> str:
+    """Lo que hacía crear_usuario antes: bcrypt directamente en la corrutina"""
+    return contrasenas.hash_password(password)
+
+
+async def sondear(cliente, hasta: asyncio.Event):
+    tiempos = []
+    while not hasta.is_set():
+        inicio = time.perf_counter()
+        respuesta = await cliente.get("/clientes/1")
+        respuesta.raise_for_status()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(PERIODO_SONDA)
+    return tiempos
+
+
+async def rafaga(cliente, ronda: int):
+    async def alta(i):
+        respuesta = await cliente.post("/usuarios/", json={
+            "nombre": f"Usuario {i}", "correo": f"u{ronda}-{i}@hotel.com", "contraseña": "secreta", "rol_id": 1,
+        })
+        respuesta.raise_for_status()
+
+    async def cambio(i):
+        respuesta = await cliente.put(f"/usuarios/{1 + i % 10}", json={"contraseña": f"nueva-{ronda}-{i}"})
+        respuesta.raise_for_status()
+
+    await asyncio.gather(*(alta(i) for i in range(RAFAGA // 2)), *(cambio(i) for i in range(RAFAGA - RAFAGA // 2)))
+
+
+async def medir_con_rafaga(cliente, nombre, ronda):
+    listo = asyncio.Event()
+    sonda = asyncio.create_task(sondear(cliente, listo))
+    inicio = time.perf_counter()
+    await rafaga(cliente, ronda)
+    duracion = time.perf_counter() - inicio
+    listo.set()
+    reportar(f"{nombre} (ráfaga {RAFAGA} en {duracion:.1f} s)", await sonda)
+
+
+async def main():
+    engine = crear_motor(pool_size=20)
+    await reiniciar_esquema(engine)
+    Sesion = crear_sesiones(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO roles (id, nombre) VALUES (1, 'recepcion')"))
+        await conn.execute(text("INSERT INTO clientes (nombre, documento_identidad) VALUES ('Cliente', 'SONDA')"))
+        hash_ = contrasenas.hash_password("secreta")
+        await conn.execute(text(
+            "INSERT INTO usuarios (nombre, correo, contraseña, rol_id) "
+            "SELECT 'Base ' || n, 'base' || n || '@hotel.com', :hash, 1 FROM generate_series(1, 10) AS n"
+        ), {"hash": hash_})
+
+    async def sesion():
+        async with Sesion() as db:
+            yield db
+
+    app.dependency_overrides[get_async_session] = sesion
+    print(f"bcrypt: {contrasenas.BCRYPT_ROUNDS} rondas, pool de {contrasenas.HILOS} hilos, "
+          f"concurrencia {contrasenas.CONCURRENCIA}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+        listo = asyncio.Event()
+        sonda = asyncio.create_task(sondear(cliente, listo))
+        await asyncio.sleep(2)
+        listo.set()
+        reportar("GET /clientes/1 sin ráfaga", await sonda)
+
+        with patch("app.crud.usuario.hashear", hashear_en_el_loop):
+            await medir_con_rafaga(cliente, "GET /clientes/1, bcrypt en el loop", 1)
+        await medir_con_rafaga(cliente, "GET /clientes/1, bcrypt en el pool", 2)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
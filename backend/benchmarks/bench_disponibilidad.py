@@ -0,0 +1,95 @@
+"""
+Benchmark de búsqueda de disponibilidad: 5.000 habitaciones y 1.000.000 de reservas.
+
+Compara GET /habitaciones/disponibles (anti-join en una sola consulta) con el
+flujo anterior del front desk: listar habitaciones y consultar conflictos
+habitación por habitación (un viaje a la base por habitación).
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_disponibilidad
+"""
+import asyncio
+import random
+from datetime import date, timedelta
+from sqlalchemy import and_, or_, text
+from sqlalchemy.future import select
+
+from app.crud.habitacion import obtener_habitaciones_disponibles
+from app.models.habitacion import Habitacion
+from app.models.reserva import Reserva
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+HABITACIONES = 5_000
+RESERVAS_POR_HABITACION = 200  # 5.000 x 200 = 1.000.000
+INICIO = date.today()
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            INSERT INTO habitaciones (numero, tipo, precio_noche, estado)
+            SELECT lpad(n::text, 5, '0'),
+                   (ARRAY['simple', 'doble', 'suite'])[1 + n % 3],
+                   50 + (n % 3) * 40,
+                   'disponible'
+            FROM generate_series(1, :n) AS n
+        """), {"n": HABITACIONES})
+        await conn.execute(text("INSERT INTO clientes (nombre, documento_identidad) VALUES ('Bench', 'BENCH-1')"))
+        # Estancias de 1 a 3 noches cada 4 días, con huecos variables por habitación
+        await conn.execute(text("""
+            INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado)
+            SELECT 1, h.id,
+                   CAST(:inicio AS date) + (k * 4 + h.id % 2),
+                   CAST(:inicio AS date) + (k * 4 + h.id % 2) + 1 + (h.id + k) % 3,
+                   CASE WHEN (h.id + k) % 10 = 0 THEN 'cancelada' ELSE 'reservada' END
+            FROM habitaciones h CROSS JOIN generate_series(0, :por_hab - 1) AS k
+        """), {"inicio": INICIO, "por_hab": RESERVAS_POR_HABITACION})
+        await conn.execute(text("ANALYZE"))
+
+
+async def por_habitacion(db, fecha_inicio, fecha_fin):
+    """Flujo anterior: una consulta de conflictos por cada habitación"""
+    habitaciones = (await db.execute(select(Habitacion))).scalars().all()
+    libres = []
+    for hab in habitaciones:
+        result = await db.execute(
+            select(Reserva).where(
+                Reserva.habitacion_id == hab.id,
+                Reserva.estado == "reservada",
+                or_(
+                    and_(Reserva.fecha_inicio <= fecha_inicio, Reserva.fecha_fin > fecha_inicio),
+                    and_(Reserva.fecha_inicio < fecha_fin, Reserva.fecha_fin >= fecha_fin),
+                    and_(Reserva.fecha_inicio >= fecha_inicio, Reserva.fecha_fin <= fecha_fin),
+                )
+            )
+        )
+        if not result.scalars().all():
+            libres.append(hab)
+    return libres
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    print(f"Sembrando {HABITACIONES} habitaciones y {HABITACIONES * RESERVAS_POR_HABITACION} reservas...")
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+    rangos = []
+    for _ in range(30):
+        inicio = INICIO + timedelta(days=random.randint(0, RESERVAS_POR_HABITACION * 4 - 10))
+        rangos.append((inicio, inicio + timedelta(days=random.randint(1, 7))))
+
+    async with Sesion() as db:
+        it = iter(rangos)
+        tiempos = await medir(lambda: obtener_habitaciones_disponibles(db, *next(it)), len(rangos))
+        reportar("anti-join (una consulta)", tiempos)
+        it = iter(rangos)
+        tiempos = await medir(lambda: obtener_habitaciones_disponibles(db, *next(it), tipo="suite"), len(rangos))
+        reportar("anti-join filtrando tipo=suite", tiempos)
+        it = iter(rangos[:3])
+        tiempos = await medir(lambda: por_habitacion(db, *next(it)), 3)
+        reportar(f"habitación por habitación ({HABITACIONES} viajes)", tiempos)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark de la corrida de facturación (POST /facturas/generar).
+
+Siembra RESERVAS reservas terminadas en HABITACIONES habitaciones (un 10% ya con
+factura y un 5% canceladas) y compara:
+  - lo que había que hacer antes: leer las reservas sin factura con su habitación y
+    crear cada factura con crear_factura (medido sobre MUESTRA reservas y proyectado);
+  - generar_facturas: un solo INSERT ... SELECT para todas;
+  - repetir la corrida cuando ya no queda nada por facturar.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_facturacion
+"""
+import asyncio
+import os
+import time
+from datetime import date
+from sqlalchemy import text
+
+from app.crud import factura as crud_factura
+from app.schemas.factura import FacturaCreate
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+RESERVAS = int(os.getenv("BENCH_RESERVAS", "100000"))
+HABITACIONES = 1000
+MUESTRA = int(os.getenv("BENCH_MUESTRA", "2000"))
+HASTA = date(2030, 12, 31)
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'D1')"))
+        await conn.execute(text(
+            "INSERT INTO habitaciones (id, numero, tipo, precio_noche) "
+            "SELECT n, 'H' || n, 'doble', 50 + n % 200 FROM generate_series(1, :h) AS n"
+        ), {"h": HABITACIONES})
+        # Estadías de 1 a 3 noches que no se cruzan dentro de cada habitación
+        await conn.execute(text(
+            "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+            "SELECT n, 1, 1 + n % :h, DATE '2020-01-01' + (n / :h) * 4, DATE '2020-01-01' + (n / :h) * 4 + 1 + n % 3, "
+            "CASE WHEN n % 20 = 0 THEN 'cancelada' WHEN n % 2 = 0 THEN 'completada' ELSE 'reservada' END "
+            "FROM generate_series(1, :n) AS n"
+        ), {"h": HABITACIONES, "n": RESERVAS})
+        await conn.execute(text(
+            "INSERT INTO facturas (reserva_id, fecha_emision, total, estado) "
+            "SELECT id, fecha_fin, 100, 'pagada' FROM reservas WHERE id % 10 = 1"
+        ))
+        await conn.execute(text("ANALYZE"))
+
+
+async def facturar_una_por_una(db, limite):
+    result = await db.execute(text(
+        "SELECT r.id, r.fecha_fin, (r.fecha_fin - r.fecha_inicio) * h.precio_noche AS total "
+        "FROM reservas r JOIN habitaciones h ON h.id = r.habitacion_id "
+        "WHERE r.estado IN ('reservada', 'completada') AND r.fecha_fin <= :hasta "
+        "AND NOT EXISTS (SELECT 1 FROM facturas f WHERE f.reserva_id = r.id) LIMIT :limite"
+    ), {"hasta": HASTA, "limite": limite})
+    filas = result.all()
+    for reserva_id, fecha_fin, total in filas:
+        await crud_factura.crear_factura(
+            db, FacturaCreate(reserva_id=reserva_id, fecha_emision=fecha_fin, total=float(total))
+        )
+    return len(filas)
+
+
+async def main():
+    engine = crear_motor()
+    Sesion = crear_sesiones(engine)
+
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    async with Sesion() as db:
+        inicio = time.perf_counter()
+        creadas = await facturar_una_por_una(db, MUESTRA)
+        transcurrido = time.perf_counter() - inicio
+    async with engine.connect() as conn:
+        faltan = (await conn.execute(text(
+            "SELECT count(*) FROM reservas r WHERE estado <> 'cancelada' "
+            "AND NOT EXISTS (SELECT 1 FROM facturas f WHERE f.reserva_id = r.id)"
+        ))).scalar()
+    print(f"una por una: {creadas} facturas en {transcurrido * 1000:.0f} ms "
+          f"-> {(creadas + faltan) * transcurrido / creadas:.1f} s proyectado para {creadas + faltan}")
+
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    async with Sesion() as db:
+        inicio = time.perf_counter()
+        generadas, total = await crud_factura.generar_facturas(db, HASTA)
+        print(f"generar_facturas: {generadas} facturas (total {total:.0f}) en "
+              f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    async def repetir():
+        async with Sesion() as db:
+            await crud_factura.generar_facturas(db, HASTA)
+
+    reportar("corrida repetida (nada que facturar)", await medir(repetir, 10))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
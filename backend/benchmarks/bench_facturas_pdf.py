@@ -0,0 +1,127 @@
+"""
+Benchmark de los PDF de facturas (POST /facturas/pdf-lote).
+
+Siembra LOTE facturas con 0 a 5 pagos y mide, para un lote de todas ellas:
+  - renderizar los PDF uno por uno dentro del loop (lo que haría una ruta async sin
+    pool), con la mayor pausa que sufre otra tarea del loop;
+  - el lote por HTTP con la caché vacía (todo en el pool de procesos) y la misma pausa;
+  - el lote con todo en caché y con un 10% de facturas con un pago nuevo.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_facturas_pdf
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app.crud import factura as crud_factura
+from app.database import get_async_session
+from app.main import app
+from app.services import facturas_pdf
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema
+
+LOTE = int(os.getenv("BENCH_LOTE", "1000"))
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO clientes (id, nombre, documento_identidad) "
+            "SELECT n, 'Cliente ' || n, 'D' || n FROM generate_series(1, :n) AS n"
+        ), {"n": LOTE})
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+        await conn.execute(text(
+            "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+            "SELECT n, n, 1, DATE '2020-01-01' + n * 3, DATE '2020-01-03' + n * 3, 'completada' "
+            "FROM generate_series(1, :n) AS n"
+        ), {"n": LOTE})
+        await conn.execute(text(
+            "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) "
+            "SELECT n, n, DATE '2020-01-03' + n * 3, 180, 'pendiente' FROM generate_series(1, :n) AS n"
+        ), {"n": LOTE})
+        await conn.execute(text(
+            "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) "
+            "SELECT f, DATE '2020-01-03' + f * 3, 20, 'efectivo' "
+            "FROM generate_series(1, :n) AS f CROSS JOIN generate_series(1, 5) AS k WHERE k <= f % 6"
+        ), {"n": LOTE})
+
+
+async def con_latido(corrutina):
+    """Tiempo de `corrutina` y la mayor pausa de una tarea que despierta cada 5 ms"""
+    pausas = [0.0]
+
+    async def latido():
+        anterior = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.005)
+            ahora = time.perf_counter()
+            pausas.append(ahora - anterior)
+            anterior = ahora
+
+    tarea = asyncio.create_task(latido())
+    await asyncio.sleep(0)
+    inicio = time.perf_counter()
+    await corrutina
+    transcurrido = time.perf_counter() - inicio
+    # Que el latido anote la pausa que pudo dejar el final de `corrutina`
+    await asyncio.sleep(0.01)
+    tarea.cancel()
+    return transcurrido, max(pausas)
+
+
+def informar(nombre, transcurrido, pausa=None):
+    extra = f", mayor pausa del loop {pausa * 1000:.0f} ms" if pausa is not None else ""
+    print(f"{nombre:<38} {transcurrido * 1000:7.0f} ms  {LOTE / transcurrido:7.0f} facturas/s{extra}")
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+    facturas_pdf.CACHE_DIR = tempfile.mkdtemp(prefix="bench_pdf_")
+    print(f"{LOTE} facturas, {facturas_pdf.PROCESOS} procesos, cola de {facturas_pdf.COLA}")
+
+    async def en_el_loop():
+        async with Sesion() as db:
+            datos = await crud_factura.obtener_datos_pdf(db, range(1, LOTE + 1))
+        for d in datos.values():
+            facturas_pdf.renderizar(d)
+
+    informar("render en el loop (sin pool)", *await con_latido(en_el_loop()))
+
+    async def sesion_bench():
+        async with Sesion() as db:
+            yield db
+
+    app.dependency_overrides[get_async_session] = sesion_bench
+    ids = list(range(1, LOTE + 1))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as http:
+        async def lote():
+            respuesta = await http.post("/facturas/pdf-lote", json=ids)
+            assert respuesta.status_code == 200
+            return len(respuesta.content)
+
+        # Arranca los procesos del pool antes de medir
+        await facturas_pdf.obtener_pdf((await crud_factura.obtener_datos_pdf(Sesion(), [1]))[1])
+        shutil.rmtree(facturas_pdf.CACHE_DIR)
+        informar("lote, caché vacía (pool)", *await con_latido(lote()))
+        informar("lote, todo en caché", *await con_latido(lote()))
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) "
+                "SELECT f, DATE '2030-01-01', 10, 'tarjeta' FROM generate_series(1, :n, 10) AS f"
+            ), {"n": LOTE})
+        informar("lote, 10% con un pago nuevo", *await con_latido(lote()))
+        print(f"zip de {await lote() / 1024:.0f} KiB")
+    app.dependency_overrides.clear()
+    shutil.rmtree(facturas_pdf.CACHE_DIR)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
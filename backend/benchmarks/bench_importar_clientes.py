@@ -0,0 +1,69 @@
+"""
+Benchmark de importación masiva de clientes (POST /clientes/importar).
+
+Importa un CSV generado al vuelo de 500.000 clientes (COPY + ON CONFLICT) y lo
+vuelve a importar con la mitad de las filas cambiadas, reportando filas/s y el
+pico de memoria del proceso (RSS). Como referencia, mide el camino anterior (POST /clientes/
+fila por fila: búsqueda por documento + INSERT + commit + refresh) con 2.000 filas.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_importar_clientes
+"""
+import asyncio
+import os
+import resource
+import time
+
+from app.crud import cliente as crud_cliente
+from app.schemas.cliente import ClienteCreate
+from app.services.importacion_clientes import registros_csv
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema
+
+FILAS = int(os.getenv("BENCH_FILAS", "500000"))
+FILAS_POR_PETICION = 2_000
+TROZO = 64 * 1024
+
+
+async def csv_generado(filas, variante=""):
+    """Cuerpo CSV en trozos de 64 KiB, como llegaría por la red"""
+    bufer = "nombre,documento_identidad,correo,telefono\n"
+    for i in range(filas):
+        nombre = f"Cliente {i}{variante if i % 2 else ''}"
+        bufer += f"{nombre},IMP-{i},cliente{i}@correo.com,09{i % 100000000:08d}\n"
+        if len(bufer) >= TROZO:
+            yield bufer.encode()
+            bufer = ""
+    yield bufer.encode()
+
+
+async def importar(Sesion, nombre, variante=""):
+    async with Sesion() as db:
+        inicio = time.perf_counter()
+        resultado = await crud_cliente.importar_clientes(db, registros_csv(csv_generado(FILAS, variante)))
+        segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB en Linux
+    print(f"{nombre:<32} {segundos:7.2f} s  {FILAS / segundos:10.0f} filas/s  "
+          f"RSS máx={pico:6.1f} MiB  {dict((k, v) for k, v in resultado.items() if k != 'errores')}")
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    Sesion = crear_sesiones(engine)
+
+    await importar(Sesion, f"importar {FILAS} (nuevos)")
+    await importar(Sesion, f"reimportar {FILAS} (mitad cambia)", variante=" (editado)")
+
+    async with Sesion() as db:
+        inicio = time.perf_counter()
+        for i in range(FILAS_POR_PETICION):
+            datos = ClienteCreate(nombre=f"Uno a uno {i}", documento_identidad=f"UNO-{i}")
+            if not await crud_cliente.get_cliente_by_documento(db, datos.documento_identidad):
+                await crud_cliente.create_cliente(db, datos)
+        segundos = time.perf_counter() - inicio
+    print(f"{'fila por fila (' + str(FILAS_POR_PETICION) + ')':<32} {segundos:7.2f} s  "
+          f"{FILAS_POR_PETICION / segundos:10.0f} filas/s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark del índice de disponibilidad en memoria contra la ruta SQL.
+
+Usa los mismos datos que bench_disponibilidad (5.000 habitaciones, 1.000.000 de
+reservas) y mide la búsqueda de habitaciones libres y la consulta de una sola
+habitación, además del tiempo y memoria de la carga inicial.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_indice_disponibilidad
+"""
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from sqlalchemy.future import select
+
+from app.crud.habitacion import obtener_habitaciones_disponibles
+from app.models.reserva import Reserva
+from app.services.indice_disponibilidad import IndiceDisponibilidad
+from benchmarks.bench_disponibilidad import sembrar, HABITACIONES, RESERVAS_POR_HABITACION, INICIO
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+
+async def libre_sql(db, habitacion_id, inicio, fin):
+    result = await db.execute(
+        select(Reserva.id).where(
+            Reserva.habitacion_id == habitacion_id,
+            Reserva.estado == "reservada",
+            Reserva.fecha_inicio < fin,
+            Reserva.fecha_fin > inicio,
+        ).limit(1)
+    )
+    return result.first() is None
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    print(f"Sembrando {HABITACIONES} habitaciones y {HABITACIONES * RESERVAS_POR_HABITACION} reservas...")
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+    indice = IndiceDisponibilidad(ttl_segundos=3600)
+
+    rangos = []
+    for _ in range(200):
+        inicio = INICIO + timedelta(days=random.randint(0, RESERVAS_POR_HABITACION * 4 - 10))
+        rangos.append((random.randint(1, HABITACIONES), inicio, inicio + timedelta(days=random.randint(1, 7))))
+
+    async with Sesion() as db:
+        tracemalloc.start()
+        inicio_carga = time.perf_counter()
+        await indice.cargar(db)
+        segundos = time.perf_counter() - inicio_carga
+        memoria = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+        tracemalloc.stop()
+        print(f"Carga del índice: {segundos:.2f} s, {memoria:.0f} MiB")
+
+        it = iter(rangos[:30])
+        reportar("habitaciones libres - SQL anti-join", await medir(
+            lambda: obtener_habitaciones_disponibles(db, *next(it)[1:]), 30))
+        it = iter(rangos[:30])
+        reportar("habitaciones libres - índice en memoria", await medir(
+            lambda: asyncio.sleep(0, indice.habitaciones_disponibles(*next(it)[1:])), 30))
+
+        it = iter(rangos)
+        reportar("una habitación - SQL", await medir(lambda: libre_sql(db, *next(it)), len(rangos)))
+        it = iter(rangos)
+        reportar("una habitación - índice en memoria", await medir(
+            lambda: asyncio.sleep(0, indice.esta_libre(*next(it))), len(rangos)))
+
+        # Las dos rutas deben coincidir
+        for habitacion_id, inicio, fin in rangos:
+            assert indice.esta_libre(habitacion_id, inicio, fin) == await libre_sql(db, habitacion_id, inicio, fin)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
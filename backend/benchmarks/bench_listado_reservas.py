@@ -0,0 +1,85 @@
+"""
+Benchmark del listado paginado de reservas (GET /reservas/).
+
+Para cada tamaño de tabla mide la primera página, una página a mitad de la tabla
+pedida con cursor, la misma página pedida con OFFSET (lo que haría un paginado
+clásico) y una página filtrada por cliente. Con keyset el tiempo no debería
+crecer con el tamaño de la tabla.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_listado_reservas
+    BENCH_TAMANOS=10000,1000000 BENCH_DATABASE_URL=... python -m benchmarks.bench_listado_reservas
+"""
+import asyncio
+import os
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from app.crud.paginacion import codificar_cursor
+from app.crud.reserva import obtener_reservas
+from app.models.reserva import Reserva
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+TAMANOS = [int(t) for t in os.getenv("BENCH_TAMANOS", "10000,10000000").split(",")]
+RESERVAS_POR_HABITACION = 200
+CLIENTES = 1_000
+INICIO = date(2020, 1, 1)
+PAGINA = 50
+
+
+async def sembrar(engine, total):
+    habitaciones = max(1, total // RESERVAS_POR_HABITACION)
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            INSERT INTO clientes (nombre, documento_identidad)
+            SELECT 'Cliente ' || n, 'BENCH-' || n FROM generate_series(1, :n) AS n
+        """), {"n": CLIENTES})
+        await conn.execute(text("""
+            INSERT INTO habitaciones (numero, tipo, precio_noche, estado)
+            SELECT lpad(n::text, 6, '0'), 'doble', 90, 'disponible' FROM generate_series(1, :n) AS n
+        """), {"n": habitaciones})
+        await conn.execute(text("""
+            INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado)
+            SELECT 1 + (h.id * 7 + k) % :clientes, h.id,
+                   CAST(:inicio AS date) + k * 4,
+                   CAST(:inicio AS date) + k * 4 + 2,
+                   CASE WHEN k % 10 = 0 THEN 'cancelada' ELSE 'reservada' END
+            FROM habitaciones h CROSS JOIN generate_series(0, :por_hab - 1) AS k
+        """), {"clientes": CLIENTES, "inicio": INICIO, "por_hab": RESERVAS_POR_HABITACION})
+        await conn.execute(text("ANALYZE"))
+
+
+async def main():
+    engine = crear_motor()
+    Sesion = crear_sesiones(engine)
+    for total in TAMANOS:
+        await reiniciar_esquema(engine)
+        print(f"Sembrando {total} reservas...")
+        await sembrar(engine, total)
+        async with Sesion() as db:
+            # Llave de la fila que está a mitad de la tabla, para armar el cursor equivalente
+            mitad = total // 2
+            fila = (await db.execute(
+                select(Reserva.fecha_inicio, Reserva.id)
+                .order_by(Reserva.fecha_inicio, Reserva.id).offset(mitad).limit(1)
+            )).one()
+            cursor = codificar_cursor(*fila)
+
+            async def con_offset():
+                result = await db.execute(
+                    select(Reserva).order_by(Reserva.fecha_inicio, Reserva.id).offset(mitad).limit(PAGINA)
+                )
+                return result.scalars().all()
+
+            reportar(f"[{total}] primera página", await medir(lambda: obtener_reservas(db, limite=PAGINA)))
+            reportar(f"[{total}] mitad de la tabla (cursor)",
+                     await medir(lambda: obtener_reservas(db, limite=PAGINA, cursor=cursor)))
+            reportar(f"[{total}] mitad de la tabla (OFFSET)", await medir(con_offset, 5))
+            reportar(f"[{total}] filtrada cliente + estado",
+                     await medir(lambda: obtener_reservas(db, cliente_id=17, estado="reservada",
+                                                          limite=PAGINA, cursor=cursor)))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
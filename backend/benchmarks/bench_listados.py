@@ -0,0 +1,115 @@
+"""
+Benchmark de memoria y latencia de GET /ingresos/ con una tabla grande (FILAS filas).
+
+Compara la ruta anterior (select(Ingreso) → lista de entidades ORM → una sola lista
+JSON armada por FastAPI) con el listado en flujo de app/services/listados.py (cursor
+del servidor, tandas de LISTADOS_LOTE filas) en JSON y NDJSON. Por cada camino se
+mide el tiempo hasta el primer byte, el total y el pico de memoria de Python
+(tracemalloc, en una pasada aparte porque lo hace más lento).
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_listados
+"""
+import asyncio
+import os
+import time
+import tracemalloc
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", os.getenv("BENCH_DATABASE_URL", ""))
+
+from fastapi import Depends  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.future import select  # noqa: E402
+
+from app.database import get_async_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.ingreso import Ingreso  # noqa: E402
+from app.schemas.ingreso import IngresoRead  # noqa: E402
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema  # noqa: E402
+
+FILAS = int(os.getenv("BENCH_FILAS", "300000"))
+
+
+@app.get("/bench/ingresos-en-lista", response_model=List[IngresoRead])
+async def listar_en_lista(db: AsyncSession = Depends(get_async_session)):
+    """Lo que hacía GET /ingresos/ antes"""
+    result = await db.execute(select(Ingreso))
+    return result.scalars().all()
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'D1')"))
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+        await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                                "VALUES (1, 1, 1, '2030-01-01', '2030-01-03')"))
+        await conn.execute(text(
+            "INSERT INTO ingresos (reserva_id, monto, descripcion, fecha) "
+            "SELECT 1, n % 1000, 'Consumo de minibar ' || n, DATE '2030-01-01' + n % 365 "
+            "FROM generate_series(1, :n) AS n"
+        ), {"n": FILAS})
+        await conn.execute(text("ANALYZE ingresos"))
+
+
+async def descargar(url):
+    """Llama a la app ASGI directamente y descarta el cuerpo a medida que sale
+    (httpx.ASGITransport junta toda la respuesta antes de devolverla)"""
+    ruta, _, consulta = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": ruta, "raw_path": ruta.encode(), "query_string": consulta.encode(),
+        "headers": [], "server": ("bench", 80), "client": ("127.0.0.1", 1), "root_path": "",
+    }
+    inicio = time.perf_counter()
+    medidas = {"primer_byte": None, "bytes": 0}
+    pedido = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if pedido:
+            return pedido.pop()
+        # El cliente nunca se desconecta: StreamingResponse queda esperando aquí
+        await asyncio.Event().wait()
+
+    async def send(mensaje):
+        if mensaje["type"] == "http.response.start":
+            assert mensaje["status"] == 200, mensaje
+        elif mensaje["type"] == "http.response.body" and mensaje.get("body"):
+            if medidas["primer_byte"] is None:
+                medidas["primer_byte"] = time.perf_counter() - inicio
+            medidas["bytes"] += len(mensaje["body"])
+
+    await app(scope, receive, send)
+    return medidas["primer_byte"] * 1000, (time.perf_counter() - inicio) * 1000, medidas["bytes"]
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+
+    async def sesion():
+        async with Sesion() as db:
+            yield db
+
+    app.dependency_overrides[get_async_session] = sesion
+    print(f"{FILAS} ingresos")
+    caminos = [
+        ("lista ORM (antes)", "/bench/ingresos-en-lista"),
+        ("en flujo, json", "/ingresos/"),
+        ("en flujo, ndjson", "/ingresos/?formato=ndjson"),
+    ]
+    for nombre, url in caminos:
+        primer_byte, duracion, tamano = await descargar(url)
+        tracemalloc.start()
+        await descargar(url)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{nombre:<20} primer byte={primer_byte:9.1f} ms  total={duracion:9.1f} ms  "
+              f"{tamano / 2**20:6.1f} MiB enviados  pico de memoria={pico / 2**20:8.1f} MiB")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark de la carga de fin de día de ingresos y egresos (LOTE filas, 10000 por defecto).
+
+Compara:
+  - una petición por línea, como hasta ahora (crear_ingreso/crear_egreso: un
+    INSERT ... RETURNING y un COMMIT por fila, cada una con su sesión);
+  - POST /ingresos/lote y /egresos/lote: todo el lote en una transacción con
+    INSERT de varias filas ... RETURNING id (de a 1000 filas por sentencia),
+    medido en el CRUD y por HTTP (incluye parsear y validar el JSON).
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_lotes
+"""
+import asyncio
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", os.getenv("BENCH_DATABASE_URL", ""))
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.crud import egreso as crud_egreso, ingreso as crud_ingreso  # noqa: E402
+from app.database import get_async_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.schemas.egreso import EgresoCreate  # noqa: E402
+from app.schemas.ingreso import IngresoCreate  # noqa: E402
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar  # noqa: E402
+
+LOTE = int(os.getenv("BENCH_LOTE", "10000"))
+RESERVAS = 200
+REPETICIONES = int(os.getenv("BENCH_REPETICIONES", "5"))
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'D1')"))
+        await conn.execute(text(
+            "INSERT INTO habitaciones (id, numero, tipo, precio_noche) "
+            "SELECT n, 'H' || n, 'doble', 90 FROM generate_series(1, :n) AS n"
+        ), {"n": RESERVAS})
+        await conn.execute(text(
+            "INSERT INTO reservas (cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+            "SELECT 1, n, '2030-01-01', '2030-01-03' FROM generate_series(1, :n) AS n"
+        ), {"n": RESERVAS})
+
+
+def lineas_ingreso():
+    return [{"reserva_id": 1 + i % RESERVAS, "monto": 10 + i % 90, "descripcion": f"Consumo {i}"} for i in range(LOTE)]
+
+
+def lineas_egreso():
+    return [{"descripcion": f"Compra {i}", "monto": 5 + i % 50} for i in range(LOTE)]
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+
+    async def sesion():
+        async with Sesion() as db:
+            yield db
+
+    app.dependency_overrides[get_async_session] = sesion
+    casos = [
+        ("ingresos", IngresoCreate, lineas_ingreso(), crud_ingreso.crear_ingreso, crud_ingreso.crear_ingresos_lote),
+        ("egresos", EgresoCreate, lineas_egreso(), crud_egreso.crear_egreso, crud_egreso.crear_egresos_lote),
+    ]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+        for nombre, esquema, lineas, crear, crear_lote in casos:
+            modelos = [esquema(**linea) for linea in lineas]
+
+            async def fila_por_fila():
+                for modelo in modelos:
+                    async with Sesion() as db:
+                        await crear(db, modelo)
+
+            async def lote_crud():
+                async with Sesion() as db:
+                    await crear_lote(db, modelos)
+
+            async def lote_http():
+                respuesta = await cliente.post(f"/{nombre}/lote", json=lineas)
+                respuesta.raise_for_status()
+
+            inicio = time.perf_counter()
+            await fila_por_fila()
+            duracion = time.perf_counter() - inicio
+            print(f"{nombre}: {LOTE} filas de a una en {duracion:.2f} s ({LOTE / duracion:,.0f} filas/s)")
+            reportar(f"{nombre}: lote, CRUD", await medir(lote_crud, REPETICIONES))
+            reportar(f"{nombre}: POST /{nombre}/lote", await medir(lote_http, REPETICIONES))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
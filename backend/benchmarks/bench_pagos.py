@@ -0,0 +1,99 @@
+"""
+Benchmark del registro de pagos con saldo de la factura y de la conciliación en bloque.
+
+  - crear_pago anterior (solo INSERT ... RETURNING) contra el actual (bloqueo de la
+    factura + INSERT + UPDATE del estado, en una transacción), uno por vez y con
+    PARALELOS pagos simultáneos repartidos en pocas facturas;
+  - conciliar_estados sobre FACTURAS facturas: la primera pasada con todas
+    desfasadas (como al desplegar, con los pagos que nunca saldaron su factura), con
+    un 1% desfasado y sin nada que corregir.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_pagos
+"""
+import asyncio
+import itertools
+import os
+import time
+from datetime import date
+from sqlalchemy import text
+
+from app.crud import factura as crud_factura, pago as crud_pago
+from app.crud.escritura import insertar
+from app.models.pago import Pago
+from app.schemas.pago import PagoCreate
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+FACTURAS = int(os.getenv("BENCH_FACTURAS", "100000"))
+PARALELOS = int(os.getenv("BENCH_PARALELOS", "20"))
+REPETICIONES = int(os.getenv("BENCH_REPETICIONES", "1000"))
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'D1')"))
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+        await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin) "
+                                "VALUES (1, 1, 1, '2020-01-01', '2020-01-03')"))
+        # Todas 'pendiente', y las pares ya cubiertas por sus pagos
+        await conn.execute(text(
+            "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) "
+            "SELECT n, 1, DATE '2020-01-03' + n % 3000, 100, 'pendiente' FROM generate_series(1, :n) AS n"
+        ), {"n": FACTURAS})
+        await conn.execute(text(
+            "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) "
+            "SELECT f, DATE '2020-01-03', CASE WHEN f % 2 = 0 THEN 50 ELSE 30 END, 'efectivo' "
+            "FROM generate_series(1, :n) AS f CROSS JOIN generate_series(1, 2)"
+        ), {"n": FACTURAS})
+        await conn.execute(text("SELECT setval(pg_get_serial_sequence('facturas', 'id'), :n)"), {"n": FACTURAS})
+        await conn.execute(text("ANALYZE"))
+
+
+async def pago_anterior(db, pago):
+    nuevo = await insertar(db, Pago, pago.model_dump())
+    await db.commit()
+    return nuevo
+
+
+async def main():
+    engine = crear_motor(pool_size=PARALELOS)
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+
+    async def conciliar():
+        async with Sesion() as db:
+            return await crud_factura.conciliar_estados(db)
+
+    inicio = time.perf_counter()
+    corregidas = await conciliar()
+    print(f"conciliación inicial: {corregidas} de {FACTURAS} facturas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE facturas SET estado = 'pendiente' WHERE estado = 'pagada' AND id % 100 = 0"))
+    inicio = time.perf_counter()
+    corregidas = await conciliar()
+    print(f"conciliación con 1% desfasado: {corregidas} facturas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    reportar("conciliación sin cambios", await medir(conciliar, 10))
+
+    facturas = itertools.cycle(range(1, FACTURAS + 1, 2))
+    for nombre, crear in (("solo INSERT (antes)", pago_anterior), ("bloqueo + INSERT + saldo", crud_pago.crear_pago)):
+        async def uno():
+            async with Sesion() as db:
+                await crear(db, PagoCreate(factura_id=next(facturas), fecha_pago=date(2030, 1, 1), monto=1, metodo_pago="efectivo"))
+
+        reportar(f"pago, {nombre}", await medir(uno, REPETICIONES))
+
+        # PARALELOS pagos a la vez sobre 5 facturas: con bloqueo, los de una misma factura se encolan
+        async def rafaga():
+            async def pagar(i):
+                async with Sesion() as db:
+                    await crear(db, PagoCreate(factura_id=1 + 2 * (i % 5), fecha_pago=date(2030, 1, 1), monto=1,
+                                               metodo_pago="efectivo"))
+            await asyncio.gather(*(pagar(i) for i in range(PARALELOS)))
+
+        reportar(f"{PARALELOS} pagos en 5 facturas, {nombre}", await medir(rafaga, 50))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""
+Benchmark de lectura de parámetros: caché en memoria contra consulta a la base.
+
+Mide get_parametro_by_clave y la lectura en bloque de 10 claves con la caché
+vigente y sin ella, y cuánto tarda otro worker en ver un cambio (NOTIFY + recarga).
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_parametros
+"""
+import asyncio
+import time
+from sqlalchemy import text
+
+from app.crud import parametro as crud_parametro
+from app.schemas.parametro import ParametroUpdate
+from app.services.cache_parametros import CacheParametros, cache, escuchar_cambios
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+PARAMETROS = 200
+CLAVES = [f"PARAM_{i}" for i in range(0, PARAMETROS, PARAMETROS // 10)]
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO parametros (clave, valor) SELECT 'PARAM_' || n, n::text FROM generate_series(0, :n - 1) AS n"
+        ), {"n": PARAMETROS})
+    Sesion = crear_sesiones(engine)
+
+    async with Sesion() as db:
+        cache.invalidar()
+        reportar("por clave, sin caché", await medir(lambda: crud_parametro.get_parametro_by_clave(db, "PARAM_7"), 1000))
+        reportar("10 claves, sin caché", await medir(lambda: crud_parametro.get_parametros_by_claves(db, CLAVES), 1000))
+        await cache.cargar(db)
+        reportar("por clave, con caché", await medir(lambda: crud_parametro.get_parametro_by_clave(db, "PARAM_7"), 1000))
+        reportar("10 claves, con caché", await medir(lambda: crud_parametro.get_parametros_by_claves(db, CLAVES), 1000))
+
+    otro = CacheParametros()
+    escucha = asyncio.create_task(escuchar_cambios(engine, Sesion, cache=otro))
+    while not otro.valida:
+        await asyncio.sleep(0.001)
+    demoras = []
+    for i in range(50):
+        async with Sesion() as db:
+            inicio = time.perf_counter()
+            await crud_parametro.update_parametro(db, 8, ParametroUpdate(valor=f"nuevo-{i}"))  # id 8 = PARAM_7
+        while not (otro.valida and otro.obtener("PARAM_7").valor == f"nuevo-{i}"):
+            await asyncio.sleep(0.0005)
+        demoras.append((time.perf_counter() - inicio) * 1000)
+    reportar("cambio visible en otro worker", demoras)
+    escucha.cancel()
+    await asyncio.gather(escucha, return_exceptions=True)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
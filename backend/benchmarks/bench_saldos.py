@@ -0,0 +1,89 @@
+"""
+Benchmark de saldos de facturas (GET /facturas/saldos).
+
+Siembra FACTURAS facturas con 0 a 5 pagos cada una y compara:
+  - lo que había que hacer antes: obtener_facturas (todas las facturas con todos sus
+    pagos vía selectinload) y sumar en Python;
+  - obtener_saldos: una página de 50 con la suma agrupada en la base, al principio, en
+    el medio (por cursor), solo con saldo y de un cliente;
+  - la misma página sin idx_pagos_factura_id.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_saldos
+"""
+import asyncio
+import os
+from datetime import date
+from sqlalchemy import text
+
+from app.crud import factura as crud_factura
+from app.crud.paginacion import codificar_cursor
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+FACTURAS = int(os.getenv("BENCH_FACTURAS", "100000"))
+CLIENTES = 2000
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO clientes (id, nombre, documento_identidad) "
+            "SELECT n, 'Cliente ' || n, 'D' || n FROM generate_series(1, :c) AS n"
+        ), {"c": CLIENTES})
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche) VALUES (1, '101', 'doble', 90)"))
+        # Una reserva por factura, cancelada para no chocar con la restricción de solapamiento
+        await conn.execute(text(
+            "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+            "SELECT n, 1 + n % :c, 1, DATE '2020-01-01' + n % 3000, DATE '2020-01-03' + n % 3000, 'cancelada' "
+            "FROM generate_series(1, :n) AS n"
+        ), {"c": CLIENTES, "n": FACTURAS})
+        await conn.execute(text(
+            "INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) "
+            "SELECT n, n, DATE '2020-01-03' + n % 3000, 100 + n % 400, "
+            "CASE WHEN n % 3 = 0 THEN 'pagada' ELSE 'pendiente' END FROM generate_series(1, :n) AS n"
+        ), {"n": FACTURAS})
+        await conn.execute(text(
+            "INSERT INTO pagos (factura_id, fecha_pago, monto, metodo_pago) "
+            "SELECT f, DATE '2020-01-03' + f % 3000, 20, 'efectivo' "
+            "FROM generate_series(1, :n) AS f CROSS JOIN generate_series(1, 5) AS k WHERE k <= f % 6"
+        ), {"n": FACTURAS})
+        await conn.execute(text("ANALYZE"))
+        return (await conn.execute(text("SELECT count(*) FROM pagos"))).scalar()
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    pagos = await sembrar(engine)
+    print(f"{FACTURAS} facturas, {pagos} pagos")
+    Sesion = crear_sesiones(engine)
+    medio = codificar_cursor(date(2024, 1, 1), 0)
+
+    async def antes():
+        async with Sesion() as db:
+            facturas = await crud_factura.obtener_facturas(db)
+            return {f.id: f.total - sum(p.monto for p in f.pagos) for f in facturas}
+
+    async def saldos(**filtros):
+        async with Sesion() as db:
+            return await crud_factura.obtener_saldos(db, limite=50, **filtros)
+
+    reportar("antes: todas con sus pagos + suma en Python", await medir(antes, 3))
+    casos = [
+        ("saldos: primera página", {}),
+        ("saldos: página del medio (cursor)", {"cursor": medio}),
+        ("saldos: solo con saldo", {"con_saldo": True}),
+        ("saldos: pendientes de un cliente", {"cliente_id": 7, "estado": "pendiente"}),
+    ]
+    for nombre, filtros in casos:
+        reportar(nombre, await medir(lambda: saldos(**filtros), 200))
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX idx_pagos_factura_id"))
+        await conn.execute(text("ANALYZE pagos"))
+    reportar("saldos: primera página sin el índice", await medir(saldos, 20))
+    reportar("saldos: de un cliente sin el índice", await medir(lambda: saldos(cliente_id=7), 20))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
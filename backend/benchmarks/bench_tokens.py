@@ -0,0 +1,41 @@
+"""
+Benchmark del costo de autorizar una petición.
+
+Compara validar un token de sesión (firma HMAC + vencimiento + LRU de revocados,
+app/services/tokens.py) con verificar la contraseña con bcrypt, que es lo que
+costaría comprobar credenciales en cada petición. No necesita base de datos.
+
+    python -m benchmarks.bench_tokens
+"""
+import time
+
+from app.services import contrasenas, tokens
+
+REPETICIONES_TOKEN = 100_000
+REPETICIONES_BCRYPT = 20
+
+
+def medir_us(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def main():
+    token, _ = tokens.emitir(1, 1)
+    for i in range(tokens.TOKENS_REVOCADOS_MAXIMO):
+        tokens.revocar({"jti": f"revocado-{i}", "exp": time.time() + 3600})
+    revocado, _ = tokens.emitir(2, 1)
+    tokens.revocar(tokens.validar(revocado))
+    hash_ = contrasenas.hash_password("secreta")
+
+    print(f"{'token válido':<40} {medir_us(lambda: tokens.validar(token), REPETICIONES_TOKEN):10.1f} µs")
+    print(f"{'token revocado (LRU lleno)':<40} {medir_us(lambda: tokens.validar(revocado), REPETICIONES_TOKEN):10.1f} µs")
+    print(f"{'firma alterada':<40} {medir_us(lambda: tokens.validar(token[:-2] + 'xx'), REPETICIONES_TOKEN):10.1f} µs")
+    print(f"{f'bcrypt ({contrasenas.BCRYPT_ROUNDS} rondas)':<40} "
+          f"{medir_us(lambda: contrasenas.verify_password('secreta', hash_), REPETICIONES_BCRYPT):10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
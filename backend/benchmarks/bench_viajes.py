@@ -0,0 +1,149 @@
+"""
+Benchmark de viajes a la base por petición en las altas y modificaciones del CRUD.
+
+Cada petición usa su propia sesión, como en la API. Se cuentan los viajes que ve el
+motor (BEGIN, cada sentencia, COMMIT/ROLLBACK) y se mide la latencia de:
+  - el camino anterior: add → commit → refresh (el refresh abre otra transacción
+    solo para leer el id y los defaults) y, en las modificaciones, SELECT previo;
+  - el camino actual: INSERT/UPDATE ... RETURNING (app/crud/escritura.py) + COMMIT.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_viajes
+"""
+import asyncio
+import itertools
+import os
+from datetime import date, timedelta
+from sqlalchemy import event, text
+from sqlalchemy.future import select
+
+from app.crud import cliente as crud_cliente, egreso as crud_egreso, factura as crud_factura
+from app.crud import habitacion as crud_habitacion, ingreso as crud_ingreso, pago as crud_pago
+from app.crud import reserva as crud_reserva
+from app.crud.retencion import retenciones_cruzadas
+from app.models.cliente import Cliente
+from app.models.egreso import Egreso
+from app.models.factura import Factura
+from app.models.habitacion import Habitacion
+from app.models.ingreso import Ingreso
+from app.models.pago import Pago
+from app.models.reserva import Reserva
+from app.schemas.cliente import ClienteCreate
+from app.schemas.egreso import EgresoCreate
+from app.schemas.factura import FacturaCreate
+from app.schemas.habitacion import HabitacionCreate
+from app.schemas.ingreso import IngresoCreate
+from app.schemas.pago import PagoCreate
+from app.schemas.reserva import ReservaCreate
+from benchmarks.comun import crear_motor, crear_sesiones, reiniciar_esquema, medir, reportar
+
+REPETICIONES = int(os.getenv("BENCH_REPETICIONES", "1000"))
+HOY = date(2030, 1, 1)
+
+
+class ContadorViajes:
+    """Cuenta BEGIN, sentencias y COMMIT/ROLLBACK que pasan por el motor"""
+
+    def __init__(self, engine):
+        self.viajes = 0
+        for nombre in ("begin", "before_cursor_execute", "commit", "rollback"):
+            event.listen(engine.sync_engine, nombre, self._sumar)
+
+    def _sumar(self, *args, **kwargs):
+        self.viajes += 1
+
+
+async def sembrar(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO clientes (id, nombre, documento_identidad) VALUES (1, 'Cliente', 'SEM-1')"))
+        await conn.execute(text("INSERT INTO habitaciones (id, numero, tipo, precio_noche, estado) "
+                                "VALUES (1, 'SEM-1', 'doble', 90, 'disponible')"))
+        await conn.execute(text("INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_inicio, fecha_fin, estado) "
+                                "VALUES (1, 1, 1, '2029-01-01', '2029-01-03', 'reservada')"))
+        await conn.execute(text("INSERT INTO facturas (id, reserva_id, fecha_emision, total, estado) "
+                                "VALUES (1, 1, '2029-01-03', 180, 'pendiente')"))
+        for tabla in ("clientes", "habitaciones", "reservas", "facturas"):
+            await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), 1)"))
+
+
+async def alta_anterior(Sesion, modelo, datos):
+    async with Sesion() as db:
+        if modelo is Reserva:
+            # crear_reserva siempre leyó la habitación antes de insertar; solo cambia lo de después
+            retenida = retenciones_cruzadas(Habitacion.id, datos.fecha_inicio, datos.fecha_fin)
+            await db.execute(select(Habitacion, retenida.label("retenida")).where(Habitacion.id == datos.habitacion_id))
+        fila = modelo(**datos.model_dump())
+        db.add(fila)
+        await db.commit()
+        await db.refresh(fila)
+        return fila
+
+
+async def modificacion_anterior(Sesion, modelo, fila_id, datos):
+    async with Sesion() as db:
+        fila = await db.get(modelo, fila_id)
+        for campo, valor in datos.model_dump().items():
+            setattr(fila, campo, valor)
+        await db.commit()
+        await db.refresh(fila)
+        return fila
+
+
+async def con_sesion(Sesion, funcion, *args):
+    async with Sesion() as db:
+        return await funcion(db, *args)
+
+
+async def main():
+    engine = crear_motor()
+    await reiniciar_esquema(engine)
+    await sembrar(engine)
+    Sesion = crear_sesiones(engine)
+    contador = ContadorViajes(engine)
+    n = itertools.count()
+
+    def reserva():
+        # Cada alta ocupa dos noches nuevas de la habitación sembrada
+        inicio = HOY + timedelta(days=2 * next(n))
+        return ReservaCreate(cliente_id=1, habitacion_id=1, fecha_inicio=inicio, fecha_fin=inicio + timedelta(days=2))
+
+    casos = [
+        ("ingreso", Ingreso, crud_ingreso.crear_ingreso,
+         lambda: IngresoCreate(reserva_id=1, monto=100, descripcion="Consumo")),
+        ("egreso", Egreso, crud_egreso.crear_egreso, lambda: EgresoCreate(descripcion="Compra", monto=50)),
+        ("factura", Factura, crud_factura.crear_factura,
+         lambda: FacturaCreate(reserva_id=1, fecha_emision=HOY, total=180)),
+        ("pago", Pago, crud_pago.crear_pago,
+         lambda: PagoCreate(factura_id=1, fecha_pago=HOY, monto=10, metodo_pago="efectivo")),
+        ("habitacion", Habitacion, crud_habitacion.crear_habitacion,
+         lambda: HabitacionCreate(numero=f"H{next(n)}", tipo="doble", precio_noche=90)),
+        ("cliente", Cliente, crud_cliente.create_cliente,
+         lambda: ClienteCreate(nombre="Cliente", documento_identidad=f"D{next(n)}")),
+        ("reserva", Reserva, crud_reserva.crear_reserva, reserva),
+    ]
+    for nombre, modelo, crear, datos in casos:
+        for camino, funcion in (
+            ("add + commit + refresh", lambda: alta_anterior(Sesion, modelo, datos())),
+            ("INSERT ... RETURNING", lambda: con_sesion(Sesion, crear, datos())),
+        ):
+            antes = contador.viajes
+            tiempos = await medir(funcion, REPETICIONES)
+            viajes = (contador.viajes - antes) / REPETICIONES
+            reportar(f"alta {nombre}: {camino} [{viajes:.0f} viajes]", tiempos)
+
+    def cambio():
+        # Un nombre distinto en cada llamada, si no el ORM no emite el UPDATE
+        return ClienteCreate(nombre=f"Cliente {next(n)}", documento_identidad="SEM-1")
+
+    for camino, funcion in (
+        ("SELECT + commit + refresh", lambda: modificacion_anterior(Sesion, Cliente, 1, cambio())),
+        ("UPDATE ... RETURNING", lambda: con_sesion(Sesion, crud_cliente.update_cliente, 1, cambio())),
+    ):
+        antes = contador.viajes
+        tiempos = await medir(funcion, REPETICIONES)
+        viajes = (contador.viajes - antes) / REPETICIONES
+        reportar(f"modificación cliente: {camino} [{viajes:.0f} viajes]", tiempos)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
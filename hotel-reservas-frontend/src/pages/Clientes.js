@@ -1,9 +1,12 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { getClientes, createCliente } from "../services/clientesService";
 import "./Clientes.css";
 
 function Clientes() {
   const [clientes, setClientes] = useState([]);
+  const [busqueda, setBusqueda] = useState("");
+  const [campo, setCampo] = useState("auto");
+  const [siguienteCursor, setSiguienteCursor] = useState(null);
   const [formData, setFormData] = useState({
     nombre: "",
     documento_identidad: "",
@@ -11,14 +14,37 @@ function Clientes() {
     telefono: ""
   });
 
+  // La búsqueda la resuelve el backend; se espera a que el usuario deje de escribir
   useEffect(() => {
-    cargarClientes();
-  }, []);
+    const temporizador = setTimeout(() => cargarClientes(), 300);
+    return () => clearTimeout(temporizador);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [busqueda, campo]);
 
-  const cargarClientes = async () => {
+  // Cada pedido lleva un número; una respuesta que llega después de otra más nueva se descarta
+  const ultimaPeticion = useRef(0);
+
+  const filtrosBusqueda = () => {
+    const texto = busqueda.trim();
+    if (!texto) return {};
+    if (campo !== "auto") return { [campo]: texto };
+    // Con @: correo; dígitos con +, espacios o guiones: teléfono; solo dígitos: documento;
+    // lo demás: inicio del nombre (un teléfono escrito sin separadores se busca eligiendo "Teléfono")
+    if (texto.includes("@")) return { correo: texto };
+    if (/^\d+$/.test(texto)) return { documento: texto };
+    if (/^[\d\s+()-]+$/.test(texto)) return { telefono: texto };
+    return { nombre: texto };
+  };
+
+  const cargarClientes = async (cursor = null) => {
+    const peticion = ++ultimaPeticion.current;
+    // Una búsqueda nueva oculta "Cargar más" hasta tener su propio cursor
+    if (!cursor) setSiguienteCursor(null);
     try {
-      const data = await getClientes();
-      setClientes(data);
+      const pagina = await getClientes(filtrosBusqueda(), cursor);
+      if (peticion !== ultimaPeticion.current) return;
+      setClientes((anteriores) => (cursor ? [...anteriores, ...pagina.clientes] : pagina.clientes));
+      setSiguienteCursor(pagina.siguienteCursor);
     } catch (error) {
       console.error("Error al obtener clientes:", error);
     }
@@ -80,6 +106,20 @@ function Clientes() {
         <button type="submit">Agregar</button>
       </form>
 
+      <input
+        type="search"
+        placeholder="Buscar por nombre, documento, correo o teléfono"
+        value={busqueda}
+        onChange={(e) => setBusqueda(e.target.value)}
+      />
+      <select value={campo} onChange={(e) => setCampo(e.target.value)}>
+        <option value="auto">Automático</option>
+        <option value="nombre">Nombre</option>
+        <option value="documento">Documento</option>
+        <option value="telefono">Teléfono</option>
+        <option value="correo">Correo</option>
+      </select>
+
       <ul>
         {clientes.map((cliente) => (
           <li key={cliente.id}>
@@ -87,6 +127,12 @@ function Clientes() {
           </li>
         ))}
       </ul>
+
+      {siguienteCursor && (
+        <button type="button" onClick={() => cargarClientes(siguienteCursor)}>
+          Cargar más
+        </button>
+      )}
     </div>
   );
 }
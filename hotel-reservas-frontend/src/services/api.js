@@ -10,10 +10,23 @@ const api = axios.create({
   }
 });
 
+// Listados paginados por cursor: pide páginas de `limite` siguiendo X-Siguiente-Cursor
+// y devuelve { data } con todas las filas, como una respuesta de axios.
+const obtenerTodas = async (url, params = {}, limite = 500) => {
+  const data = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, { params: { ...params, limite, ...(cursor && { cursor }) } });
+    data.push(...response.data);
+    cursor = response.headers['x-siguiente-cursor'] || null;
+  } while (cursor);
+  return { data };
+};
+
 // Servicios para cada entidad
 export const reservasAPI = {
-  // Obtener todas las reservas
-  getAll: () => api.get('/reservas/'),
+  // Obtener todas las reservas (todas las páginas)
+  getAll: (params) => obtenerTodas('/reservas/', params),
   
   // Obtener reserva por ID
   getById: (id) => api.get(`/reservas/${id}`),
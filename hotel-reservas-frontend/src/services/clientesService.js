@@ -1,8 +1,15 @@
 import api from "./api";
 
-export const getClientes = async () => {
-  const response = await api.get("/clientes/");
-  return response.data;
+// Búsqueda paginada: filtros = { nombre, documento, correo, telefono }.
+// Devuelve la página y el cursor para pedir la siguiente (null si no hay más).
+export const getClientes = async (filtros = {}, cursor = null) => {
+  const params = { ...filtros };
+  if (cursor) params.cursor = cursor;
+  const response = await api.get("/clientes/", { params });
+  return {
+    clientes: response.data,
+    siguienteCursor: response.headers["x-siguiente-cursor"] || null
+  };
 };
 
 export const getClienteById = async (id) => {
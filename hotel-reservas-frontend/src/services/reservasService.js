@@ -1,22 +1,33 @@
 // services/reservasService.js
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+// Máximo que acepta el backend por página (PAGINA_MAXIMA)
+const RESERVAS_POR_PAGINA = 500;
 
 class ReservasService {
   // GET /reservas/ - Listar Reservas
-  async listarReservas() {
+  // El listado viene por páginas: se sigue X-Siguiente-Cursor hasta traerlas todas.
+  async listarReservas(filtros = {}) {
     try {
-      const response = await fetch(`${API_BASE_URL}/reservas/`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-      });
-
-      if (!response.ok) {
-        throw new Error(`Error ${response.status}: ${response.statusText}`);
-      }
-
-      return await response.json();
+      const reservas = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ ...filtros, limite: RESERVAS_POR_PAGINA });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${API_BASE_URL}/reservas/?${params}`, {
+          method: 'GET',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+        });
+
+        if (!response.ok) {
+          throw new Error(`Error ${response.status}: ${response.statusText}`);
+        }
+
+        reservas.push(...await response.json());
+        cursor = response.headers.get('X-Siguiente-Cursor');
+      } while (cursor);
+      return reservas;
     } catch (error) {
       console.error('Error al listar reservas:', error);
       throw error;